@@ -1,20 +1,23 @@
-import json
 from openai import OpenAI
-from pydantic import BaseModel
-from typing import List, Literal
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.output_parsers import StrOutputParser
 from braintrust import init_logger, traced
 from braintrust_langchain import BraintrustCallbackHandler, set_global_handler
 
+import llm_resilience
+import metrics
+import structured_output
 from config import settings
 
 # ==============================================================================
 # BRAINTRUST INTEGRATION
 # ==============================================================================
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=llm_resilience.MAX_RETRIES,
+                http_client=llm_resilience.http_client())
 init_logger(project="Prodapt", api_key=settings.BRAINTRUST_API_KEY)
 set_global_handler(BraintrustCallbackHandler())
 
@@ -22,49 +25,93 @@ set_global_handler(BraintrustCallbackHandler())
 # RESUME EVALUATION (Original)
 # ==============================================================================
 
-resume_eval_prompt = """
-You are an expert hiring screener. Given the candidate resume text and a job description, evaluate candidate's fit.
+class MatchBySection(BaseModel):
+    """Short match summary per job section"""
+    required_skills: str
+    experience_years: str
+    education: str
+
+class ResumeEvaluation(BaseModel):
+    overall_score: int = Field(ge=0, le=100)
+    strengths: List[str] = Field(description="3 most important strengths")
+    gaps: List[str] = Field(description="3 main gaps or risks")
+    match_by_section: MatchBySection
+    rewrite_snippet: str = Field(description="One paragraph resume intro tailored to the job (50-70 words)")
+    actionable_recommendations: List[str] = Field(description="3-5 concrete edits or next steps")
+
+RESUME_EVALUATION_FORMAT = structured_output.response_format(ResumeEvaluation, "resume_evaluation")
+
+# Prompt layout, most shared first:
+#   1. system: role + instructions + output format   (identical for every call)
+#   2. user:   JOB_REQUIREMENTS                       (identical per job post)
+#   3. user:   RESUME_TEXT                            (per application)
+# Nothing variable (ids, dates) may go before the resume. OpenAI only caches
+# prompts of 1024 tokens or more, and instructions + a digest come to a few
+# hundred, so today the saving is the shorter prompt itself, not cache hits.
+# The layout keeps the prefix cacheable should the instructions grow past the
+# minimum (benchmarks/evaluation_prompt_tokens.py reports it per post).
+RESUME_EVAL_INSTRUCTIONS = """
+You are a helpful, neutral, accurate recruiter assistant.
+
+You are an expert hiring screener. Given the candidate resume text and the job requirements, evaluate candidate's fit.
 
 Inputs (do not invent facts):
-- RESUME_TEXT: {0}
-- JOB_DESC: {1}
-
-Return a JSON object with these fields:
-{
-  "overall_score": integer 0-100,  
-  "strengths": [strings],         // 3 most important strengths
-  "gaps": [strings],              // 3 main gaps or risks
-  "match_by_section": {           // short mapping of job sections to match info
-    "required_skills": "match summary",
-    "experience_years": "match summary",
-    "education": "match summary"
-  },
-  "rewrite_snippet": "one paragraph resume intro tailored to the job (50-70 words)",
-  "actionable_recommendations": [strings]  // 3-5 concrete edits or next steps
-}
+- JOB_REQUIREMENTS: the job's requirements, digested from its description
+- RESUME_TEXT: the candidate's resume
+
+Return the evaluation as JSON in the provided schema: the overall score (0-100), the 3 most important
+strengths, the 3 main gaps or risks, a short match summary for required skills, experience years and
+education, a one paragraph resume intro tailored to the job (50-70 words), and 3-5 concrete edits or
+next steps for the candidate.
 
 Be concise. Use the resume text only for facts; do not hallucinate experience or dates. If the resume is very long, summarize conservatively.
 """
 
 
 def build_system_and_user_messages(resume_text: str, job_desc: str):
-    prompt = resume_eval_prompt.replace("{0}", resume_text).replace("{1}", job_desc)
     return [
-        {"role": "system", "content": "You are a helpful, neutral, accurate recruiter assistant."},
-        {"role": "user", "content": prompt}
+        {"role": "system", "content": RESUME_EVAL_INSTRUCTIONS},
+        {"role": "user", "content": f"JOB_REQUIREMENTS:\n{job_desc}\n\nRESUME_TEXT:\n{resume_text}"}
     ]
 
+def record_prompt_usage(usage):
+    """Prompt tokens sent and served from the provider's prompt cache"""
+    if usage is None:
+        return
+    metrics.increment("resume_evaluation.prompt_tokens", usage.prompt_tokens)
+    details = usage.prompt_tokens_details
+    metrics.increment("resume_evaluation.cached_prompt_tokens", (details.cached_tokens or 0) if details else 0)
+
 def evaluate_resume_with_ai(resume_text: str, 
                             job_desc: str, 
-                            model="gpt-4o-mini", temperature=0):
+                            model="gpt-4o-mini", temperature=0,
+                            prompt_cache_key: Optional[str] = None):
+    """
+    job_desc is the job post's requirements digest (job_post_digest.py), or its
+    description. prompt_cache_key routes calls sharing a prefix (one per job
+    post) to the same provider cache; it only has an effect once that prefix
+    reaches the provider's 1024-token caching minimum.
+    """
     messages = build_system_and_user_messages(resume_text, job_desc)
-    resp = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        max_tokens=1000
-    )
-    return json.loads(resp.choices[0].message.content.strip())
+    extra = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}
+
+    def complete() -> ResumeEvaluation:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=1000,
+            response_format=RESUME_EVALUATION_FORMAT,
+            **extra
+        )
+        record_prompt_usage(resp.usage)
+        message = resp.choices[0].message
+        if message.refusal:
+            metrics.increment(f"llm_output.parse_failures.{model}")
+            raise structured_output.StructuredOutputError(f"Resume evaluation refused: {message.refusal}")
+        return structured_output.parse(message.content or "", ResumeEvaluation, model)
+
+    return structured_output.with_retries(complete, model).model_dump()
 
 
 # ==============================================================================
@@ -104,10 +151,7 @@ Analyze the provided job description for potential issues across these dimension
 4. MISSING INFORMATION: Note absent critical details (salary, work location, requirements vs. preferred).
 5. SUMMARY: Provide 2-3 sentences describing overall quality and primary concerns.
 
-CRITICAL: Your output MUST be valid JSON that conforms exactly to the provided schema.
-- Do NOT include comments or explanations inside JSON values
-- Each array element must be a simple string without parenthetical notes
-- Return ONLY the JSON object, no additional text
+Each array element must be a simple string without parenthetical notes.
 """
 
 ANALYSIS_USER_PROMPT = """
@@ -116,8 +160,6 @@ Analyze the following job description:
 --- JOB DESCRIPTION ---
 {job_description}
 ----------------------
-
-{format_instructions}
 """
 
 # Step 2: Rewrite Prompt
@@ -129,7 +171,7 @@ You will receive:
 2. A structured analysis of issues found in Step 1.
 
 Your task is to rewrite ONLY the problematic sections, not the entire job description.
-Return ONLY valid JSON matching the provided schema.
+Return the rewritten sections in the provided schema.
 """
 
 REWRITE_USER_PROMPT = """
@@ -140,8 +182,6 @@ Original Job Description:
 Analysis Findings:
 ------------------
 {analysis_json}
-
-{format_instructions}
 """
 
 # Step 3: Finalise Prompt
@@ -170,40 +210,42 @@ Create the final polished job description by integrating the improvements.
 """
 
 
+# Built once and shared by every review: one ChatOpenAI client (and its
+# connection pool) instead of three chains and a client per call.
+# Bump REVIEW_PROMPT_VERSION whenever a review prompt or the model changes;
+# jd_review.py caches complete reviews under it.
+REVIEW_PROMPT_VERSION = "2"
+
+review_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=settings.OPENAI_API_KEY,
+                        max_retries=llm_resilience.MAX_RETRIES, http_client=llm_resilience.http_client(),
+                        http_async_client=llm_resilience.async_http_client())
+
+# Chains 1 and 2 answer in their schema (strict json_schema), repaired or
+# retried by structured_output when the response still does not parse
+analysis_chain = structured_output.structured_chain(ChatPromptTemplate.from_messages([
+    ("system", ANALYSIS_SYSTEM_PROMPT),
+    ("human", ANALYSIS_USER_PROMPT),
+]), review_llm, JDAnalysis)
+
+rewrite_chain = structured_output.structured_chain(ChatPromptTemplate.from_messages([
+    ("system", REWRITE_SYSTEM_PROMPT),
+    ("human", REWRITE_USER_PROMPT),
+]), review_llm, JDRewriteOutput)
+
+# Chain 3: Finalise (plain text, so it can be streamed token by token)
+finalise_chain = ChatPromptTemplate.from_messages([
+    ("system", FINALISE_SYSTEM_PROMPT),
+    ("human", FINALISE_USER_PROMPT),
+]) | review_llm | StrOutputParser()
+
+
 @traced(name="Review Job Description")
 def review_application(job_description: str) -> ReviewedApplication:
     """Review and improve a job description using 3-chain pattern with Braintrust tracing."""
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=settings.OPENAI_API_KEY)
-
-    # Chain 1: Analysis
-    analysis_parser = PydanticOutputParser(pydantic_object=JDAnalysis)
-    analysis_prompt = ChatPromptTemplate.from_messages([
-        ("system", ANALYSIS_SYSTEM_PROMPT),
-        ("human", ANALYSIS_USER_PROMPT),
-    ]).partial(format_instructions=analysis_parser.get_format_instructions())
-    analysis_chain = analysis_prompt | llm | analysis_parser
     analysis = analysis_chain.invoke({"job_description": job_description})
-
-    # Chain 2: Rewrite
-    rewrite_parser = PydanticOutputParser(pydantic_object=JDRewriteOutput)
-    rewrite_prompt = ChatPromptTemplate.from_messages([
-        ("system", REWRITE_SYSTEM_PROMPT),
-        ("human", REWRITE_USER_PROMPT),
-    ]).partial(format_instructions=rewrite_parser.get_format_instructions())
-    rewrite_chain = rewrite_prompt | llm | rewrite_parser
     rewrite = rewrite_chain.invoke({"job_description": job_description, "analysis_json": analysis.model_dump_json()})
-
-    # Chain 3: Finalise
-    finalise_prompt = ChatPromptTemplate.from_messages([
-        ("system", FINALISE_SYSTEM_PROMPT),
-        ("human", FINALISE_USER_PROMPT),
-    ])
-    finalise_chain = finalise_prompt | llm
-    final_output = finalise_chain.invoke({
+    revised_description = finalise_chain.invoke({
         "job_description": job_description, 
         "rewritten_sections_json": rewrite.model_dump_json()
     })
-    
-    revised_description = final_output.content
-    overall_summary = analysis.overall_summary
-    return ReviewedApplication(revised_description=revised_description, overall_summary=overall_summary)
+    return ReviewedApplication(revised_description=revised_description, overall_summary=analysis.overall_summary)
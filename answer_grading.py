@@ -0,0 +1,140 @@
+"""
+Tiered grading of interview answers for check_answer.
+
+1. keywords: a local deterministic check against the question bank. It
+   never marks an answer correct, since matching words cannot tell a right
+   explanation from the same words in the wrong order. It only rejects
+   answers that are empty / "I don't know", or that state a known
+   misconception of the question (wrong_keywords) without mentioning an
+   accepted keyword or negating anything.
+2. small: a small, fast model grades against the reference answer and
+   reports its confidence.
+3. full: the Braintrust check_answer prompt on the full model, used only
+   when the small model is not confident.
+
+Each result carries the tier that decided it, so latency and accuracy can be
+broken down per tier (see benchmarks/answer_grading.py).
+"""
+
+import json
+import re
+from typing import Optional
+
+from openai import OpenAI
+from pydantic import BaseModel, Field
+
+import llm_resilience
+from config import settings
+from prompt_registry import registry as prompt_registry
+from question_bank import Question, get_question_bank
+
+# Braintrust slug of the check_answer prompt
+CHECK_ANSWER_PROMPT_SLUG = "check-answer-prompt-b08b"
+
+SMALL_MODEL = "gpt-4.1-mini"
+FULL_MODEL = "gpt-5.1-instant"
+
+# Small model verdicts below this confidence are escalated to the full model
+CONFIDENCE_THRESHOLD = 0.8
+
+_NEGATION_RE = re.compile(r"\b(not|no|never|cannot|neither|nor|none|without|"
+                          r"(do|does|did|is|are|was|were|ca|wo|should|could|would|has|have|had|must|need)n[’']?t)\b")
+_NON_ANSWER_RE = re.compile(r"^(i\s+(do\s*n[o']?t|don't)\s+know|no\s+idea|not\s+sure|pass|skip|idk|\?+)?[.!]*$")
+
+SMALL_MODEL_PROMPT = """
+Grade a candidate's answer to a technical screening question.
+
+Skill: {skill}
+Question: {question}
+Reference answer: {reference_answer}
+Candidate answer:
+{answer}
+
+Answers are expected to be brief. Mark the answer correct if it is technically
+accurate and covers the main point of the reference answer (or, for subjective
+questions, most of the important points). Give your confidence in the verdict
+between 0 and 1; use a low confidence when the answer is ambiguous, partially
+correct or you are unsure of the facts.
+"""
+
+
+class GradeResult(BaseModel):
+    correct: bool
+    reasoning: str
+    confidence: float = Field(ge=0, le=1)
+
+
+_client: Optional[OpenAI] = None
+
+
+def _openai_client() -> OpenAI:
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=llm_resilience.MAX_RETRIES,
+                         http_client=llm_resilience.http_client())
+    return _client
+
+
+def _mentions(text: str, keyword: str) -> bool:
+    """Whether text contains keyword, not as part of a longer word ("true" is not in "untrue")"""
+    keyword = keyword.casefold()
+    start = r"(?<!\w)" if keyword[0].isalnum() else ""
+    end = r"(?!\w)" if keyword[-1].isalnum() else ""
+    return re.search(start + re.escape(keyword) + end, text) is not None
+
+
+def grade_with_keywords(question: Optional[Question], answer: str) -> Optional[dict]:
+    """Deterministic first tier. Only ever rejects; returns None when the models have to decide."""
+    normalized = " ".join(answer.split()).casefold()
+    if _NON_ANSWER_RE.match(normalized):
+        return {"correct": False, "reasoning": "No answer was given.", "tier": "keywords"}
+    if question is None or not question.wrong_keywords or _NEGATION_RE.search(normalized):
+        return None
+    if any(_mentions(normalized, keyword) for group in question.keywords for keyword in group):
+        return None
+    if any(_mentions(normalized, keyword) for keyword in question.wrong_keywords):
+        return {"correct": False, "reasoning": "The answer states a common misconception.", "tier": "keywords"}
+    return None
+
+
+def grade_with_small_model(skill: str, question_text: str, question: Optional[Question], answer: str) -> dict:
+    reference_answer = question.reference_answer if question and question.reference_answer else "(not provided)"
+    response = _openai_client().chat.completions.parse(
+        model=SMALL_MODEL,
+        temperature=0,
+        response_format=GradeResult,
+        messages=[{"role": "user", "content": SMALL_MODEL_PROMPT.format(
+            skill=skill, question=question_text, reference_answer=reference_answer, answer=answer)}],
+    )
+    grade = response.choices[0].message.parsed
+    return {"correct": grade.correct, "reasoning": grade.reasoning, "confidence": grade.confidence, "tier": "small"}
+
+
+def grade_with_full_model(skill: str, question_text: str, answer: str) -> dict:
+    prompt = prompt_registry.get(CHECK_ANSWER_PROMPT_SLUG, settings.CHECK_ANSWER_PROMPT_VERSION)
+    details = prompt.build(skill=skill, question=question_text, answer=answer)
+    response = _openai_client().chat.completions.create(
+        model=FULL_MODEL,
+        temperature=0,
+        response_format=details["response_format"],
+        messages=details["messages"]
+    )
+    result = json.loads(response.choices[0].message.content)
+    return {"correct": result["correct"], "reasoning": result["reasoning"], "tier": "full"}
+
+
+def grade_answer(skill: str, question_text: str, answer: str, tiers: tuple = ("keywords", "small", "full")) -> dict:
+    """Grade an answer with the cheapest tier that is confident. Returns correct, reasoning and tier."""
+    question = get_question_bank().find(question_text)
+
+    if "keywords" in tiers:
+        result = grade_with_keywords(question, answer)
+        if result is not None:
+            return result
+
+    if "small" in tiers:
+        result = grade_with_small_model(skill, question_text, question, answer)
+        if result["confidence"] >= CONFIDENCE_THRESHOLD or "full" not in tiers:
+            return result
+
+    return grade_with_full_model(skill, question_text, answer)
@@ -0,0 +1,72 @@
+"""
+Benchmark: accuracy vs latency of check_answer grading tiers
+
+Grades every row of test/check_answer_evaluation_dataset.json with a set of
+tier configurations and reports accuracy, mean/p95 latency and which tier
+decided each answer. Needs OPENAI_API_KEY (and BRAINTRUST_API_KEY for the
+full tier) unless only the keyword tier is selected.
+
+Usage:
+    python benchmarks/answer_grading.py
+    python benchmarks/answer_grading.py --configs keywords full keywords,small,full
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, '.')
+
+import answer_grading
+
+DATASET_PATH = "test/check_answer_evaluation_dataset.json"
+
+
+def run(rows: list[dict], tiers: tuple) -> dict:
+    latencies, correct, decided_by, undecided = [], 0, Counter(), 0
+    for row in rows:
+        start = time.perf_counter()
+        if tiers == ("keywords",):
+            question = answer_grading.get_question_bank().find(row["question"])
+            result = answer_grading.grade_with_keywords(question, row["answer"])
+        else:
+            result = answer_grading.grade_answer(row["skill"], row["question"], row["answer"], tiers=tiers)
+        latencies.append(time.perf_counter() - start)
+        if result is None:
+            undecided += 1
+            continue
+        decided_by[result["tier"]] += 1
+        correct += result["correct"] == row["correct"]
+    decided = len(rows) - undecided
+    return {
+        "accuracy": correct / decided if decided else 0.0,
+        "decided": decided,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": sorted(latencies)[int(len(latencies) * 0.95)] * 1000,
+        "tiers": dict(decided_by),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", nargs="+", default=["keywords", "full", "small,full", "keywords,small,full"],
+                        help="comma separated tier lists to compare")
+    args = parser.parse_args()
+
+    with open(DATASET_PATH) as f:
+        rows = json.load(f)
+
+    print(f"{len(rows)} labelled answers")
+    print(f"{'tiers':<22}{'accuracy':>9}{'decided':>9}{'mean':>10}{'p95':>10}  decided by")
+    for config in args.configs:
+        tiers = tuple(config.split(","))
+        report = run(rows, tiers)
+        print(f"{config:<22}{report['accuracy']:>9.1%}{report['decided']:>9}"
+              f"{report['mean_ms']:>8.0f}ms{report['p95_ms']:>8.0f}ms  {report['tiers']}")
+
+
+if __name__ == "__main__":
+    main()
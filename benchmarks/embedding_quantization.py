@@ -0,0 +1,118 @@
+"""
+Evaluation: resume vector recall against memory
+
+For every embedding size and quantization, reports recall@k against exact
+search over the full-size float vectors, the RAM each vector costs and the
+reduction against 3072-dim float32. Quantized rows re-score a k * oversampling
+shortlist with the original vectors, which Qdrant keeps on disk.
+
+Sizes are produced by Matryoshka truncation of the full vectors, which is
+what the text-embedding-3 `dimensions` parameter returns, so one embedding
+pass covers every size. Queries are held-out vectors from the same set.
+
+Sources:
+    --source qdrant     the resumes collection (must hold full-size vectors)
+    --source synthetic  clustered vectors whose leading dimensions carry the
+                        most variance, like Matryoshka embeddings (offline)
+
+Usage:
+    python benchmarks/embedding_quantization.py --source synthetic --size 20000
+    python benchmarks/embedding_quantization.py --source qdrant --dimensions 3072 1024 512 256
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, '.')
+
+from vector_index import BinaryQuantizer, ScalarQuantizer, exact_search, quantized_search, truncate_dimensions
+
+FULL_DIMENSIONS = 3072
+OVERSAMPLING = {"scalar": [1.0, 2.0], "binary": [1.0, 3.0, 5.0]}
+
+
+def synthetic_vectors(count: int, dimensions: int, rng: np.random.Generator) -> np.ndarray:
+    """Topics > similar resumes > individual resumes, with variance decaying along the dimensions"""
+    decay = 1 / np.sqrt(np.arange(1, dimensions + 1))
+    topics = rng.normal(size=(max(1, count // 1000), dimensions))
+    group_count = max(1, count // 20)
+    groups = topics[rng.integers(0, len(topics), group_count)] + rng.normal(scale=0.6, size=(group_count, dimensions))
+    vectors = groups[rng.integers(0, len(groups), count)] + rng.normal(scale=0.3, size=(count, dimensions))
+    return truncate_dimensions(vectors * decay, dimensions)
+
+
+def qdrant_vectors(limit: int) -> np.ndarray:
+    import resume_index
+
+    client = resume_index.get_vector_client()
+    vectors, offset = [], None
+    while len(vectors) < limit:
+        points, offset = client.scroll(resume_index.COLLECTION_NAME, limit=min(1000, limit - len(vectors)),
+                                       offset=offset, with_payload=False, with_vectors=True)
+        vectors += [point.vector for point in points]
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def evaluate(corpus: np.ndarray, queries: np.ndarray, truth: list[set], k: int,
+             quantizer=None, oversampling: float = 1.0) -> tuple[float, float]:
+    """Recall@k and p50 query latency in ms"""
+    codes = quantizer.fit(corpus).encode(corpus) if quantizer else None
+    recall, latencies = 0.0, []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        if quantizer:
+            found = quantized_search(quantizer, codes, corpus, query, k, oversampling=oversampling)
+        else:
+            found = exact_search(corpus, query, k)
+        latencies.append(time.perf_counter() - start)
+        recall += len(expected & {row for _, row in found}) / k
+    return recall / len(queries), sorted(latencies)[len(latencies) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=["synthetic", "qdrant"], default="synthetic")
+    parser.add_argument("--size", type=int, default=20000, help="vectors to load (synthetic: to generate)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[3072, 1536, 1024, 512, 256])
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    if args.source == "synthetic":
+        vectors = synthetic_vectors(args.size, max(args.dimensions), rng)
+    else:
+        vectors = qdrant_vectors(args.size)
+    full_dimensions = vectors.shape[1]
+    if max(args.dimensions) > full_dimensions:
+        sys.exit(f"Vectors have {full_dimensions} dimensions; cannot evaluate {max(args.dimensions)}")
+
+    held_out = rng.choice(len(vectors), size=args.queries, replace=False)
+    corpus_rows = np.setdiff1d(np.arange(len(vectors)), held_out)
+    truth = [{row for _, row in exact_search(vectors[corpus_rows], query, args.k)} for query in vectors[held_out]]
+
+    print(f"{len(corpus_rows)} vectors ({args.source}, {full_dimensions} dims), {args.queries} held-out queries, "
+          f"recall@{args.k} against exact {full_dimensions}-dim float32:")
+    print(f"  {'dims':>5} {'storage':8} {'oversample':>10} {'RAM/vector':>11} {'vs 3072f':>9} {'recall':>7} {'p50':>9}")
+    for dimensions in sorted(args.dimensions, reverse=True):
+        corpus = truncate_dimensions(vectors[corpus_rows], dimensions)
+        queries = truncate_dimensions(vectors[held_out], dimensions)
+        runs = [("float32", None, 1.0, dimensions * 4)]
+        runs += [("int8", ScalarQuantizer(), oversampling, ScalarQuantizer.bytes_per_vector(dimensions))
+                 for oversampling in OVERSAMPLING["scalar"]]
+        runs += [("binary", BinaryQuantizer(), oversampling, BinaryQuantizer.bytes_per_vector(dimensions))
+                 for oversampling in OVERSAMPLING["binary"]]
+        for storage, quantizer, oversampling, size in runs:
+            recall, p50 = evaluate(corpus, queries, truth, args.k, quantizer, oversampling)
+            ratio = FULL_DIMENSIONS * 4 / size
+            print(f"  {dimensions:>5} {storage:8} {oversampling if quantizer else '-':>10} {size:>9} B "
+                  f"{ratio:>8.1f}x {recall:>7.3f} {p50:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Report: resume evaluation prompt tokens, raw description against digest
+
+For each job post, counts the evaluation prompt tokens before the resume
+(instructions + job requirements) with the raw description and with the
+requirements digest (job_post_digest.py, extracted if missing), and
+multiplies the difference by the post's application count. Also reports
+whether that shared prefix reaches OpenAI's 1024-token minimum for prompt
+caching; past it, repeated prefixes are billed at the cached rate.
+
+Live counters from running evaluations are at /api/metrics:
+resume_evaluation.prompt_tokens, resume_evaluation.cached_prompt_tokens and
+resume_evaluation.description_tokens_saved (estimated).
+
+Usage:
+    python benchmarks/evaluation_prompt_tokens.py --limit 50
+"""
+
+import argparse
+import sys
+
+import tiktoken
+from sqlalchemy import select
+
+sys.path.insert(0, '.')
+
+import job_post_digest
+from ai import build_system_and_user_messages
+from db import get_db_session
+from models import JobPost, JobPostStats
+
+EVALUATION_MODEL = "gpt-4o-mini"
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+def prefix_tokens(encoding, job_requirements: str) -> int:
+    """Tokens of the evaluation prompt that precede the resume"""
+    messages = build_system_and_user_messages("", job_requirements)
+    return sum(len(encoding.encode(message["content"])) for message in messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=50, help="most recent job posts to report")
+    args = parser.parse_args()
+
+    encoding = tiktoken.encoding_for_model(EVALUATION_MODEL)
+    with get_db_session() as db:
+        job_posts = db.scalars(select(JobPost).order_by(JobPost.id.desc()).limit(args.limit)).all()
+        print(f"  {'job post':>8} {'applications':>12} {'description':>11} {'digest':>7} {'cacheable':>9} "
+              f"{'tokens saved':>12}")
+        total_saved = 0
+        for job_post in job_posts:
+            digest = job_post_digest.get_job_post_digest(db, job_post.id)
+            stats_row = db.get(JobPostStats, job_post.id)
+            applications = stats_row.application_count if stats_row else 0
+            with_description = prefix_tokens(encoding, job_post.description)
+            with_digest = prefix_tokens(encoding, digest)
+            saved = (with_description - with_digest) * applications
+            total_saved += saved
+            cacheable = "yes" if with_digest >= PROMPT_CACHE_MIN_TOKENS else "no"
+            print(f"  {job_post.id:>8} {applications:>12} {with_description:>11} {with_digest:>7} {cacheable:>9} "
+                  f"{saved:>12}")
+        print(f"Prompt tokens saved over all applications: {total_saved}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Fake OpenAI Chat Completions server for load tests.
+
+Streams a canned reply token by token with a fixed per-token delay, so
+interview load tests exercise streaming and concurrency without paying for
+(or being rate limited by) a real model.
+
+--slow-rate and --error-rate inject slow (+--slow-ms) and failing (HTTP 500)
+responses, to exercise llm_resilience.py's deadlines, hedging and circuit
+breaker. Tests can script exact behaviours through app.state.plan.
+
+Usage:
+    python benchmarks/fake_openai.py --port 8765 --token-delay-ms 20
+    python benchmarks/fake_openai.py --slow-rate 0.05 --slow-ms 5000 --error-rate 0.01
+    INTERVIEW_MODEL_BASE_URL=http://127.0.0.1:8765/v1 fastapi run main.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = ("Thanks, that makes sense. Let's move on to the next question: "
+         "how would you design a rate limiter for a public API?")
+
+app = FastAPI()
+app.state.token_delay = 0.02
+app.state.slow_rate = 0.0
+app.state.slow_delay = 5.0
+app.state.error_rate = 0.0
+app.state.rng = random.Random(42)
+# Behaviours ("ok", "slow", "error", "rate_limited") used by the next requests, before the rates apply
+app.state.plan = deque()
+# Model of every request received, for tests
+app.state.models = []
+
+
+def _chunk(model, delta, finish_reason=None):
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def _behaviour() -> str:
+    if app.state.plan:
+        return app.state.plan.popleft()
+    if app.state.rng.random() < app.state.error_rate:
+        return "error"
+    return "slow" if app.state.rng.random() < app.state.slow_rate else "ok"
+
+
+def _usage(body):
+    prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+    completion_tokens = len(REPLY.split())
+    return {"prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    app.state.models.append(model)
+
+    behaviour = _behaviour()
+    if behaviour == "error":
+        return JSONResponse({"error": {"message": "Injected failure", "type": "server_error"}}, status_code=500)
+    if behaviour == "rate_limited":
+        return JSONResponse({"error": {"message": "Injected rate limit", "type": "rate_limit_error"}},
+                            status_code=429, headers={"retry-after-ms": "50"})
+    if behaviour == "slow":
+        await asyncio.sleep(app.state.slow_delay)
+
+    if not body.get("stream"):
+        await asyncio.sleep(app.state.token_delay * len(REPLY.split()))
+        return JSONResponse({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+            "usage": _usage(body),
+        })
+
+    async def events():
+        yield f"data: {json.dumps(_chunk(model, {'role': 'assistant', 'content': ''}))}\n\n"
+        for word in REPLY.split(" "):
+            await asyncio.sleep(app.state.token_delay)
+            yield f"data: {json.dumps(_chunk(model, {'content': word + ' '}))}\n\n"
+        final = _chunk(model, {}, finish_reason="stop")
+        final["usage"] = _usage(body)
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-delay-ms", type=float, default=20)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=5000)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    app.state.token_delay = args.token_delay_ms / 1000
+    app.state.slow_rate = args.slow_rate
+    app.state.slow_delay = args.slow_ms / 1000
+    app.state.error_rate = args.error_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: dense against hybrid (dense + BM25, reciprocal rank fusion) resume retrieval
+
+Generates resumes for a few roles, some holding a certification, and asks
+for each role/certification pair. A resume is relevant when it has both the
+role and the certification. Reports recall@k, MRR and query latency through
+resume_index.recommend_candidates for:
+
+- dense          the job description embedding alone
+- hybrid cert    fused with a BM25 ranking of the required certification
+- hybrid text    fused with a BM25 ranking of the whole description
+
+Dense vectors come from HashingEmbeddings by default (offline); pass
+--embeddings openai for text-embedding-3-large.
+
+Usage:
+    python benchmarks/hybrid_retrieval.py --resumes 10000 --backend local
+    python benchmarks/hybrid_retrieval.py --backend qdrant --embeddings openai --resumes 2000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from langchain_openai import OpenAIEmbeddings
+from qdrant_client import QdrantClient
+
+sys.path.insert(0, '.')
+
+import resume_index
+from config import settings
+from resume_index import ResumeDocument
+from vector_index import HashingEmbeddings, LocalVectorClient
+
+ROLES = {
+    "backend engineer": ["python", "java", "go", "postgresql", "redis", "kafka", "grpc", "microservices", "django",
+                         "spring", "rest", "api", "sql", "docker", "linux"],
+    "frontend engineer": ["javascript", "typescript", "react", "vue", "css", "html", "webpack", "accessibility",
+                          "redux", "nextjs", "figma", "jest", "graphql", "design", "browser"],
+    "data engineer": ["spark", "airflow", "sql", "python", "dbt", "snowflake", "bigquery", "etl", "kafka",
+                      "pandas", "hadoop", "warehouse", "pipelines", "scala", "databricks"],
+    "devops engineer": ["kubernetes", "terraform", "aws", "docker", "ci", "jenkins", "ansible", "prometheus",
+                        "grafana", "linux", "helm", "gcp", "azure", "networking", "bash"],
+}
+CERTIFICATIONS = ["cka", "ckad", "aws-saa", "pmp", "cissp", "gcp-pca", "az-104", "scrum-psm"]
+FILLER = ["delivered", "projects", "team", "stakeholders", "improved", "performance", "mentored", "owned",
+          "production", "reliability", "customers", "launched", "collaborated", "roadmap", "quality"]
+
+
+def generate_resumes(count: int, rng: random.Random) -> list[tuple[str, str, str]]:
+    """(role, certification or "", text)"""
+    resumes = []
+    for _ in range(count):
+        role = rng.choice(list(ROLES))
+        certification = rng.choice(CERTIFICATIONS) if rng.random() < 0.15 else ""
+        skills = rng.sample(ROLES[role], 8)
+        filler = " ".join(rng.choice(FILLER) for _ in range(40))
+        text = f"{role} with {rng.randint(1, 15)} years of experience. Skills: {', '.join(skills)}. {filler}."
+        if certification:
+            text += f" Certifications: {certification}."
+        resumes.append((role, certification, text))
+    return resumes
+
+
+def job_description(role: str, certification: str, rng: random.Random) -> str:
+    return (f"We are hiring a {role}. You will work with {', '.join(rng.sample(ROLES[role], 6))}. "
+            f"The {certification} certification is required.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--backend", choices=["local", "qdrant"], default="local",
+                        help="LocalVectorClient or qdrant-client's in-process mode")
+    parser.add_argument("--embeddings", choices=["hashing", "openai"], default="hashing")
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    if args.embeddings == "openai":
+        embeddings = OpenAIEmbeddings(model=resume_index.EMBEDDING_MODEL, dimensions=args.dimensions,
+                                      api_key=settings.OPENAI_API_KEY)
+    else:
+        embeddings = HashingEmbeddings(args.dimensions)
+    client = LocalVectorClient() if args.backend == "local" else QdrantClient(":memory:")
+    resume_index.ensure_collection(client, dimensions=args.dimensions, quantization="none")
+
+    resumes = generate_resumes(args.resumes, rng)
+    submitted_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    documents = [ResumeDocument(job_application_id=i, job_post_id=1, job_board_id=1, resume_url=f"/resumes/{i}.pdf",
+                                submitted_at=submitted_at, text=text)
+                 for i, (_, _, text) in enumerate(resumes)]
+    for offset in range(0, len(documents), 1000):
+        resume_index.ingest_resumes(documents[offset:offset + 1000], client, embeddings)
+    print(f"Ingested {len(documents)} resumes ({args.backend}, {args.embeddings} embeddings) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    queries = []
+    for role in ROLES:
+        for certification in CERTIFICATIONS:
+            relevant = {i for i, (r, c, _) in enumerate(resumes) if r == role and c == certification}
+            if relevant:
+                description = job_description(role, certification, rng)
+                queries.append((description, certification, embeddings.embed_query(description), relevant))
+
+    print(f"{len(queries)} queries, recall@{args.k} / MRR / latency:")
+    for name, keywords_for in [("dense", lambda description, certification: None),
+                               ("hybrid cert", lambda description, certification: certification),
+                               ("hybrid text", lambda description, certification: description)]:
+        recall, reciprocal_rank, latencies = 0.0, 0.0, []
+        for description, certification, query_vector, relevant in queries:
+            start = time.perf_counter()
+            page = resume_index.recommend_candidates(query_vector, client, limit=args.k,
+                                                     keywords=keywords_for(description, certification))
+            latencies.append(time.perf_counter() - start)
+            ranked = [item.job_application_id for item in page["items"]]
+            recall += len(relevant & set(ranked)) / min(args.k, len(relevant))
+            reciprocal_rank += next((1 / (rank + 1) for rank, i in enumerate(ranked) if i in relevant), 0.0)
+        latencies.sort()
+        print(f"  {name:12} recall {recall / len(queries):.3f}  MRR {reciprocal_rank / len(queries):.3f}  "
+              f"p50 {latencies[len(latencies) // 2] * 1000:6.2f}ms  "
+              f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:6.2f}ms")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
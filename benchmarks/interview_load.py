@@ -0,0 +1,86 @@
+"""
+Load test: concurrent screening interviews over the WebSocket endpoint.
+
+Opens N interviews at once against a running app, answers each turn with a
+canned reply and reports time to first token and full turn latency. Run the
+app against the fake model backend so the numbers measure our runtime, not
+OpenAI:
+
+    python benchmarks/fake_openai.py --port 8765 &
+    INTERVIEW_MODEL_BASE_URL=http://127.0.0.1:8765/v1 fastapi run main.py --workers 1 &
+    python benchmarks/interview_load.py ws://127.0.0.1:8000 --job-id 1 \
+        --job-application-id 1 --token <interview_token> --interviews 200 --turns 5
+
+Interviews are opened with the interview token returned when the job
+application was created. Interview state is written to DATABASE_URL, so point
+the app at a scratch database.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from urllib.parse import urlencode
+
+import websockets
+
+
+async def interview(base_url: str, job_id: int, job_application_id: int, token: str, turns: int,
+                    first_token: list, turn_latency: list):
+    session_id = f"load-{uuid.uuid4().hex[:12]}"
+    query = urlencode({"job_id": job_id, "job_application_id": job_application_id, "token": token})
+    async with websockets.connect(f"{base_url}/api/interviews/{session_id}/ws?{query}") as ws:
+        for turn in range(turns):
+            start = time.perf_counter()
+            first = None
+            while True:
+                event = json.loads(await ws.recv())
+                if event["type"] == "token" and first is None:
+                    first = time.perf_counter() - start
+                if event["type"] == "turn_complete":
+                    break
+            turn_latency.append(time.perf_counter() - start)
+            if first is not None:
+                first_token.append(first)
+            message = "bye" if turn == turns - 1 else "I would use a token bucket per API key."
+            await ws.send(json.dumps({"message": message}))
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_url", help="e.g. ws://127.0.0.1:8000")
+    parser.add_argument("--job-id", type=int, default=1)
+    parser.add_argument("--job-application-id", type=int, required=True)
+    parser.add_argument("--token", required=True, help="interview token of the job application")
+    parser.add_argument("--interviews", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=3)
+    args = parser.parse_args()
+
+    first_token, turn_latency = [], []
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        interview(args.base_url, args.job_id, args.job_application_id, args.token, args.turns,
+                  first_token, turn_latency)
+        for _ in range(args.interviews)
+    ], return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    failures = [result for result in results if isinstance(result, Exception)]
+    print(f"{args.interviews} interviews x {args.turns} turns in {elapsed:.1f}s ({len(failures)} failed)")
+    if failures:
+        print(f"First failure: {failures[0]!r}")
+    for name, values in (("time to first token", first_token), ("turn latency", turn_latency)):
+        if values:
+            print(f"{name:<20} p50={statistics.median(values) * 1000:.0f}ms "
+                  f"p95={percentile(values, 0.95) * 1000:.0f}ms max={max(values) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Evaluation: embedding pre-screen thresholds
+
+For each candidate threshold, reports the share of LLM evaluations the
+pre-screen would save and its false-negative rate: relevant applications
+that would never reach the LLM. Suggests the highest threshold within
+--max-false-negative-rate, to set as a job post's prescreen_threshold or
+PRESCREEN_DEFAULT_THRESHOLD.
+
+Labelled sets:
+    --labels FILE   JSON lines of {"resume": ..., "job_description": ..., "relevant": true|false}
+    --source db     evaluated applications; relevant when the LLM overall_score
+                    is at least --relevant-score (resumes are downloaded, so
+                    use --limit)
+
+Similarities use resume_index.get_embeddings(), i.e. EMBEDDING_BACKEND and
+the embedding cache, exactly as prescreen.screen() does.
+
+Usage:
+    python benchmarks/prescreen_threshold.py --labels data/prescreen_labels.jsonl
+    python benchmarks/prescreen_threshold.py --source db --limit 500 --relevant-score 70
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+sys.path.insert(0, '.')
+
+import prescreen
+import resume_index
+from converter import extract_text_from_pdf_bytes
+from db import get_db_session
+from models import JobApplication
+
+
+def labelled_file(path: str) -> list[tuple[str, str, bool]]:
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["resume"], row["job_description"], bool(row["relevant"])) for row in rows]
+
+
+def labelled_db(limit: int, relevant_score: int) -> list[tuple[str, str, bool]]:
+    import file_storage
+
+    with get_db_session() as db:
+        applications = db.scalars(select(JobApplication)
+                                  .options(joinedload(JobApplication.job_post))
+                                  .filter(JobApplication.overall_score.is_not(None))
+                                  .order_by(JobApplication.id.desc())
+                                  .limit(limit)).all()
+        rows = []
+        for application in applications:
+            text = extract_text_from_pdf_bytes(file_storage.download_file(application.resume_url))
+            rows.append((text, application.job_post.description, application.overall_score >= relevant_score))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", default=None)
+    parser.add_argument("--source", choices=["file", "db"], default="file")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--relevant-score", type=int, default=70)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=None,
+                        help="defaults to 0.00 to 0.80 in steps of 0.05")
+    parser.add_argument("--max-false-negative-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    if args.source == "db":
+        rows = labelled_db(args.limit, args.relevant_score)
+    elif args.labels:
+        rows = labelled_file(args.labels)
+    else:
+        sys.exit("Pass --labels FILE or --source db")
+    if not rows:
+        sys.exit("The labelled set is empty")
+
+    embeddings = resume_index.get_embeddings()
+    # Descriptions repeat across applications; embed each once
+    descriptions = sorted({description for _, description, _ in rows})
+    description_vectors = dict(zip(descriptions, embeddings.embed_documents(descriptions)))
+    resume_vectors = embeddings.embed_documents([resume for resume, _, _ in rows])
+    similarities = [prescreen.cosine_similarity(resume_vector, description_vectors[description])
+                    for resume_vector, (_, description, _) in zip(resume_vectors, rows)]
+    relevant = [label for _, _, label in rows]
+
+    thresholds = args.thresholds or [round(t, 2) for t in np.arange(0.0, 0.81, 0.05)]
+    report = prescreen.threshold_report(similarities, relevant, thresholds)
+    print(f"{len(rows)} applications, {sum(relevant)} relevant:")
+    print(f"  {'threshold':>9} {'LLM calls saved':>16} {'false negatives':>16}")
+    for row in report:
+        print(f"  {row['threshold']:>9.2f} {row['calls_saved']:>6} ({row['calls_saved_rate']:6.1%}) "
+              f"{row['false_negatives']:>6} ({row['false_negative_rate']:6.1%})")
+    suggested = prescreen.suggest_threshold(report, args.max_false_negative_rate)
+    if suggested is None:
+        print(f"No threshold keeps false negatives within {args.max_false_negative_rate:.1%}")
+    else:
+        print(f"Suggested threshold: {suggested:.2f} (false negatives <= {args.max_false_negative_rate:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: mapping extracted skills to taxonomy topics
+
+Builds a synthetic taxonomy with N topics (3 aliases each) and times mapping a
+batch of extracted skills with SkillTaxonomy against the old nested
+substring loop from screening_agent._extract_skills.
+
+Usage:
+    python benchmarks/skill_taxonomy.py --topics 10000 --skills 1000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from skill_taxonomy import SkillTaxonomy
+
+WORDS = [
+    "cloud", "data", "stream", "graph", "query", "cache", "queue", "mesh", "edge", "vector",
+    "batch", "search", "model", "secure", "mobile", "web", "api", "test", "infra", "ops",
+]
+
+
+def build_topics(count: int, rng: random.Random) -> list[dict]:
+    return [{"name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+             "aliases": [f"{rng.choice(WORDS)}{i}", f"{rng.choice(WORDS)} {rng.choice(WORDS)} tool {i}", f"t{i}x"]}
+            for i in range(count)]
+
+
+def substring_match(extracted_skills: list[str], available_skills: list[str]) -> list[str]:
+    skills = []
+    for skill in extracted_skills:
+        skill_lower = skill.lower()
+        for available in available_skills:
+            if available in skill_lower or skill_lower in available:
+                skills.append(available)
+                break
+    return skills
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=10000)
+    parser.add_argument("--skills", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    topics = build_topics(args.topics, rng)
+
+    start = time.perf_counter()
+    taxonomy = SkillTaxonomy(topics)
+    print(f"Built taxonomy of {len(taxonomy)} topics in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    # Half the queries hit an alias inside a longer phrase, half miss entirely
+    queries = []
+    for i in range(args.skills):
+        topic = rng.choice(topics)
+        if i % 2:
+            queries.append(f"experience with {rng.choice(topic['aliases'])} in production")
+        else:
+            queries.append(f"unknown skill {i}")
+
+    start = time.perf_counter()
+    taxonomy.match_all(queries)
+    indexed = time.perf_counter() - start
+
+    available = [topic["name"].lower() for topic in topics]
+    start = time.perf_counter()
+    substring_match(queries, available)
+    substring = time.perf_counter() - start
+
+    print(f"{args.skills} skills against {args.topics} topics:")
+    print(f"  taxonomy index   {indexed * 1000:8.1f}ms  ({indexed / args.skills * 1e6:.1f}us/skill)")
+    print(f"  substring loop   {substring * 1000:8.1f}ms  ({substring / args.skills * 1e6:.1f}us/skill)")
+
+
+if __name__ == "__main__":
+    main()
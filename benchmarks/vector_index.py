@@ -0,0 +1,108 @@
+"""
+Benchmark: local vector index against Qdrant
+
+Loads N clustered, normalised random vectors into each backend and runs the
+same queries against all of them. Reports build time, query latency and
+recall@k against the exact answer:
+
+- local exact    LocalVectorClient below its HNSW threshold (NumPy scan)
+- local hnsw     LocalVectorClient with the HNSW graph
+- qdrant memory  qdrant-client's in-process mode (QdrantClient(":memory:"))
+- qdrant server  only with --qdrant-url (a throwaway collection is created)
+
+The pure Python HNSW build is slow (minutes at 100k); use --size to try
+smaller sets first.
+
+Usage:
+    python benchmarks/vector_index.py --size 100000 --dimensions 128 --queries 200
+    python benchmarks/vector_index.py --qdrant-url http://localhost:6333
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+sys.path.insert(0, '.')
+
+from vector_index import LocalVectorClient, exact_search
+
+COLLECTION_NAME = "vector_index_benchmark"
+UPSERT_BATCH_SIZE = 1000
+
+
+def clustered_vectors(count: int, dimensions: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.normal(size=(max(1, count // 1000), dimensions))
+    vectors = centers[rng.integers(0, len(centers), count)] + rng.normal(scale=0.6, size=(count, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def load(client, vectors: np.ndarray) -> float:
+    if client.collection_exists(COLLECTION_NAME):
+        client.delete_collection(COLLECTION_NAME)
+    client.create_collection(COLLECTION_NAME, vectors_config=VectorParams(size=vectors.shape[1],
+                                                                          distance=Distance.COSINE))
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), UPSERT_BATCH_SIZE):
+        client.upsert(COLLECTION_NAME, points=[PointStruct(id=offset + i, vector=vector.tolist())
+                                               for i, vector in enumerate(vectors[offset:offset + UPSERT_BATCH_SIZE])],
+                      wait=True)
+    return time.perf_counter() - start
+
+
+def run_queries(client, queries: np.ndarray, truth: list[set], k: int) -> tuple[list[float], float]:
+    latencies, recall = [], 0.0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        points = client.query_points(COLLECTION_NAME, query=query.tolist(), limit=k, with_payload=False).points
+        latencies.append(time.perf_counter() - start)
+        recall += len(expected & {point.id for point in points}) / k
+    return latencies, recall / len(queries)
+
+
+def report(name: str, build: float, latencies: list[float], recall: float):
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2] * 1000
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+    print(f"  {name:14} build {build:8.1f}s  p50 {p50:7.2f}ms  p95 {p95:7.2f}ms  recall {recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--dimensions", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--qdrant-url", default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vectors = clustered_vectors(args.size, args.dimensions, rng)
+    queries = vectors[rng.integers(0, args.size, args.queries)] + rng.normal(scale=0.1, size=(args.queries,
+                                                                                              args.dimensions))
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+    truth = [{row for _, row in exact_search(vectors, query, args.k)} for query in queries]
+
+    backends = [
+        ("local exact", LocalVectorClient(hnsw_min_points=args.size + 1)),
+        ("local hnsw", LocalVectorClient(hnsw_min_points=0)),
+        ("qdrant memory", QdrantClient(":memory:")),
+    ]
+    if args.qdrant_url:
+        backends.append(("qdrant server", QdrantClient(url=args.qdrant_url)))
+
+    print(f"{args.size} vectors x {args.dimensions} dims, {args.queries} queries, recall@{args.k}:")
+    for name, client in backends:
+        build = load(client, vectors)
+        latencies, recall = run_queries(client, queries, truth, args.k)
+        report(name, build, latencies, recall)
+        if name == "qdrant server":
+            client.delete_collection(COLLECTION_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+BM25 sparse vectors for lexical resume matching.
+
+Dense embeddings blur exact requirements: a resume mentioning "CKA" or
+"Terraform" is not necessarily closer to a job post asking for them. The
+sparse side of hybrid search (see resume_index.recommend_candidates) scores
+exact terms instead.
+
+Documents are encoded locally at ingest time: each term gets the BM25
+term-frequency weight for that document. Queries weigh each distinct term 1.
+The collection's sparse vector uses Qdrant's IDF modifier, so the inverse
+document frequency is applied at search time from live collection
+statistics and the stored vectors never need re-encoding as the corpus grows.
+"""
+
+import hashlib
+from collections import Counter
+
+from qdrant_client.http.models import SparseVector
+
+from skill_taxonomy import tokenize
+
+K1 = 1.2
+B = 0.75
+# Typical resume length in tokens; BM25 normalises term frequency against it
+AVERAGE_DOCUMENT_TOKENS = 600
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does doing
+during each few for from had has have having he her here hers him his how i if in into is it its itself
+just me more most my no nor not now of off on once only or other our ours out over own same she should so
+some such than that the their theirs them then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your yours
+""".split())
+
+
+def token_id(token: str) -> int:
+    """Stable 32-bit id of a term (sparse vector indices are u32)"""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def terms(text: str) -> list[str]:
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+
+def _sparse(weights: dict[int, float]) -> SparseVector:
+    indices = sorted(weights)
+    return SparseVector(indices=indices, values=[weights[index] for index in indices])
+
+
+def document_vector(text: str, average_length: int = AVERAGE_DOCUMENT_TOKENS) -> SparseVector:
+    document_terms = terms(text)
+    length_norm = K1 * (1 - B + B * len(document_terms) / average_length)
+    weights: dict[int, float] = {}
+    for term, frequency in Counter(document_terms).items():
+        index = token_id(term)
+        # Two terms may share an id; their weights add up, as in feature hashing
+        weights[index] = weights.get(index, 0.0) + frequency * (K1 + 1) / (frequency + length_norm)
+    return _sparse(weights)
+
+
+def query_vector(text: str) -> SparseVector:
+    return _sparse({token_id(term): 1.0 for term in set(terms(text))})
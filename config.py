@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import AnyUrl
-from typing import Optional
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: AnyUrl
@@ -14,6 +14,32 @@ class Settings(BaseSettings):
     IS_CI: bool = False
     TEST_DATABASE_URL: Optional[str] = None
     BRAINTRUST_API_KEY: str
+    # OpenAI-compatible Chat Completions server for the interview agents
+    # (e.g. benchmarks/fake_openai.py for load tests). Defaults to OpenAI.
+    INTERVIEW_MODEL_BASE_URL: Optional[str] = None
+    # Pin the Braintrust check_answer prompt to a version; None follows the latest
+    CHECK_ANSWER_PROMPT_VERSION: Optional[str] = None
+    # Qdrant for resume embeddings; without QDRANT_URL a local store in qdrant_store/ is used
+    QDRANT_URL: Optional[AnyUrl] = None
+    QDRANT_API_KEY: Optional[str] = None
+    # Resume embedding size (text-embedding-3 shortens natively, up to 3072) and
+    # how Qdrant stores the vectors: int8 ("scalar") or 1-bit ("binary") codes in
+    # RAM with the originals on disk for re-scoring
+    RESUME_EMBEDDING_DIMENSIONS: int = 3072
+    RESUME_VECTOR_QUANTIZATION: Literal["none", "scalar", "binary"] = "none"
+    # "local" keeps resume vectors in process (vector_index.py) instead of Qdrant
+    VECTOR_BACKEND: Literal["qdrant", "local"] = "qdrant"
+    # "hashing" embeds resumes locally and deterministically, without OpenAI
+    EMBEDDING_BACKEND: Literal["openai", "hashing"] = "openai"
+    # Resume/description embedding similarity below which applications skip the
+    # LLM evaluation, for job posts without their own threshold. None evaluates
+    # every application (tune with benchmarks/prescreen_threshold.py)
+    PRESCREEN_DEFAULT_THRESHOLD: Optional[float] = None
+    # LLM call deadline, hedging after the p95 latency, and the model each
+    # model fails over to while its circuit breaker is open (llm_resilience.py)
+    LLM_TIMEOUT_SECONDS: float = 60
+    LLM_HEDGING: bool = False
+    LLM_FALLBACK_MODELS: dict[str, str] = {"gpt-4o-mini": "gpt-4.1-mini", "gpt-4.1": "gpt-4o"}
 
     class Config:
         env_file = ".env"
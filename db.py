@@ -1,11 +1,21 @@
+from functools import lru_cache
 from sqlalchemy import create_engine
 from config import settings
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
+# One pooled engine per process; creating an engine per request threw the
+# connection pool away every time.
+@lru_cache(maxsize=None)
+def get_engine():
+  return create_engine(str(settings.DATABASE_URL), echo=not settings.PRODUCTION, pool_pre_ping=True)
+
+def get_db_session():
+  """Create a session outside of a request (tools, background jobs, scripts)"""
+  return sessionmaker(bind=get_engine())()
+
 def get_db():
-  engine = create_engine(str(settings.DATABASE_URL), echo=not settings.PRODUCTION)
-  db = sessionmaker(bind=engine)()
+  db = sessionmaker(bind=get_engine())()
   try:
       yield db
   finally:
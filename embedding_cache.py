@@ -0,0 +1,80 @@
+"""
+Embeddings cached in Postgres by model and content hash.
+
+CachedEmbeddings wraps any LangChain Embeddings. Texts are keyed on the
+sha256 of their content within a namespace of "<model>:<dimensions>", so
+re-embedding identical text (a re-uploaded resume, a re-run backfill) costs
+one indexed lookup instead of a provider call, and switching model or
+dimensions never returns a stale vector. Misses are embedded in
+provider-sized batches.
+"""
+
+import hashlib
+from array import array
+
+from langchain_core.embeddings import Embeddings
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from db import get_db_session
+from models import EmbeddingCacheEntry
+
+# Texts per embeddings request; resumes are ~1-2k tokens, well inside the provider limits
+EMBED_BATCH_SIZE = 64
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(data: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+
+    def __init__(self, underlying: Embeddings, model: str, dimensions: int,
+                 session_factory=get_db_session, batch_size: int = EMBED_BATCH_SIZE):
+        self.underlying = underlying
+        self.namespace = f"{model}:{dimensions}"
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, db, hashes: list[str]) -> dict[str, list[float]]:
+        rows = db.execute(select(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding)
+                          .filter(tuple_(EmbeddingCacheEntry.namespace, EmbeddingCacheEntry.content_hash)
+                                  .in_([(self.namespace, h) for h in hashes])))
+        return {row.content_hash: _unpack(row.embedding) for row in rows}
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [content_hash(text) for text in texts]
+        unique = dict(zip(hashes, texts))
+
+        with self._session_factory() as db:
+            vectors = self._load(db, list(unique)) if unique else {}
+            missing = [h for h in unique if h not in vectors]
+            self.hits += len(unique) - len(missing)
+            self.misses += len(missing)
+
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                embedded = self.underlying.embed_documents([unique[h] for h in batch])
+                db.execute(insert(EmbeddingCacheEntry)
+                           .values([{"namespace": self.namespace, "content_hash": h, "embedding": _pack(vector)}
+                                    for h, vector in zip(batch, embedded)])
+                           .on_conflict_do_nothing())
+                db.commit()
+                vectors.update(zip(batch, embedded))
+
+        return [vectors[h] for h in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
@@ -1,4 +1,5 @@
 import os
+import httpx
 from supabase import create_client, Client
 from config import settings
 
@@ -17,3 +18,12 @@ def upload_file(bucket_name, path, contents, content_type):
     with open(file_path, 'wb') as f:
       f.write(contents)
     return f"/{dir_path}/{path}"
+
+def download_file(file_url):
+  """Read back a file stored by upload_file, given the URL it returned"""
+  if file_url.startswith("http"):
+    response = httpx.get(file_url, timeout=30)
+    response.raise_for_status()
+    return response.content
+  with open(file_url.lstrip("/"), 'rb') as f:
+    return f.read()
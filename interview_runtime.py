@@ -0,0 +1,166 @@
+"""
+Async runtime for screening interviews served over the network.
+
+Each connected candidate gets an InterviewConversation. Turns are driven with
+Runner.run_streamed so text deltas reach the client as the model produces
+them, and because all tools are coroutines (see screening_agent.py) a single
+worker can multiplex many interviews on one event loop.
+"""
+
+import asyncio
+import time
+import weakref
+from typing import AsyncIterator, Optional
+
+from agents import Agent, RunConfig, Runner, set_default_openai_key
+from agents.models.openai_provider import OpenAIProvider
+from openai import AsyncOpenAI
+from openai.types.responses import ResponseTextDeltaEvent
+
+import llm_resilience
+import metrics
+import interview_store
+from config import settings
+from db import get_db_session
+from interview_store import PostgresSession
+from screening_agent import ORCHESTRATOR_USER_PROMPT, build_interview_agents
+from transcript_writer import transcript_writer
+
+MAX_TURNS = 20
+
+
+# Models behind INTERVIEW_MODEL_BASE_URL are not OpenAI's: they get breakers of
+# their own and no LLM_FALLBACK_MODELS, which the custom server may not serve
+custom_model_policy = llm_resilience.ResiliencePolicy(deadline=settings.LLM_TIMEOUT_SECONDS,
+                                                      hedging=settings.LLM_HEDGING)
+
+_run_configs: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, RunConfig]" = weakref.WeakKeyDictionary()
+
+
+def build_run_config() -> RunConfig:
+    # Model calls go through llm_resilience (deadlines, breaker, fallback model)
+    if settings.INTERVIEW_MODEL_BASE_URL:
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.INTERVIEW_MODEL_BASE_URL,
+                             max_retries=llm_resilience.MAX_RETRIES,
+                             http_client=llm_resilience.async_http_client(custom_model_policy))
+        provider = OpenAIProvider(openai_client=client, use_responses=False)
+        return RunConfig(model_provider=provider, tracing_disabled=True)
+    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=llm_resilience.MAX_RETRIES,
+                         http_client=llm_resilience.async_http_client())
+    return RunConfig(model_provider=OpenAIProvider(openai_client=client))
+
+
+def interview_run_config() -> RunConfig:
+    """
+    The run config shared by the interviews on the running event loop, so they
+    share one client and connection pool instead of leaking one per interview.
+    Built once per loop, as an async client is tied to the loop that first uses it.
+    """
+    loop = asyncio.get_running_loop()
+    run_config = _run_configs.get(loop)
+    if run_config is None:
+        run_config = _run_configs[loop] = build_run_config()
+    return run_config
+
+
+async def authorize_interview(session_id: str, job_id: int, job_application_id: int, token: str) -> bool:
+    """Check the candidate's interview token before the WebSocket is accepted"""
+    def check():
+        with get_db_session() as db:
+            return interview_store.authorize_interview(db, session_id, job_id, job_application_id, token)
+    return await asyncio.to_thread(check)
+
+
+def log_turn_usage(session_id: str, result):
+    """Log the tokens a turn sent and received; input tokens track how much history is replayed"""
+    usage = result.context_wrapper.usage
+    print(f"Interview {session_id} turn: {usage.requests} requests, "
+          f"{usage.input_tokens} input tokens, {usage.output_tokens} output tokens")
+    metrics.observe("interview_turn_input_tokens", usage.input_tokens)
+    metrics.observe("interview_turn_output_tokens", usage.output_tokens)
+
+
+def find_agent(orchestrator: Agent, name: str) -> Agent:
+    """The agent called name among the orchestrator and the agents it hands off to"""
+    for agent in (orchestrator, *orchestrator.handoffs):
+        if agent.name == name:
+            return agent
+    return orchestrator
+
+
+class InterviewConversation:
+    """One candidate's interview: the active agent plus the persisted session"""
+
+    def __init__(self, session_id: str, job_id: int, run_config: RunConfig = None,
+                 job_application_id: Optional[int] = None):
+        set_default_openai_key(settings.OPENAI_API_KEY)
+        self.session_id = session_id
+        self.job_id = job_id
+        self.job_application_id = job_application_id
+        self.agent: Agent = build_interview_agents()
+        self.session = PostgresSession(session_id, writer=transcript_writer)
+        self.run_config = run_config or interview_run_config()
+
+    def _start(self) -> bool:
+        with get_db_session() as db:
+            if self.job_application_id is not None:
+                interview_store.link_job_application(db, self.session_id, self.job_id, self.job_application_id)
+            active_agent = interview_store.start_or_resume(db, self.session_id, self.agent.name)
+        if active_agent is None:
+            return False
+        self.agent = find_agent(self.agent, active_agent)
+        return True
+
+    def _set_active_agent(self):
+        with get_db_session() as db:
+            interview_store.set_active_agent(db, self.session_id, self.agent.name)
+
+    def _save_result(self):
+        transcript_writer.flush()
+        with get_db_session() as db:
+            interview_store.save_result(db, self.session_id)
+
+    async def start(self) -> bool:
+        """
+        Link the interview to the candidate's job application, if known.
+        Returns True when the session already has a conversation: the
+        candidate reconnected, so the interview carries on with the agent it
+        was with instead of sending the opening message again.
+        """
+        return await asyncio.to_thread(self._start)
+
+    async def end(self, completed: bool):
+        """Flush the transcript; a completed interview also gets its result recorded"""
+        if completed:
+            await asyncio.to_thread(self._save_result)
+        else:
+            await asyncio.to_thread(transcript_writer.flush)
+
+    def opening_message(self) -> str:
+        return ORCHESTRATOR_USER_PROMPT.format(job_id=self.job_id, session_id=self.session_id)
+
+    async def stream_turn(self, user_input: str) -> AsyncIterator[dict]:
+        """Run one turn, yielding token, agent-change and turn-complete events"""
+        start = time.perf_counter()
+        first_token = True
+        result = Runner.run_streamed(self.agent, user_input,
+                                     session=self.session,
+                                     max_turns=MAX_TURNS,
+                                     run_config=self.run_config)
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                if first_token:
+                    metrics.observe("interview_time_to_first_token_seconds", time.perf_counter() - start)
+                    first_token = False
+                yield {"type": "token", "delta": event.data.delta}
+            elif event.type == "agent_updated_stream_event":
+                yield {"type": "agent", "name": event.new_agent.name}
+
+        # The evaluator may have handed off mid-turn; the next turn continues with it
+        if result.last_agent.name != self.agent.name:
+            self.agent = result.last_agent
+            await asyncio.to_thread(self._set_active_agent)
+        metrics.observe("interview_turn_seconds", time.perf_counter() - start)
+        metrics.increment("interview_turns")
+        log_turn_usage(self.session_id, result)
+        yield {"type": "turn_complete", "output": str(result.final_output)}
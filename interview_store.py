@@ -0,0 +1,329 @@
+"""
+Postgres-backed state for screening interviews.
+
+Skills, per-skill results and the agents' conversation items all live in the
+database, so any worker can serve any turn of any interview and nothing is
+lost on restart. Writes that read-modify-write a session take a row lock on
+its interview_sessions row (SELECT ... FOR UPDATE), which serialises
+concurrent tool calls for the same interview without blocking other ones.
+"""
+
+import asyncio
+import hashlib
+import secrets
+import uuid
+from typing import Optional
+
+from agents.items import TResponseInputItem
+from agents.memory.session import SessionABC
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+import question_bank
+from db import get_db_session
+from models import (InterviewResult, InterviewSession, InterviewSessionItem, InterviewSkillEvaluation,
+                    JobApplication, JobPost)
+from transcript_writer import TranscriptWriter
+
+
+def hash_interview_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def new_interview_token() -> tuple[str, str]:
+    """A candidate's interview token and the hash stored on their job application"""
+    token = secrets.token_urlsafe(24)
+    return token, hash_interview_token(token)
+
+
+def authorize_interview(db: Session, session_id: str, job_id: int, job_application_id: int, token: str) -> bool:
+    """
+    Whether the token lets its candidate interview for job_id in this session:
+    the application must belong to the open job post and hold the token, and
+    an existing session must already be linked to that application.
+    """
+    token_hash = db.scalar(select(JobApplication.interview_token_hash)
+                           .join(JobPost, JobApplication.job_post_id == JobPost.id)
+                           .filter(JobApplication.id == job_application_id)
+                           .filter(JobApplication.job_post_id == job_id)
+                           .filter(JobPost.is_open))
+    if token_hash is None or not secrets.compare_digest(token_hash, hash_interview_token(token)):
+        return False
+    interview_session = db.get(InterviewSession, session_id)
+    return interview_session is None or interview_session.job_application_id == job_application_id
+
+
+def _lock_session(db: Session, session_id: str) -> InterviewSession:
+    """Create the interview session if needed and lock its row until commit"""
+    db.execute(insert(InterviewSession)
+               .values(id=session_id, skills=[])
+               .on_conflict_do_nothing(index_elements=[InterviewSession.id]))
+    return db.scalars(select(InterviewSession)
+                      .filter(InterviewSession.id == session_id)
+                      .with_for_update()).one()
+
+
+def set_skills(db: Session, session_id: str, skills: list[str], job_post_id: Optional[int] = None):
+    interview_session = _lock_session(db, session_id)
+    interview_session.skills = skills
+    if job_post_id is not None:
+        interview_session.job_post_id = job_post_id
+    db.commit()
+
+
+def add_evaluation(db: Session, session_id: str, skill: str, passed: bool):
+    """Record the result for a skill. A repeated call for the same skill is ignored."""
+    _lock_session(db, session_id)
+    already_evaluated = db.scalar(select(InterviewSkillEvaluation.id)
+                                  .filter(InterviewSkillEvaluation.session_id == session_id)
+                                  .filter(InterviewSkillEvaluation.skill == skill))
+    if already_evaluated is None:
+        # Everything said so far belongs to finished skills and can be summarised
+        last_item_id = db.scalar(select(func.max(InterviewSessionItem.id))
+                                 .filter(InterviewSessionItem.session_id == session_id))
+        db.add(InterviewSkillEvaluation(session_id=session_id, skill=skill, passed=passed,
+                                        last_item_id=last_item_id))
+    db.commit()
+
+
+def ask_question(db: Session, session_id: str, topic: str, difficulty: str,
+                 tag: Optional[str] = None, max_per_topic: Optional[int] = None) -> Optional[question_bank.Question]:
+    """
+    Pick a question this session has not been asked yet and record it as
+    asked. Returns None when the topic has run out of questions, or when the
+    session was already asked max_per_topic questions about it.
+    """
+    interview_session = _lock_session(db, session_id)
+    bank = question_bank.get_question_bank()
+    if max_per_topic is not None:
+        asked_for_topic = sum(1 for question_id in interview_session.asked_question_ids
+                              if question_id in bank.by_id and bank.by_id[question_id].topic.lower() == topic.lower())
+        if asked_for_topic >= max_per_topic:
+            db.commit()
+            return None
+    question = bank.sample(topic, difficulty, exclude=interview_session.asked_question_ids, tag=tag)
+    if question is not None:
+        interview_session.asked_question_ids = [*interview_session.asked_question_ids, question.id]
+    db.commit()
+    return question
+
+
+def get_asked_question_ids(db: Session, session_id: str) -> list[str]:
+    interview_session = db.get(InterviewSession, session_id)
+    return list(interview_session.asked_question_ids) if interview_session else []
+
+
+def get_evaluations(db: Session, session_id: str) -> list[tuple[str, bool]]:
+    rows = db.execute(select(InterviewSkillEvaluation.skill, InterviewSkillEvaluation.passed)
+                      .filter(InterviewSkillEvaluation.session_id == session_id)
+                      .order_by(InterviewSkillEvaluation.id))
+    return [(row.skill, row.passed) for row in rows]
+
+
+def get_next_skill(db: Session, session_id: str) -> Optional[str]:
+    """Return the first extracted skill without a result, or None when all are done"""
+    interview_session = db.get(InterviewSession, session_id)
+    if interview_session is None:
+        return None
+    evaluated_skills = {skill for skill, _ in get_evaluations(db, session_id)}
+    return next((skill for skill in interview_session.skills if skill not in evaluated_skills), None)
+
+
+def get_state(db: Session, session_id: str) -> dict:
+    interview_session = db.get(InterviewSession, session_id)
+    return {
+        "skills": interview_session.skills if interview_session else [],
+        "evaluation": get_evaluations(db, session_id),
+    }
+
+
+def link_job_application(db: Session, session_id: str, job_id: int, job_application_id: int):
+    """
+    Attach the interview to the candidate's application, whose results then
+    show under it. Raises ValueError if the application is not for job_id or
+    the session already belongs to another application.
+    """
+    application_post_id = db.scalar(select(JobApplication.job_post_id)
+                                    .filter(JobApplication.id == job_application_id))
+    if application_post_id is None or application_post_id != job_id:
+        raise ValueError(f"JobApplication #{job_application_id} is not an application for JobPost #{job_id}")
+    interview_session = _lock_session(db, session_id)
+    if interview_session.job_application_id not in (None, job_application_id):
+        db.rollback()
+        raise ValueError(f"Interview session {session_id} belongs to another job application")
+    interview_session.job_application_id = job_application_id
+    interview_session.job_post_id = job_id
+    db.commit()
+
+
+def start_or_resume(db: Session, session_id: str, agent_name: str) -> Optional[str]:
+    """
+    Return the agent an interview that already started is with, or record
+    agent_name as the first one and return None for a new interview.
+    """
+    interview_session = _lock_session(db, session_id)
+    active_agent = interview_session.active_agent
+    if active_agent is None:
+        interview_session.active_agent = agent_name
+    db.commit()
+    return active_agent
+
+
+def set_active_agent(db: Session, session_id: str, agent_name: str):
+    db.execute(update(InterviewSession)
+               .where(InterviewSession.id == session_id)
+               .values(active_agent=agent_name))
+    db.commit()
+
+
+def save_result(db: Session, session_id: str):
+    """Record (or refresh) the interview outcome from the per-skill evaluations"""
+    interview_session = db.get(InterviewSession, session_id)
+    if interview_session is None:
+        return
+    evaluations = get_evaluations(db, session_id)
+    values = {
+        "job_application_id": interview_session.job_application_id,
+        "job_post_id": interview_session.job_post_id,
+        "skills_passed": sum(passed for _, passed in evaluations),
+        "skills_total": len(interview_session.skills),
+        "evaluation": [{"skill": skill, "passed": passed} for skill, passed in evaluations],
+    }
+    db.execute(insert(InterviewResult)
+               .values(session_id=session_id, **values)
+               .on_conflict_do_update(index_elements=[InterviewResult.session_id],
+                                      set_={**values, "completed_at": func.now()}))
+    db.commit()
+
+
+def get_job_application_interviews(db: Session, job_application_id: int) -> list[dict]:
+    """Results and full transcripts of a job application's interviews"""
+    interviews = []
+    for result in db.scalars(select(InterviewResult)
+                             .filter(InterviewResult.job_application_id == job_application_id)
+                             .order_by(InterviewResult.id)):
+        transcript = db.scalars(select(InterviewSessionItem.item)
+                                .filter(InterviewSessionItem.session_id == result.session_id)
+                                .order_by(InterviewSessionItem.id))
+        interviews.append({
+            "session_id": result.session_id,
+            "job_post_id": result.job_post_id,
+            "skills_passed": result.skills_passed,
+            "skills_total": result.skills_total,
+            "evaluation": result.evaluation,
+            "completed_at": result.completed_at,
+            "transcript": list(transcript),
+        })
+    return interviews
+
+
+def skills_summary_item(evaluations: list[tuple[str, bool]]) -> TResponseInputItem:
+    """Compact stand-in for the conversation of skills that are already evaluated"""
+    results = "; ".join(f"{skill}: {'passed' if passed else 'failed'}" for skill, passed in evaluations)
+    return {
+        "role": "system",
+        "content": f"Earlier conversation summarised. Skills already evaluated and saved: {results}. "
+                   "Do not evaluate these again; continue with the next skill.",
+    }
+
+
+class PostgresSession(SessionABC):
+    """Agents SDK session storing conversation items in interview_session_items.
+
+    Drop-in replacement for SQLiteSession. The SDK calls these methods from the
+    event loop, so the blocking SQLAlchemy work runs in a worker thread.
+
+    With compact_completed_skills (the default) the history handed to the
+    model is bounded: the opening message, one summary item for every skill
+    already evaluated, and the active skill's segment verbatim. The full
+    transcript stays in the table.
+    """
+
+    def __init__(self, session_id: str, session_factory=get_db_session, compact_completed_skills: bool = True,
+                 writer: Optional[TranscriptWriter] = None):
+        self.session_id = session_id
+        self._session_factory = session_factory
+        self.compact_completed_skills = compact_completed_skills
+        self._writer = writer
+
+    def _get_items(self, limit: Optional[int]) -> list[TResponseInputItem]:
+        # Snapshot the write-behind buffer first: a record flushed after this
+        # point is found in the table and de-duplicated by its UUID below.
+        pending = self._writer.pending_records(self.session_id) if self._writer else []
+        with self._session_factory() as db:
+            query = select(InterviewSessionItem.item_uuid, InterviewSessionItem.item) \
+                .filter(InterviewSessionItem.session_id == self.session_id)
+            boundary = None
+            if self.compact_completed_skills:
+                boundary = db.scalar(select(func.max(InterviewSkillEvaluation.last_item_id))
+                                     .filter(InterviewSkillEvaluation.session_id == self.session_id))
+
+            if boundary is None:
+                head = []
+                if limit is None:
+                    rows = list(db.execute(query.order_by(InterviewSessionItem.id)))
+                else:
+                    rows = list(reversed(list(db.execute(query.order_by(InterviewSessionItem.id.desc()).limit(limit)))))
+            else:
+                # The opening message carries the session and job ids the agents need
+                opening = db.scalar(select(InterviewSessionItem.item)
+                                    .filter(InterviewSessionItem.session_id == self.session_id)
+                                    .order_by(InterviewSessionItem.id)
+                                    .limit(1))
+                head = [opening, skills_summary_item(get_evaluations(db, self.session_id))]
+                rows = list(db.execute(query.filter(InterviewSessionItem.id > boundary)
+                                       .order_by(InterviewSessionItem.id)))
+
+        stored = {row.item_uuid for row in rows}
+        items = head + [row.item for row in rows] + \
+            [record["item"] for record in pending if uuid.UUID(record["item_uuid"]) not in stored]
+        return items if limit is None else items[-limit:]
+
+    def _add_items(self, items: list[TResponseInputItem]):
+        with self._session_factory() as db:
+            db.execute(insert(InterviewSession)
+                       .values(id=self.session_id, skills=[])
+                       .on_conflict_do_nothing(index_elements=[InterviewSession.id]))
+            db.add_all([InterviewSessionItem(session_id=self.session_id, item=item) for item in items])
+            db.commit()
+
+    def _pop_item(self) -> Optional[TResponseInputItem]:
+        with self._session_factory() as db:
+            latest_id = select(InterviewSessionItem.id) \
+                .filter(InterviewSessionItem.session_id == self.session_id) \
+                .order_by(InterviewSessionItem.id.desc()) \
+                .limit(1) \
+                .scalar_subquery()
+            item = db.scalar(delete(InterviewSessionItem)
+                             .where(InterviewSessionItem.id == latest_id)
+                             .returning(InterviewSessionItem.item))
+            db.commit()
+            return item
+
+    def _clear_session(self):
+        with self._session_factory() as db:
+            db.execute(delete(InterviewSessionItem).where(InterviewSessionItem.session_id == self.session_id))
+            db.commit()
+
+    async def get_items(self, limit: Optional[int] = None) -> list[TResponseInputItem]:
+        return await asyncio.to_thread(self._get_items, limit)
+
+    async def add_items(self, items: list[TResponseInputItem]) -> None:
+        if not items:
+            return
+        if self._writer:
+            # Only a local journal append; the database insert happens in the writer's thread
+            self._writer.add(self.session_id, items)
+        else:
+            await asyncio.to_thread(self._add_items, items)
+
+    async def pop_item(self) -> Optional[TResponseInputItem]:
+        if self._writer:
+            await asyncio.to_thread(self._writer.flush)
+        return await asyncio.to_thread(self._pop_item)
+
+    async def clear_session(self) -> None:
+        if self._writer:
+            await asyncio.to_thread(self._writer.flush)
+        await asyncio.to_thread(self._clear_session)
@@ -0,0 +1,180 @@
+"""
+Job description review over Server-Sent Events, with cached results.
+
+The review is ai.py's analysis -> rewrite -> finalise chain. Each stage
+needs the previous one's output, so they still run in order, but the
+finalise stage (the long one, which writes the whole description) is
+streamed to the client token by token instead of after the last stage ends.
+
+Events, each with a JSON data line:
+
+    stage   {"stage": "analysis" | "rewrite", "seconds": ...}  a stage finished
+    token   {"text": ...}                                      revised description text
+    done    {"revised_description", "overall_summary", "cached", "timings"}
+    error   {"detail": ...}
+
+Complete reviews are stored in job_description_reviews keyed on the
+description hash and ai.REVIEW_PROMPT_VERSION. A cached review is sent as a
+single token event followed by done, so clients handle both paths alike.
+Stage latencies are observed as jd_review_seconds.<stage> in /api/metrics.
+
+Concurrent cache misses on one description are single-flight: the first
+takes an advisory lock and runs the chains, the others wait and then send
+the review it stored. Within a worker they wait on an asyncio.Lock; across
+workers they poll pg_try_advisory_xact_lock, so no thread or connection is
+held while waiting. Database calls run in threads so they do not block the
+event loop, as in interview_store.PostgresSession.
+"""
+
+import asyncio
+import json
+import time
+import weakref
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+import ai
+import metrics
+from ai import ReviewedApplication
+from db import get_db_session
+from job_post_skills import description_hash
+from models import JobDescriptionReview
+
+# Third advisory lock namespace after job_post_digest.DIGEST_LOCK_NAMESPACE
+REVIEW_LOCK_NAMESPACE = 3303
+# How often a review waiting on another worker checks whether it finished
+REVIEW_LOCK_POLL_SECONDS = 0.5
+
+# Per description hash; an entry goes away once no review is waiting on it
+_review_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def get_cached_review(description: str, session_factory=get_db_session) -> Optional[ReviewedApplication]:
+    with session_factory() as db:
+        row = db.scalar(select(JobDescriptionReview)
+                        .filter(JobDescriptionReview.description_hash == description_hash(description),
+                                JobDescriptionReview.prompt_version == ai.REVIEW_PROMPT_VERSION))
+        if row is None:
+            return None
+        return ReviewedApplication(revised_description=row.revised_description,
+                                   overall_summary=row.overall_summary)
+
+
+def store_review(description: str, review: ReviewedApplication, session_factory=get_db_session):
+    with session_factory() as db:
+        db.execute(insert(JobDescriptionReview)
+                   .values(description_hash=description_hash(description),
+                           prompt_version=ai.REVIEW_PROMPT_VERSION,
+                           revised_description=review.revised_description,
+                           overall_summary=review.overall_summary)
+                   .on_conflict_do_nothing())
+        db.commit()
+
+
+def review_lock_key(description: str) -> int:
+    """The description hash folded into the signed 32-bit key pg_try_advisory_xact_lock(int, int) takes"""
+    return int(description_hash(description)[:8], 16) - 2 ** 31
+
+
+def try_lock_review(description: str, session_factory=get_db_session) -> Optional[Session]:
+    """A session holding the review lock of description until unlock_review, or None if another worker has it"""
+    db = session_factory()
+    try:
+        if db.scalar(select(func.pg_try_advisory_xact_lock(REVIEW_LOCK_NAMESPACE, review_lock_key(description)))):
+            return db
+    except Exception:
+        db.close()
+        raise
+    db.close()
+    return None
+
+
+def unlock_review(db: Session):
+    db.commit()  # ends the transaction, which releases the lock
+    db.close()
+
+
+def _observe(timings: dict, stage: str, start: float) -> float:
+    seconds = time.perf_counter() - start
+    timings[stage] = round(seconds, 3)
+    metrics.observe(f"jd_review_seconds.{stage}", seconds)
+    return seconds
+
+
+async def _lock_review(description: str, session_factory) -> Session:
+    while True:
+        lock = await asyncio.to_thread(try_lock_review, description, session_factory)
+        if lock is not None:
+            return lock
+        await asyncio.sleep(REVIEW_LOCK_POLL_SECONDS)
+
+
+async def stream_review(description: str, session_factory=get_db_session) -> AsyncIterator[str]:
+    """SSE events of a review of description, from the cache or the LLM"""
+    cached = await asyncio.to_thread(get_cached_review, description, session_factory)
+    if cached is None:
+        review_lock = _review_locks.setdefault(description_hash(description), asyncio.Lock())
+        async with review_lock:
+            lock = await _lock_review(description, session_factory)
+            try:
+                # Another request may have stored the review while we waited for the lock
+                cached = await asyncio.to_thread(get_cached_review, description, session_factory)
+                if cached is None:
+                    async for event in _run_review(description, session_factory):
+                        yield event
+                    return
+            finally:
+                await asyncio.to_thread(unlock_review, lock)
+
+    metrics.increment("jd_review.cache_hits")
+    yield sse_event("token", {"text": cached.revised_description})
+    yield sse_event("done", {**cached.model_dump(), "cached": True, "timings": {}})
+
+
+async def _run_review(description: str, session_factory) -> AsyncIterator[str]:
+    """Run the chains and store the review; called with the review lock held"""
+    metrics.increment("jd_review.cache_misses")
+
+    timings = {}
+    review_start = time.perf_counter()
+    try:
+        start = time.perf_counter()
+        analysis = await ai.analysis_chain.ainvoke({"job_description": description})
+        yield sse_event("stage", {"stage": "analysis", "seconds": _observe(timings, "analysis", start)})
+
+        start = time.perf_counter()
+        rewrite = await ai.rewrite_chain.ainvoke({"job_description": description,
+                                                  "analysis_json": analysis.model_dump_json()})
+        yield sse_event("stage", {"stage": "rewrite", "seconds": _observe(timings, "rewrite", start)})
+
+        start = time.perf_counter()
+        parts = []
+        async for text in ai.finalise_chain.astream({"job_description": description,
+                                                     "rewritten_sections_json": rewrite.model_dump_json()}):
+            if not text:
+                continue
+            if not parts:
+                _observe(timings, "first_token", review_start)
+            parts.append(text)
+            yield sse_event("token", {"text": text})
+        _observe(timings, "finalise", start)
+        _observe(timings, "total", review_start)
+    except Exception as e:
+        print(f"Job description review failed: {e}")
+        metrics.increment("jd_review.errors")
+        yield sse_event("error", {"detail": "Review failed"})
+        return
+
+    review = ReviewedApplication(revised_description="".join(parts), overall_summary=analysis.overall_summary)
+    try:
+        await asyncio.to_thread(store_review, description, review, session_factory)
+    except Exception as e:
+        print(f"Failed to cache job description review: {e}")
+    yield sse_event("done", {**review.model_dump(), "cached": False, "timings": timings})
@@ -0,0 +1,158 @@
+"""
+Requirements digest of a job post, used in place of its raw description in
+resume evaluation prompts.
+
+A post with 5,000 applicants used to send its full description 5,000 times.
+The digest (required skills, years of experience, education, ...) is
+extracted once by an LLM and stored on the JobPost with a key made of the
+description hash and DIGEST_VERSION, like the extracted skills in
+job_post_skills.py. It is refreshed in the background when a post is created,
+and re-extracted on first use after the description (or this prompt) changes.
+
+The rendered digest is deterministic text, so every evaluation for a post
+starts with the same instructions + requirements prefix. That prefix is
+below OpenAI's 1024-token prompt caching minimum, so the saving comes from
+sending fewer tokens (see ai.build_system_and_user_messages).
+"""
+
+from typing import Optional
+
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, undefer
+
+import llm_resilience
+import metrics
+from config import settings
+from db import get_db_session
+from job_post_skills import description_hash
+from models import JobPost
+
+# Bump when the prompt or the rendering changes, so stored digests are re-extracted
+DIGEST_VERSION = "1"
+# Second advisory lock namespace after job_post_skills.SKILLS_LOCK_NAMESPACE
+DIGEST_LOCK_NAMESPACE = 3302
+# Rough characters per token of English text, for savings reporting only
+CHARS_PER_TOKEN = 4
+
+
+class RequirementsDigest(BaseModel):
+    """Structured output for requirement extraction"""
+    required_skills: list[str] = Field(description="Skills, tools and technologies the job requires")
+    preferred_skills: list[str] = Field(default=[], description="Skills listed as nice to have")
+    min_years_experience: Optional[int] = Field(default=None, description="Minimum years of experience, if stated")
+    experience: Optional[str] = Field(default=None, description="Kind of experience required, in one sentence")
+    education: Optional[str] = Field(default=None, description="Required education or certifications, if any")
+    responsibilities: list[str] = Field(default=[], description="Up to 5 main responsibilities, a few words each")
+    other_requirements: list[str] = Field(default=[],
+                                          description="Other hard requirements: location, languages, clearances")
+
+
+DIGEST_EXTRACTION_PROMPT = """
+Extract the candidate requirements from this job description.
+Only include what the description states; do not invent requirements.
+Keep every item short. Leave out company background, benefits and boilerplate.
+
+{format_instructions}
+
+Job Description:
+{description}
+"""
+
+_parser = PydanticOutputParser(pydantic_object=RequirementsDigest)
+_prompt = PromptTemplate.from_template(DIGEST_EXTRACTION_PROMPT).partial(
+    format_instructions=_parser.get_format_instructions()
+)
+
+
+def digest_key(description: str) -> str:
+    return f"{DIGEST_VERSION}:{description_hash(description)}"
+
+
+def extract_digest_with_llm(description: str) -> RequirementsDigest:
+    llm = ChatOpenAI(model="gpt-4.1", temperature=0, api_key=settings.OPENAI_API_KEY,
+                     max_retries=llm_resilience.MAX_RETRIES, http_client=llm_resilience.http_client())
+    chain = _prompt | llm | _parser
+    return chain.invoke({"description": description})
+
+
+def render_digest(title: str, digest: RequirementsDigest) -> str:
+    """Stable text layout: identical digests always render identically"""
+    lines = [f"Title: {title}",
+             f"Required skills: {', '.join(digest.required_skills) or 'not stated'}"]
+    if digest.preferred_skills:
+        lines.append(f"Preferred skills: {', '.join(digest.preferred_skills)}")
+    experience = [f"{digest.min_years_experience}+ years"] if digest.min_years_experience is not None else []
+    experience += [digest.experience] if digest.experience else []
+    lines.append(f"Experience: {'; '.join(experience) or 'not stated'}")
+    lines.append(f"Education: {digest.education or 'not stated'}")
+    for heading, items in (("Responsibilities", digest.responsibilities),
+                           ("Other requirements", digest.other_requirements)):
+        if items:
+            lines.append(f"{heading}:")
+            lines += [f"- {item}" for item in items]
+    return "\n".join(lines)
+
+
+def get_job_post_digest(db: Session, job_post_id: int) -> str:
+    """Return the rendered digest of a job post, extracting it if the description changed.
+
+    Single-flight across workers through a transaction-scoped advisory lock,
+    as in job_post_skills.get_job_post_skills.
+    """
+    job_post = db.scalar(select(JobPost)
+                         .options(undefer(JobPost.requirements_digest), undefer(JobPost.requirements_digest_key))
+                         .filter(JobPost.id == job_post_id))
+    if not job_post:
+        raise ValueError(f"JobPost with id {job_post_id} not found")
+
+    key = digest_key(job_post.description)
+    if job_post.requirements_digest_key == key:
+        return job_post.requirements_digest
+
+    db.execute(select(func.pg_advisory_xact_lock(DIGEST_LOCK_NAMESPACE, job_post_id)))
+    db.refresh(job_post, ["title", "description", "requirements_digest", "requirements_digest_key"])
+    key = digest_key(job_post.description)
+    if job_post.requirements_digest_key != key:
+        job_post.requirements_digest = render_digest(job_post.title, extract_digest_with_llm(job_post.description))
+        job_post.requirements_digest_key = key
+    digest = job_post.requirements_digest
+    db.commit()
+    return digest
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def requirements_for_evaluation(job_post_id: int, description: str, session_factory=get_db_session) -> str:
+    """
+    The digest to evaluate resumes against, counting the prompt tokens it saves
+    over the raw description. Falls back to the description if the digest
+    cannot be extracted, so evaluations never wait on a retry.
+
+    Runs in a session of its own, so the post's advisory lock is released on
+    any exit instead of being held by the evaluation until it commits.
+    """
+    try:
+        with session_factory() as db:
+            digest = get_job_post_digest(db, job_post_id)
+    except Exception as e:
+        print(f"Failed to get requirements digest of JobPost #{job_post_id}: {e}")
+        metrics.increment("job_post_digest.errors")
+        return description
+    metrics.increment("resume_evaluation.description_tokens_saved",
+                      max(estimate_tokens(description) - estimate_tokens(digest), 0))
+    return digest
+
+
+def refresh_job_post_digest(job_post_id: int):
+    """Background task run when a job post is created so the first evaluation finds a warm cache"""
+    db = get_db_session()
+    try:
+        get_job_post_digest(db, job_post_id)
+    finally:
+        db.close()
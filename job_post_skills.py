@@ -0,0 +1,96 @@
+"""
+Skills extracted from job post descriptions, computed once per description.
+
+The LLM extraction result is stored on the JobPost together with a hash of
+the description it was computed from. Interviews read the cached value and
+only re-extract when the description has changed since.
+"""
+
+import hashlib
+
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, undefer
+
+import llm_resilience
+from config import settings
+from db import get_db_session
+from models import JobPost
+
+# First key of the two-key advisory lock, so these locks never collide with
+# other advisory locks keyed on job post ids.
+SKILLS_LOCK_NAMESPACE = 3301
+
+
+class ExtractedSkills(BaseModel):
+    """Structured output for skill extraction"""
+    skills: list[str] = Field(description="List of technical skills extracted from job description")
+
+
+SKILL_EXTRACTION_PROMPT = """
+Extract technical skills from this job description.
+
+Return a JSON with a "skills" field containing a list of skill names.
+Focus on: programming languages, frameworks, databases, cloud platforms.
+
+{format_instructions}
+
+Job Description:
+{description}
+"""
+
+_parser = PydanticOutputParser(pydantic_object=ExtractedSkills)
+_prompt = PromptTemplate.from_template(SKILL_EXTRACTION_PROMPT).partial(
+    format_instructions=_parser.get_format_instructions()
+)
+
+
+def description_hash(description: str) -> str:
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def extract_skills_with_llm(description: str) -> list[str]:
+    llm = ChatOpenAI(model="gpt-4.1", temperature=0, api_key=settings.OPENAI_API_KEY,
+                     max_retries=llm_resilience.MAX_RETRIES, http_client=llm_resilience.http_client())
+    chain = _prompt | llm | _parser
+    return chain.invoke({"description": description}).skills
+
+
+def get_job_post_skills(db: Session, job_post_id: int) -> list[str]:
+    """Return the cached skills for a job post, extracting them if the description changed.
+
+    Extraction is single-flight across workers: callers that miss the cache
+    queue on a transaction-scoped advisory lock for the post, and everyone
+    after the first finds the freshly stored result once the lock is released.
+    """
+    job_post = db.scalar(select(JobPost)
+                         .options(undefer(JobPost.extracted_skills), undefer(JobPost.extracted_skills_hash))
+                         .filter(JobPost.id == job_post_id))
+    if not job_post:
+        raise ValueError(f"JobPost with id {job_post_id} not found")
+
+    digest = description_hash(job_post.description)
+    if job_post.extracted_skills_hash == digest:
+        return job_post.extracted_skills
+
+    db.execute(select(func.pg_advisory_xact_lock(SKILLS_LOCK_NAMESPACE, job_post_id)))
+    db.refresh(job_post, ["description", "extracted_skills", "extracted_skills_hash"])
+    digest = description_hash(job_post.description)
+    if job_post.extracted_skills_hash != digest:
+        job_post.extracted_skills = extract_skills_with_llm(job_post.description)
+        job_post.extracted_skills_hash = digest
+    skills = job_post.extracted_skills
+    db.commit()
+    return skills
+
+
+def refresh_job_post_skills(job_post_id: int):
+    """Background task run when a job post is created so the first interview finds a warm cache"""
+    db = get_db_session()
+    try:
+        get_job_post_skills(db, job_post_id)
+    finally:
+        db.close()
@@ -0,0 +1,451 @@
+"""
+Deadlines, hedged requests and circuit breaking for every LLM call.
+
+The layer sits in the HTTP transport of the OpenAI clients (see
+http_client() and async_http_client()), so the OpenAI SDK, LangChain's
+ChatOpenAI and the Agents SDK all go through it without changing how they
+are called. Requests that name a "model" in their JSON body get:
+
+- A deadline (LLM_TIMEOUT_SECONDS). A non-streaming call that has not
+  answered by then fails with a timeout instead of blocking an evaluation
+  indefinitely, and each request it sends gets the time left as its
+  connect/read timeout so the call thread is freed too. Streams get the
+  deadline as their connect/read timeout instead.
+- Retries within that deadline. A 429, 5xx or connection error is retried
+  up to RETRIES times with exponential backoff, or after the response's
+  Retry-After, unless the wait would run past the deadline. SDK retries
+  would each start a new deadline, so clients using this layer are built
+  with max_retries=MAX_RETRIES (0) and the transport retries instead.
+- Hedging (LLM_HEDGING, non-streaming only). Once a model has enough recent
+  latencies, a call still running after their p95 is sent a second time and
+  the first good response wins; the other is dropped.
+- A circuit breaker per model. When the recent error rate (5xx, 429,
+  connection errors, timeouts) spikes, calls fail over to the model's
+  LLM_FALLBACK_MODELS entry until a probe call to the original succeeds.
+
+Counters in /api/metrics (labels folded into the name):
+
+    llm_hedge.fired.<model>          second requests sent
+    llm_hedge.won.<model>            ... that answered first
+    llm_breaker.opened.<model>       circuit breaker trips
+    llm_breaker.fallbacks.<model>    calls sent to the fallback model instead
+    llm_deadline_exceeded.<model>    calls given up at the deadline
+    llm_retries.<model>              requests sent again after a failure
+    llm_seconds.<model>              latency of successful non-streaming calls
+
+Try it against benchmarks/fake_openai.py, which can inject slow and failing
+responses.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+import metrics
+from config import settings
+
+# Hedging needs a latency distribution first
+HEDGE_MIN_SAMPLES = 20
+HEDGE_QUANTILE = "p95"
+# Calls run on these threads so the caller can stop waiting at the deadline
+# (or take a hedge's answer) while a request is still in flight
+CALL_THREADS = 64
+
+# Failed requests are retried by the transport, within the call's deadline,
+# after RETRY_BACKOFF * 2 ** attempt seconds (or the response's Retry-After)
+RETRIES = 2
+RETRY_BACKOFF = 0.5
+# For the clients using http_client() / async_http_client(): the transport retries
+MAX_RETRIES = 0
+
+_executor = ThreadPoolExecutor(max_workers=CALL_THREADS, thread_name_prefix="llm-call")
+
+
+class CircuitOpenError(httpx.TransportError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens when at least error_rate of the last `window` calls failed (once
+    min_calls have been seen). After `cooldown` seconds one probe call is let
+    through: it closes the breaker if it succeeds and re-opens it if not.
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 10, error_rate: float = 0.5, cooldown: float = 30.0,
+                 clock=time.monotonic):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.clock = clock
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.probing or self.clock() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or self.clock() - self.opened_at < self.cooldown:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, ok: bool) -> bool:
+        """Record a call outcome; True when this outcome opened the breaker"""
+        with self._lock:
+            if self.opened_at is not None:
+                # Only the probe decides; calls that started before the trip do not
+                if self.probing:
+                    self.probing = False
+                    if ok:
+                        self.opened_at = None
+                        self.outcomes.clear()
+                    else:
+                        self.opened_at = self.clock()
+                return False
+            self.outcomes.append(ok)
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= self.min_calls and failures / len(self.outcomes) >= self.error_rate:
+                self.opened_at = self.clock()
+                return True
+            return False
+
+
+class ResiliencePolicy:
+    """Deadline, hedging and per-model breaker state shared by the transports"""
+
+    def __init__(self, deadline: float = 60.0, hedging: bool = False,
+                 fallback_models: Optional[dict[str, str]] = None, breaker_factory=CircuitBreaker,
+                 retries: int = RETRIES):
+        self.deadline = deadline
+        self.hedging = hedging
+        self.retries = retries
+        self.fallback_models = fallback_models or {}
+        self._breaker_factory = breaker_factory
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latencies: dict[str, metrics.Summary] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            return self._breakers.setdefault(model, self._breaker_factory())
+
+    def route(self, model: str) -> str:
+        """The model to call: model itself, or its fallback while its breaker is open"""
+        if self.breaker(model).allow():
+            return model
+        fallback = self.fallback_models.get(model)
+        if fallback and self.breaker(fallback).allow():
+            metrics.increment(f"llm_breaker.fallbacks.{model}")
+            return fallback
+        raise CircuitOpenError(f"Circuit breaker open for {model}")
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        if not self.hedging:
+            return None
+        with self._lock:
+            latencies = self._latencies.get(model)
+            if latencies is None or len(latencies.recent) < HEDGE_MIN_SAMPLES:
+                return None
+            return latencies.snapshot()[HEDGE_QUANTILE]
+
+    def retry_delay(self, attempt: int, deadline: float, outcome) -> Optional[float]:
+        """Seconds to wait before retrying a failed request, or None when it is not retried"""
+        if attempt >= self.retries:
+            return None
+        if isinstance(outcome, httpx.Response):
+            if not _is_failure(outcome):
+                return None
+            delay = _retry_after(outcome)
+        elif isinstance(outcome, (httpx.TimeoutException, CircuitOpenError)):
+            # A timeout is the deadline itself
+            return None
+        else:
+            delay = None
+        if delay is None:
+            delay = RETRY_BACKOFF * 2 ** attempt
+        return delay if time.monotonic() + delay < deadline else None
+
+    def record(self, model: str, ok: bool, seconds: Optional[float] = None):
+        if ok and seconds is not None:
+            with self._lock:
+                self._latencies.setdefault(model, metrics.Summary()).observe(seconds)
+            metrics.observe(f"llm_seconds.{model}", seconds)
+        if self.breaker(model).record(ok):
+            metrics.increment(f"llm_breaker.opened.{model}")
+            print(f"Circuit breaker opened for {model}")
+
+
+def _model_request(request: httpx.Request) -> Optional[dict]:
+    """The JSON body of a model call (chat completions, responses), else None"""
+    if request.method != "POST" or "json" not in request.headers.get("content-type", ""):
+        return None
+    try:
+        body = json.loads(request.content)
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) and isinstance(body.get("model"), str) else None
+
+
+def _with_model(request: httpx.Request, body: dict, model: str) -> httpx.Request:
+    headers = [(name, value) for name, value in request.headers.raw if name.lower() != b"content-length"]
+    return httpx.Request(request.method, request.url, headers=headers,
+                         content=json.dumps({**body, "model": model}).encode("utf-8"),
+                         extensions=request.extensions)
+
+
+def _with_timeout(request: httpx.Request, seconds: float) -> httpx.Request:
+    """A copy of request that times out after seconds, so hedges of one request do not share extensions"""
+    timeout = {"connect": seconds, "read": seconds, "write": seconds, "pool": seconds}
+    return httpx.Request(request.method, request.url, headers=request.headers, stream=request.stream,
+                         extensions={**request.extensions, "timeout": timeout})
+
+
+def _is_failure(response: httpx.Response) -> bool:
+    return response.status_code >= 500 or response.status_code == 429
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """The wait a 429/503 asks for, in seconds (OpenAI also sends retry-after-ms)"""
+    for header, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        try:
+            return float(response.headers[header]) / scale
+        except (KeyError, ValueError):
+            continue
+    return None
+
+
+def _deadline_exceeded(request: httpx.Request, model: str, deadline: float) -> httpx.TimeoutException:
+    metrics.increment(f"llm_deadline_exceeded.{model}")
+    return httpx.ReadTimeout(f"{model} call exceeded its {deadline}s deadline", request=request)
+
+
+def _close_when_done(future: Future):
+    future.cancel()
+    future.add_done_callback(lambda f: f.cancelled() or f.exception() or f.result().close())
+
+
+class ResilientTransport(httpx.BaseTransport):
+
+    def __init__(self, policy: ResiliencePolicy, transport: Optional[httpx.BaseTransport] = None):
+        self.policy = policy
+        self._transport = transport or httpx.HTTPTransport()
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        try:
+            response.read()
+        except BaseException:
+            response.close()
+            raise
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = _model_request(request)
+        if body is None:
+            return self._transport.handle_request(request)
+        model = self.policy.route(body["model"])
+        if model != body["model"]:
+            request = _with_model(request, body, model)
+        if body.get("stream"):
+            return self._retrying(lambda deadline: self._send_stream(
+                _with_timeout(request, deadline - time.monotonic()), model), model)
+        return self._retrying(lambda deadline: self._send_hedged(request, model, deadline), model)
+
+    def _retrying(self, send, model: str) -> httpx.Response:
+        """send(deadline) again after a failure, as long as the retry fits in the deadline"""
+        deadline = time.monotonic() + self.policy.deadline
+        for attempt in itertools.count():
+            try:
+                outcome = send(deadline)
+            except httpx.TransportError as e:
+                outcome = e
+            delay = self.policy.retry_delay(attempt, deadline, outcome)
+            if delay is None:
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            if isinstance(outcome, httpx.Response):
+                outcome.close()
+            metrics.increment(f"llm_retries.{model}")
+            time.sleep(delay)
+
+    def _send_stream(self, request: httpx.Request, model: str) -> httpx.Response:
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self.policy.record(model, False)
+            raise
+        self.policy.record(model, not _is_failure(response))
+        return response
+
+    def _send_hedged(self, request: httpx.Request, model: str, deadline: float) -> httpx.Response:
+        start = time.monotonic()
+        # A thread cannot be cancelled: each request times out with the time left instead
+        hedges = {_executor.submit(self._send, _with_timeout(request, deadline - start)): False}
+        delay = self.policy.hedge_delay(model)
+        if delay is not None and delay < deadline - start:
+            done, _ = wait(hedges, timeout=delay)
+            if not done:
+                hedges[_executor.submit(self._send, _with_timeout(request, deadline - time.monotonic()))] = True
+                metrics.increment(f"llm_hedge.fired.{model}")
+
+        pending, failed = set(hedges), None
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None and not _is_failure(future.result()):
+                    for other in pending:
+                        _close_when_done(other)
+                    if hedges[future]:
+                        metrics.increment(f"llm_hedge.won.{model}")
+                    self.policy.record(model, True, time.monotonic() - start)
+                    return future.result()
+                failed = future.exception() or future.result()
+
+        for future in pending:
+            _close_when_done(future)
+        self.policy.record(model, False)
+        if isinstance(failed, httpx.Response):
+            # The SDK turns the status into its own error
+            return failed
+        if failed is not None:
+            raise failed
+        raise _deadline_exceeded(request, model, self.policy.deadline)
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+
+    def __init__(self, policy: ResiliencePolicy, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.policy = policy
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        try:
+            await response.aread()
+        except BaseException:
+            await response.aclose()
+            raise
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = _model_request(request)
+        if body is None:
+            return await self._transport.handle_async_request(request)
+        model = self.policy.route(body["model"])
+        if model != body["model"]:
+            request = _with_model(request, body, model)
+        if body.get("stream"):
+            return await self._retrying(lambda deadline: self._send_stream(
+                _with_timeout(request, deadline - time.monotonic()), model), model)
+        return await self._retrying(lambda deadline: self._send_hedged(request, model, deadline), model)
+
+    async def _retrying(self, send, model: str) -> httpx.Response:
+        deadline = time.monotonic() + self.policy.deadline
+        for attempt in itertools.count():
+            try:
+                outcome = await send(deadline)
+            except httpx.TransportError as e:
+                outcome = e
+            delay = self.policy.retry_delay(attempt, deadline, outcome)
+            if delay is None:
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            if isinstance(outcome, httpx.Response):
+                await outcome.aclose()
+            metrics.increment(f"llm_retries.{model}")
+            await asyncio.sleep(delay)
+
+    async def _send_stream(self, request: httpx.Request, model: str) -> httpx.Response:
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            # Including cancellation, or a cancelled half-open probe would keep its breaker open for good
+            self.policy.record(model, False)
+            raise
+        self.policy.record(model, not _is_failure(response))
+        return response
+
+    async def _send_hedged(self, request: httpx.Request, model: str, deadline: float) -> httpx.Response:
+        start = time.monotonic()
+        hedges = {asyncio.ensure_future(self._send(request)): False}
+        pending, failed = set(hedges), None
+        try:
+            delay = self.policy.hedge_delay(model)
+            if delay is not None and delay < deadline - start:
+                done, _ = await asyncio.wait(hedges, timeout=delay)
+                if not done:
+                    hedge = asyncio.ensure_future(self._send(request))
+                    hedges[hedge] = True
+                    pending.add(hedge)
+                    metrics.increment(f"llm_hedge.fired.{model}")
+
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(deadline - time.monotonic(), 0),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None and not _is_failure(task.result()):
+                        if hedges[task]:
+                            metrics.increment(f"llm_hedge.won.{model}")
+                        self.policy.record(model, True, time.monotonic() - start)
+                        return task.result()
+                    failed = task.exception() or task.result()
+        except asyncio.CancelledError:
+            # Settle the call, or a cancelled half-open probe would keep its breaker open for good
+            self.policy.record(model, False)
+            raise
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.policy.record(model, False)
+        if isinstance(failed, httpx.Response):
+            return failed
+        if failed is not None:
+            raise failed
+        raise _deadline_exceeded(request, model, self.policy.deadline)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+policy = ResiliencePolicy(deadline=settings.LLM_TIMEOUT_SECONDS,
+                          hedging=settings.LLM_HEDGING,
+                          fallback_models=settings.LLM_FALLBACK_MODELS)
+
+
+@lru_cache
+def http_client() -> httpx.Client:
+    """Shared client for synchronous OpenAI SDK / ChatOpenAI calls"""
+    return DefaultHttpxClient(transport=ResilientTransport(policy))
+
+
+def async_http_client(client_policy: Optional[ResiliencePolicy] = None) -> httpx.AsyncClient:
+    """A client for async calls; not shared, as an AsyncClient is tied to the event loop that first uses it"""
+    return DefaultAsyncHttpxClient(transport=AsyncResilientTransport(client_policy or policy))
@@ -1,20 +1,46 @@
 import os
-from typing import Annotated, Optional
-from fastapi import BackgroundTasks, Depends, Request, Response, status, FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Annotated, Literal, Optional
+from fastapi import BackgroundTasks, Depends, Query, Request, Response, status, FastAPI, File, Form, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, Json
 from sqlalchemy import text
 from ai import evaluate_resume_with_ai
 from auth import AdminAuthzMiddleware, AdminSessionMiddleware, authenticate_admin, delete_admin_session
 from converter import extract_text_from_pdf_bytes
 from db import get_db
 from emailer import send_email
+from interview_runtime import InterviewConversation, authorize_interview
 import file_storage
+import interview_store
+import jd_review
+import job_post_digest
+import job_post_skills
+import metrics
+import prescreen
+import prompt_registry
 from models import JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost
+import reporting
+import resume_index
+import search
+import stats
 from config import settings
+from transcript_writer import transcript_writer
+from answer_grading import CHECK_ANSWER_PROMPT_SLUG
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # Warm the prompt cache so the first interview answer doesn't wait on Braintrust
+  prompt_registry.registry.prefetch(CHECK_ANSWER_PROMPT_SLUG, settings.CHECK_ANSWER_PROMPT_VERSION)
+  # Replays transcript journals left by a crashed worker before taking new interviews
+  transcript_writer.start()
+  yield
+  transcript_writer.close()
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(AdminAuthzMiddleware)
 app.add_middleware(AdminSessionMiddleware)
 
@@ -39,10 +65,38 @@ async def api_job_boards(db: Session = Depends(get_db)):
    jobBoards = db.query(JobBoard).all()
    return jobBoards
 
+class EvaluationFilters(BaseModel):
+   job_board_id: Optional[int] = None
+   job_post_id: Optional[int] = None
+   min_score: Optional[int] = None
+   max_score: Optional[int] = None
+   # JSON document the evaluation must contain, e.g. {"match_by_section": {"education": "..."}}
+   contains: Optional[Json[dict]] = None
+   # Keyword queries (websearch syntax) over the strengths and gaps lists
+   strengths: Optional[str] = None
+   gaps: Optional[str] = None
+
 @app.get("/api/job-application-ai-evaluations")
-async def api_job_boards(db: Session = Depends(get_db)):
-   results = db.query(JobApplicationAIEvaluation).all()
+async def api_job_boards(filters: Annotated[EvaluationFilters, Query()], db: Session = Depends(get_db)):
+   results = db.scalars(reporting.evaluations_query(**filters.model_dump())).all()
    return results
+
+class EvaluationExportFilters(EvaluationFilters):
+   format: Literal["ndjson", "csv"] = "ndjson"
+
+@app.get("/api/job-application-ai-evaluations/export")
+async def api_export_job_application_ai_evaluations(request: Request,
+                                                    filters: Annotated[EvaluationExportFilters, Query()],
+                                                    db: Session = Depends(get_db)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   query = reporting.evaluation_export_query(**filters.model_dump(exclude={"format"}))
+   if filters.format == "csv":
+      return StreamingResponse(reporting.stream_evaluations_csv(db, query),
+                               media_type="text/csv",
+                               headers={"Content-Disposition": "attachment; filename=evaluations.csv"})
+   return StreamingResponse(reporting.stream_evaluations_ndjson(db, query),
+                            media_type="application/x-ndjson")
     
 class JobBoardForm(BaseModel):
    slug : str = Field(..., min_length=2, max_length=20)
@@ -73,6 +127,15 @@ async def api_get_company_job_board(job_board_id, db: Session = Depends(get_db))
       raise HTTPException(status_code=404)
    return jobBoard
 
+@app.get("/api/job-boards/{job_board_id}/stats")
+async def api_job_board_stats(request: Request, job_board_id: int, db: Session = Depends(get_db)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobBoard = db.get(JobBoard, job_board_id)
+   if not jobBoard:
+      raise HTTPException(status_code=404)
+   return stats.job_board_stats(db, job_board_id)
+
 @app.delete("/api/job-boards/{job_board_id}")
 async def api_get_company_job_board(job_board_id, db: Session = Depends(get_db)):
    jobBoard = db.get(JobBoard, job_board_id)
@@ -110,22 +173,100 @@ async def api_close_job_post(job_post_id, db: Session = Depends(get_db)):
    db.commit()
    return jobPost
   
+@app.get("/api/job-posts/search")
+async def api_search_job_posts(q: str = Query(..., min_length=1, max_length=200),
+                               board: Optional[str] = None,
+                               limit: int = Query(20, ge=1, le=100),
+                               cursor: Optional[str] = None,
+                               db: Session = Depends(get_db)):
+   try:
+      return search.search_job_posts(db, q, board=board, limit=limit, cursor=cursor)
+   except search.InvalidCursor:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+@app.get("/api/job-posts/{job_post_id}/applicants")
+async def api_job_post_top_applicants(request: Request,
+                                      job_post_id: int,
+                                      top: int = Query(20, ge=1, le=100),
+                                      min_score: Optional[int] = None,
+                                      db: Session = Depends(get_db)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   return reporting.top_applicants(db, job_post_id, top, min_score)
+
+@app.get("/api/job-posts/{job_post_id}/recommendations")
+async def api_job_post_recommendations(request: Request,
+                                       job_post_id: int,
+                                       scope: Literal["post", "board", "all"] = "post",
+                                       mode: Literal["hybrid", "dense"] = "hybrid",
+                                       keywords: Optional[str] = Query(None, max_length=500),
+                                       submitted_after: Optional[datetime] = None,
+                                       submitted_before: Optional[datetime] = None,
+                                       min_score: Optional[float] = Query(None, ge=-1, le=1),
+                                       limit: int = Query(20, ge=1, le=100),
+                                       offset: int = Query(0, ge=0),
+                                       db: Session = Depends(get_db)):
+   """Resumes ranked by semantic similarity to the job post description, fused with
+   a keyword match on `keywords` (default: the description) unless mode=dense"""
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   return resume_index.recommend_for_job_post(jobPost, scope, mode, keywords,
+                                              submitted_after=submitted_after,
+                                              submitted_before=submitted_before,
+                                              min_score=min_score,
+                                              limit=limit,
+                                              offset=offset)
+
+@app.get("/api/job-posts/{job_post_id}/stats")
+async def api_job_post_stats(request: Request, job_post_id: int, db: Session = Depends(get_db)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   return stats.job_post_stats(db, job_post_id)
+
+@app.get("/api/job-posts/{job_post_id}/review")
+async def api_review_job_post_description(request: Request, job_post_id: int, db: Session = Depends(get_db)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   description = jobPost.description
+   # The review can stream for a while; don't hold the request's connection for it
+   db.close()
+   return StreamingResponse(jd_review.stream_review(description),
+                            media_type="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+  
 class JobPostForm(BaseModel):
    title : str
    description: str
    job_board_id : int
+   # Embedding similarity (-1 to 1) an application needs to get an LLM evaluation
+   prescreen_threshold : Optional[float] = Field(None, ge=-1, le=1)
 
 @app.post("/api/job-posts")
-async def api_create_job_post(job_post_form: Annotated[JobPostForm, Form()], db: Session = Depends(get_db)):
+async def api_create_job_post(job_post_form: Annotated[JobPostForm, Form()], background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
    jobBoard = db.get(JobBoard, job_post_form.job_board_id)
    if not jobBoard:
       raise HTTPException(status_code=400)
    jobPost = JobPost(title=job_post_form.title, 
                      description=job_post_form.description, 
-                     job_board_id = job_post_form.job_board_id)
+                     job_board_id = job_post_form.job_board_id,
+                     prescreen_threshold = job_post_form.prescreen_threshold)
    db.add(jobPost)
    db.commit()
    db.refresh(jobPost)
+   background_tasks.add_task(job_post_skills.refresh_job_post_skills, jobPost.id)
+   background_tasks.add_task(job_post_digest.refresh_job_post_digest, jobPost.id)
    return jobPost
 
 @app.get("/api/job-boards/{slug}")
@@ -144,16 +285,32 @@ class JobApplicationForm(BaseModel):
    job_post_id : int
    resume: UploadFile = File(...)
 
-def evaluate_resume(resume_content, job_post_description, job_application_id, db: Session = Depends(get_db)):
+def evaluate_resume(resume_content, job_post_description, job_application_id, db: Session):
    resume_raw_text = extract_text_from_pdf_bytes(resume_content)
-   ai_evaluation = evaluate_resume_with_ai(resume_raw_text, job_post_description)
+   jobApplication = db.get(JobApplication, job_application_id)
+   if not prescreen.screen(db, jobApplication, resume_raw_text):
+      db.add(jobApplication)
+      db.commit()
+      resume_index.index_resume(jobApplication, resume_raw_text)
+      return
+   job_requirements = job_post_digest.requirements_for_evaluation(jobApplication.job_post_id, job_post_description)
+   ai_evaluation = evaluate_resume_with_ai(resume_raw_text, job_requirements,
+                                           prompt_cache_key=f"resume-evaluation-{jobApplication.job_post_id}")
    evaluation = JobApplicationAIEvaluation(
       job_application_id = job_application_id,
       overall_score = ai_evaluation["overall_score"],
       evaluation = ai_evaluation
    )
    db.add(evaluation)
+   # Lock the application so a concurrent re-evaluation cannot read the same previous score
+   db.refresh(jobApplication, ["overall_score"], with_for_update=True)
+   previous_score = jobApplication.overall_score
+   jobApplication.overall_score = evaluation.overall_score
+   db.add(jobApplication)
+   stats.record_evaluation(db, jobApplication.job_post_id, jobApplication.job_post.job_board_id, evaluation.overall_score,
+                           previous_score=previous_score)
    db.commit()
+   resume_index.index_resume(jobApplication, resume_raw_text)
 
 @app.post("/api/job-applications")
 async def api_create_new_job_application(job_application_form: Annotated[JobApplicationForm, Form()], background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
@@ -162,25 +319,80 @@ async def api_create_new_job_application(job_application_form: Annotated[JobAppl
    if not jobPost or not jobPost.is_open:
       raise HTTPException(status_code=400)
    resume_content = await job_application_form.resume.read()
+   interview_token, interview_token_hash = interview_store.new_interview_token()
    file_url = file_storage.upload_file("resumes", job_application_form.resume.filename, resume_content, job_application_form.resume.content_type)
    new_job_application = JobApplication(
       first_name=job_application_form.first_name, 
       last_name=job_application_form.last_name, 
       email=job_application_form.email, 
       job_post_id = job_application_form.job_post_id,
-      resume_url=file_url)
+      resume_url=file_url,
+      interview_token_hash=interview_token_hash)
    db.add(new_job_application)
+   stats.record_application(db, jobPost.id, jobPost.job_board_id)
    db.commit()
    db.refresh(new_job_application)
    background_tasks.add_task(send_email, 
                            new_job_application.email, 
                            "Acknowledgement", 
-                           "We have received your job application")
+                           "We have received your job application. "
+                           f"Your screening interview token is {interview_token}")
    
    background_tasks.add_task(evaluate_resume, resume_content, 
-                              jobPost.description, new_job_application.id)
+                              jobPost.description, new_job_application.id, db)
    
-   return new_job_application
+   # The token is only ever shown here and in the email; the application stores its hash
+   return {**jsonable_encoder(new_job_application), "interview_token": interview_token}
+
+@app.get("/api/job-applications/{job_application_id}/interviews")
+async def api_job_application_interviews(request: Request, job_application_id: int, db: Session = Depends(get_db)):
+   """Screening interview results and transcripts for a job application"""
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   return interview_store.get_job_application_interviews(db, job_application_id)
+
+@app.get("/api/metrics")
+async def api_metrics(request: Request):
+   """Counters and latency summaries (seconds) for this worker"""
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   return metrics.snapshot()
+
+@app.websocket("/api/interviews/{session_id}/ws")
+async def api_interview_ws(websocket: WebSocket, session_id: str, job_id: int, job_application_id: int,
+                           token: str):
+   """Screening interview over a WebSocket.
+
+   The candidate connects with the interview token issued with their job
+   application. The server streams {"type": "token" | "agent" | "turn_complete"}
+   events for each turn, then waits for {"message": "..."} from the candidate.
+   Sending "bye" ends the interview. Reconnecting to a started session sends
+   {"type": "resumed"} and waits for the candidate's next message.
+   """
+   if not await authorize_interview(session_id, job_id, job_application_id, token):
+      # Closing before accept() rejects the handshake with a 403
+      await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+      return
+   await websocket.accept()
+   conversation = InterviewConversation(session_id, job_id, job_application_id=job_application_id)
+   try:
+      if await conversation.start():
+         # Reconnected: the history is in Postgres, so wait for the candidate's next answer
+         await websocket.send_json({"type": "resumed", "agent": conversation.agent.name})
+         user_input = (await websocket.receive_json()).get("message", "")
+      else:
+         user_input = conversation.opening_message()
+      while user_input != "bye":
+         async for event in conversation.stream_turn(user_input):
+            await websocket.send_json(event)
+         message = await websocket.receive_json()
+         user_input = message.get("message", "")
+      await conversation.end(completed=True)
+      await websocket.send_json({"type": "done"})
+      await websocket.close()
+   except WebSocketDisconnect:
+      # The candidate can reconnect to the same session and carry on
+      await conversation.end(completed=False)
 
 if not settings.IS_CI:
    app.mount("/assets", StaticFiles(directory="frontend/build/client/assets"))
@@ -0,0 +1,81 @@
+"""
+In-process metrics: counters and latency summaries.
+
+Kept deliberately small: values live in this worker's memory and are exposed
+as JSON at /api/metrics (admin only). Labels are folded into the metric name,
+e.g. "interview_tool_seconds.get_question".
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Recent observations kept per summary for percentiles
+WINDOW_SIZE = 1024
+
+
+class Summary:
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.recent: deque[float] = deque(maxlen=WINDOW_SIZE)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.recent)
+
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else None
+
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": ordered[-1] if ordered else None,
+        }
+
+
+_lock = threading.Lock()
+_counters: dict[str, int] = {}
+_summaries: dict[str, Summary] = {}
+
+
+def increment(name: str, value: int = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, value: float):
+    with _lock:
+        _summaries.setdefault(name, Summary()).observe(value)
+
+
+@contextmanager
+def timer(name: str):
+    """Observe the wall time of the block, in seconds"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "summaries": {name: summary.snapshot() for name, summary in _summaries.items()},
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _summaries.clear()
@@ -0,0 +1,45 @@
+"""add evaluation search indexes
+
+Revision ID: 0603528032db
+Revises: fe281ef58eca
+Create Date: 2026-10-19 12:48:33.071524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0603528032db'
+down_revision: Union[str, Sequence[str], None] = 'fe281ef58eca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_application_ai_evaluations', sa.Column('strengths_vector', postgresql.TSVECTOR(), sa.Computed(
+        "to_tsvector('english', evaluation -> 'strengths')", persisted=True), nullable=True))
+    op.add_column('job_application_ai_evaluations', sa.Column('gaps_vector', postgresql.TSVECTOR(), sa.Computed(
+        "to_tsvector('english', evaluation -> 'gaps')", persisted=True), nullable=True))
+    op.create_index('ix_job_application_ai_evaluations_evaluation', 'job_application_ai_evaluations',
+                    ['evaluation'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'evaluation': 'jsonb_path_ops'})
+    op.create_index('ix_job_application_ai_evaluations_strengths_vector', 'job_application_ai_evaluations',
+                    ['strengths_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_job_application_ai_evaluations_gaps_vector', 'job_application_ai_evaluations',
+                    ['gaps_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_application_ai_evaluations_gaps_vector', table_name='job_application_ai_evaluations',
+                  postgresql_using='gin')
+    op.drop_index('ix_job_application_ai_evaluations_strengths_vector', table_name='job_application_ai_evaluations',
+                  postgresql_using='gin')
+    op.drop_index('ix_job_application_ai_evaluations_evaluation', table_name='job_application_ai_evaluations',
+                  postgresql_using='gin', postgresql_ops={'evaluation': 'jsonb_path_ops'})
+    op.drop_column('job_application_ai_evaluations', 'gaps_vector')
+    op.drop_column('job_application_ai_evaluations', 'strengths_vector')
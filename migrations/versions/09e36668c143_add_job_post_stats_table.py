@@ -0,0 +1,65 @@
+"""add job_post_stats table
+
+Revision ID: 09e36668c143
+Revises: 0c1c68fdfecd
+Create Date: 2026-10-19 10:03:17.558902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '09e36668c143'
+down_revision: Union[str, Sequence[str], None] = '0c1c68fdfecd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_post_stats',
+    sa.Column('job_post_id', sa.Integer(), nullable=False),
+    sa.Column('job_board_id', sa.Integer(), nullable=False),
+    sa.Column('application_count', sa.Integer(), nullable=False),
+    sa.Column('evaluated_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.BigInteger(), nullable=False),
+    sa.Column('score_histogram', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.ForeignKeyConstraint(['job_board_id'], ['job_boards.id'], ),
+    sa.ForeignKeyConstraint(['job_post_id'], ['job_posts.id'], ),
+    sa.PrimaryKeyConstraint('job_post_id')
+    )
+    op.create_index(op.f('ix_job_post_stats_job_board_id'), 'job_post_stats', ['job_board_id'], unique=False)
+    # Seed the counters from existing rows; from here on they are maintained incrementally
+    op.execute("""
+        INSERT INTO job_post_stats (job_post_id, job_board_id, application_count,
+                                    evaluated_count, score_sum, score_histogram)
+        SELECT p.id, p.job_board_id,
+            (SELECT count(*) FROM job_applications a WHERE a.job_post_id = p.id),
+            (SELECT count(*) FROM job_application_ai_evaluations e
+                JOIN job_applications a ON a.id = e.job_application_id
+                WHERE a.job_post_id = p.id),
+            (SELECT coalesce(sum(e.overall_score), 0) FROM job_application_ai_evaluations e
+                JOIN job_applications a ON a.id = e.job_application_id
+                WHERE a.job_post_id = p.id),
+            ARRAY(
+                SELECT count(e.id)
+                FROM generate_series(0, 9) AS bucket
+                LEFT JOIN (
+                    SELECT e.id, e.overall_score FROM job_application_ai_evaluations e
+                    JOIN job_applications a ON a.id = e.job_application_id
+                    WHERE a.job_post_id = p.id
+                ) AS e ON least(greatest(e.overall_score, 0) / 10, 9) = bucket
+                GROUP BY bucket
+                ORDER BY bucket
+            )
+        FROM job_posts p
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_post_stats_job_board_id'), table_name='job_post_stats')
+    op.drop_table('job_post_stats')
@@ -0,0 +1,45 @@
+"""add overall score in job_applications
+
+Revision ID: 0c1c68fdfecd
+Revises: 1f0f2a3b5233
+Create Date: 2026-10-19 09:12:41.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c1c68fdfecd'
+down_revision: Union[str, Sequence[str], None] = '1f0f2a3b5233'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_applications', sa.Column('overall_score', sa.Integer(), nullable=True))
+    # Backfill with the score of each application's latest evaluation
+    op.execute("""
+        UPDATE job_applications SET overall_score = latest.overall_score
+        FROM (
+            SELECT DISTINCT ON (job_application_id) job_application_id, overall_score
+            FROM job_application_ai_evaluations
+            ORDER BY job_application_id, id DESC
+        ) AS latest
+        WHERE latest.job_application_id = job_applications.id
+    """)
+    op.create_index('ix_job_applications_job_post_id_overall_score', 'job_applications',
+                    ['job_post_id', 'overall_score', 'id'], unique=False)
+    op.create_index(op.f('ix_job_application_ai_evaluations_job_application_id'),
+                    'job_application_ai_evaluations', ['job_application_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_application_ai_evaluations_job_application_id'),
+                  table_name='job_application_ai_evaluations')
+    op.drop_index('ix_job_applications_job_post_id_overall_score', table_name='job_applications')
+    op.drop_column('job_applications', 'overall_score')
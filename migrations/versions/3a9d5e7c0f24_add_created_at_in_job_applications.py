@@ -0,0 +1,28 @@
+"""add created_at in job_applications
+
+Revision ID: 3a9d5e7c0f24
+Revises: 6f3c9a0b1e57
+Create Date: 2026-10-19 19:40:12.514203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9d5e7c0f24'
+down_revision: Union[str, Sequence[str], None] = '6f3c9a0b1e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_applications', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_applications', 'created_at')
@@ -0,0 +1,28 @@
+"""add asked question ids in interview_sessions
+
+Revision ID: 5e2b7c19a4d6
+Revises: 93183d3047ed
+Create Date: 2026-10-19 16:02:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b7c19a4d6'
+down_revision: Union[str, Sequence[str], None] = '93183d3047ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_sessions', sa.Column('asked_question_ids', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_sessions', 'asked_question_ids')
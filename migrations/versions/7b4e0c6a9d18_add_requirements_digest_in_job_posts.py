@@ -0,0 +1,30 @@
+"""add requirements_digest in job_posts
+
+Revision ID: 7b4e0c6a9d18
+Revises: c58e1d2f7a93
+Create Date: 2026-10-19 22:14:03.671529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b4e0c6a9d18'
+down_revision: Union[str, Sequence[str], None] = 'c58e1d2f7a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_posts', sa.Column('requirements_digest', sa.String(), nullable=True))
+    op.add_column('job_posts', sa.Column('requirements_digest_key', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_posts', 'requirements_digest_key')
+    op.drop_column('job_posts', 'requirements_digest')
@@ -0,0 +1,61 @@
+"""add interview session tables
+
+Revision ID: 844da2031922
+Revises: 0603528032db
+Create Date: 2026-10-19 14:02:51.338190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '844da2031922'
+down_revision: Union[str, Sequence[str], None] = '0603528032db'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('interview_sessions',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('job_post_id', sa.Integer(), nullable=True),
+    sa.Column('skills', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['job_post_id'], ['job_posts.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('interview_skill_evaluations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('skill', sa.String(), nullable=False),
+    sa.Column('passed', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['interview_sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_interview_skill_evaluations_session_id'), 'interview_skill_evaluations',
+                    ['session_id'], unique=False)
+    op.create_table('interview_session_items',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('item', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['interview_sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_interview_session_items_session_id_id', 'interview_session_items',
+                    ['session_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interview_session_items_session_id_id', table_name='interview_session_items')
+    op.drop_table('interview_session_items')
+    op.drop_index(op.f('ix_interview_skill_evaluations_session_id'), table_name='interview_skill_evaluations')
+    op.drop_table('interview_skill_evaluations')
+    op.drop_table('interview_sessions')
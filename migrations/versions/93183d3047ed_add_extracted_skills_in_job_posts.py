@@ -0,0 +1,30 @@
+"""add extracted skills in job_posts
+
+Revision ID: 93183d3047ed
+Revises: 844da2031922
+Create Date: 2026-10-19 15:21:09.640152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '93183d3047ed'
+down_revision: Union[str, Sequence[str], None] = '844da2031922'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_posts', sa.Column('extracted_skills', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('job_posts', sa.Column('extracted_skills_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_posts', 'extracted_skills_hash')
+    op.drop_column('job_posts', 'extracted_skills')
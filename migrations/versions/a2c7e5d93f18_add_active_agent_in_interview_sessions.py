@@ -0,0 +1,33 @@
+"""add active_agent in interview_sessions
+
+Revision ID: a2c7e5d93f18
+Revises: f4b1c83e27d6
+Create Date: 2026-10-20 10:52:31.604127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c7e5d93f18'
+down_revision: Union[str, Sequence[str], None] = 'f4b1c83e27d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_sessions', sa.Column('active_agent', sa.String(), nullable=True))
+    # Sessions that already have a conversation resume with the orchestrator
+    op.execute("""
+        UPDATE interview_sessions SET active_agent = 'Interview Orchestrator Agent'
+        WHERE EXISTS (SELECT 1 FROM interview_session_items WHERE session_id = interview_sessions.id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_sessions', 'active_agent')
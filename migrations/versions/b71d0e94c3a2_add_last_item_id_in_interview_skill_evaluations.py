@@ -0,0 +1,28 @@
+"""add last item id in interview_skill_evaluations
+
+Revision ID: b71d0e94c3a2
+Revises: 5e2b7c19a4d6
+Create Date: 2026-10-19 17:11:52.402917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d0e94c3a2'
+down_revision: Union[str, Sequence[str], None] = '5e2b7c19a4d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_skill_evaluations', sa.Column('last_item_id', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_skill_evaluations', 'last_item_id')
@@ -0,0 +1,34 @@
+"""add prescreen columns
+
+Revision ID: c58e1d2f7a93
+Revises: 3a9d5e7c0f24
+Create Date: 2026-10-19 21:05:37.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e1d2f7a93'
+down_revision: Union[str, Sequence[str], None] = '3a9d5e7c0f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_posts', sa.Column('prescreen_threshold', sa.Float(), nullable=True))
+    op.add_column('job_applications', sa.Column('prescreen_similarity', sa.Float(), nullable=True))
+    op.add_column('job_applications', sa.Column('provisional_score', sa.Integer(), nullable=True))
+    op.add_column('job_post_stats', sa.Column('prescreened_out_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_post_stats', 'prescreened_out_count')
+    op.drop_column('job_applications', 'provisional_score')
+    op.drop_column('job_applications', 'prescreen_similarity')
+    op.drop_column('job_posts', 'prescreen_threshold')
@@ -0,0 +1,57 @@
+"""add interview results and item uuid
+
+Revision ID: d4a8f61e2b90
+Revises: b71d0e94c3a2
+Create Date: 2026-10-19 18:04:15.233871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8f61e2b90'
+down_revision: Union[str, Sequence[str], None] = 'b71d0e94c3a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_sessions', sa.Column('job_application_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('interview_sessions_job_application_id_fkey', 'interview_sessions', 'job_applications',
+                          ['job_application_id'], ['id'])
+    op.create_index(op.f('ix_interview_sessions_job_application_id'), 'interview_sessions',
+                    ['job_application_id'], unique=False)
+    op.add_column('interview_session_items', sa.Column('item_uuid', sa.Uuid(), nullable=True))
+    op.create_unique_constraint('interview_session_items_item_uuid_key', 'interview_session_items', ['item_uuid'])
+    op.create_table('interview_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('job_application_id', sa.Integer(), nullable=True),
+    sa.Column('job_post_id', sa.Integer(), nullable=True),
+    sa.Column('skills_passed', sa.Integer(), nullable=False),
+    sa.Column('skills_total', sa.Integer(), nullable=False),
+    sa.Column('evaluation', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['interview_sessions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['job_application_id'], ['job_applications.id'], ),
+    sa.ForeignKeyConstraint(['job_post_id'], ['job_posts.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id')
+    )
+    op.create_index(op.f('ix_interview_results_job_application_id'), 'interview_results',
+                    ['job_application_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_interview_results_job_application_id'), table_name='interview_results')
+    op.drop_table('interview_results')
+    op.drop_constraint('interview_session_items_item_uuid_key', 'interview_session_items', type_='unique')
+    op.drop_column('interview_session_items', 'item_uuid')
+    op.drop_index(op.f('ix_interview_sessions_job_application_id'), table_name='interview_sessions')
+    op.drop_constraint('interview_sessions_job_application_id_fkey', 'interview_sessions', type_='foreignkey')
+    op.drop_column('interview_sessions', 'job_application_id')
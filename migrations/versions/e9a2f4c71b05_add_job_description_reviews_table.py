@@ -0,0 +1,35 @@
+"""add job_description_reviews table
+
+Revision ID: e9a2f4c71b05
+Revises: 7b4e0c6a9d18
+Create Date: 2026-10-19 23:02:48.209316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a2f4c71b05'
+down_revision: Union[str, Sequence[str], None] = '7b4e0c6a9d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_description_reviews',
+    sa.Column('description_hash', sa.String(), nullable=False),
+    sa.Column('prompt_version', sa.String(), nullable=False),
+    sa.Column('revised_description', sa.String(), nullable=False),
+    sa.Column('overall_summary', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('description_hash', 'prompt_version')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_description_reviews')
@@ -0,0 +1,28 @@
+"""add interview_token_hash in job_applications
+
+Revision ID: f4b1c83e27d6
+Revises: e9a2f4c71b05
+Create Date: 2026-10-20 10:14:05.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b1c83e27d6'
+down_revision: Union[str, Sequence[str], None] = 'e9a2f4c71b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_applications', sa.Column('interview_token_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_applications', 'interview_token_hash')
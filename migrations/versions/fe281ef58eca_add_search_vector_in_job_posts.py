@@ -0,0 +1,32 @@
+"""add search vector in job_posts
+
+Revision ID: fe281ef58eca
+Revises: 09e36668c143
+Create Date: 2026-10-19 11:26:05.913270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe281ef58eca'
+down_revision: Union[str, Sequence[str], None] = '09e36668c143'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_posts', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')", persisted=True), nullable=True))
+    op.create_index('ix_job_posts_search_vector', 'job_posts', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_posts_search_vector', table_name='job_posts', postgresql_using='gin')
+    op.drop_column('job_posts', 'search_vector')
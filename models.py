@@ -1,5 +1,6 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import BigInteger, Boolean, Column, Computed, DateTime, Float, Index, Integer, LargeBinary, String, ForeignKey, Uuid, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship, declarative_base
 
 Base = declarative_base()
 
@@ -17,6 +18,27 @@ class JobPost(Base):
   job_board_id = Column(Integer, ForeignKey("job_boards.id"),  nullable=False)
   job_board = relationship("JobBoard")
   is_open = Column(Boolean, nullable=False, default=True)
+  # Generated by Postgres with the title weighted above the description.
+  # Deferred so it is never loaded into (or serialised from) regular queries.
+  search_vector = deferred(Column(TSVECTOR, Computed(
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')", persisted=True)))
+  # LLM-extracted skills cached against the description they came from.
+  # See job_post_skills.py.
+  extracted_skills = deferred(Column(JSONB, nullable=True))
+  extracted_skills_hash = deferred(Column(String, nullable=True))
+  # Requirements digest used in resume evaluation prompts instead of the
+  # description, keyed on the description it came from. See job_post_digest.py.
+  requirements_digest = deferred(Column(String, nullable=True))
+  requirements_digest_key = deferred(Column(String, nullable=True))
+  # Minimum resume/description embedding similarity for an application to be
+  # sent to the LLM evaluator; None falls back to PRESCREEN_DEFAULT_THRESHOLD.
+  # See prescreen.py.
+  prescreen_threshold = Column(Float, nullable=True)
+
+  __table_args__ = (
+    Index("ix_job_posts_search_vector", "search_vector", postgresql_using="gin"),
+  )
 
 class JobApplication(Base):
   __tablename__ = 'job_applications'
@@ -27,12 +49,123 @@ class JobApplication(Base):
   last_name = Column(String, nullable=False)
   email = Column(String, nullable=False)
   resume_url = Column(String, nullable=False)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  # Score of the latest AI evaluation, denormalised so ranking a post's
+  # applicants is a single index scan instead of a join over evaluations.
+  overall_score = Column(Integer, nullable=True)
+  # Embedding pre-screen result. Applications below their post's threshold
+  # only get the provisional score and keep overall_score empty.
+  prescreen_similarity = Column(Float, nullable=True)
+  provisional_score = Column(Integer, nullable=True)
+  # sha256 of the token the candidate opens their screening interview with
+  interview_token_hash = deferred(Column(String, nullable=True))
+  ai_evaluations = relationship("JobApplicationAIEvaluation",
+                                order_by="JobApplicationAIEvaluation.id.desc()")
+
+  __table_args__ = (
+    Index("ix_job_applications_job_post_id_overall_score", "job_post_id", "overall_score", "id"),
+  )
 
 
-from sqlalchemy.dialects.postgresql import JSONB
 class JobApplicationAIEvaluation(Base):
   __tablename__ = 'job_application_ai_evaluations'
   id = Column(Integer, primary_key=True)
-  job_application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=False)
+  job_application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=False, index=True)
   overall_score = Column(Integer, nullable=False)
-  evaluation = Column(JSONB, nullable=False) 
\ No newline at end of file
+  evaluation = Column(JSONB, nullable=False)
+  # Hot evaluation fields promoted to generated columns so keyword filters
+  # ("gaps mention Kubernetes") are answered from a GIN index.
+  strengths_vector = deferred(Column(TSVECTOR, Computed(
+    "to_tsvector('english', evaluation -> 'strengths')", persisted=True)))
+  gaps_vector = deferred(Column(TSVECTOR, Computed(
+    "to_tsvector('english', evaluation -> 'gaps')", persisted=True)))
+
+  __table_args__ = (
+    Index("ix_job_application_ai_evaluations_evaluation", "evaluation",
+          postgresql_using="gin", postgresql_ops={"evaluation": "jsonb_path_ops"}),
+    Index("ix_job_application_ai_evaluations_strengths_vector", "strengths_vector", postgresql_using="gin"),
+    Index("ix_job_application_ai_evaluations_gaps_vector", "gaps_vector", postgresql_using="gin"),
+  )
+
+from sqlalchemy.dialects.postgresql import ARRAY
+# Maintained incrementally by stats.py on every application and evaluation
+# insert so dashboards never aggregate the raw tables.
+class JobPostStats(Base):
+  __tablename__ = 'job_post_stats'
+  job_post_id = Column(Integer, ForeignKey("job_posts.id"), primary_key=True)
+  job_board_id = Column(Integer, ForeignKey("job_boards.id"), nullable=False, index=True)
+  application_count = Column(Integer, nullable=False, default=0)
+  evaluated_count = Column(Integer, nullable=False, default=0)
+  score_sum = Column(BigInteger, nullable=False, default=0)
+  score_histogram = Column(ARRAY(Integer), nullable=False)
+  # Applications the pre-screen kept away from the LLM evaluator
+  prescreened_out_count = Column(Integer, nullable=False, default=0, server_default='0')
+
+# Screening interview state, shared by every worker so interviews are not
+# pinned to the process that started them. See interview_store.py.
+class InterviewSession(Base):
+  __tablename__ = 'interview_sessions'
+  id = Column(String, primary_key=True)
+  job_post_id = Column(Integer, ForeignKey("job_posts.id"), nullable=True)
+  job_application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=True, index=True)
+  skills = Column(JSONB, nullable=False, default=list)
+  asked_question_ids = Column(JSONB, nullable=False, default=list, server_default='[]')
+  # Agent the conversation is with, so a reconnecting candidate resumes where they left off
+  active_agent = Column(String, nullable=True)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+class InterviewSkillEvaluation(Base):
+  __tablename__ = 'interview_skill_evaluations'
+  id = Column(Integer, primary_key=True)
+  session_id = Column(String, ForeignKey("interview_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+  skill = Column(String, nullable=False)
+  passed = Column(Boolean, nullable=False)
+  # Last conversation item of the skill's segment; earlier items are replaced by a summary
+  last_item_id = Column(BigInteger, nullable=True)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+# Agents SDK conversation items (one row per TResponseInputItem)
+class InterviewSessionItem(Base):
+  __tablename__ = 'interview_session_items'
+  id = Column(BigInteger, primary_key=True)
+  session_id = Column(String, ForeignKey("interview_sessions.id", ondelete="CASCADE"), nullable=False)
+  # Assigned when the item is buffered, so replaying the write-behind journal is idempotent
+  item_uuid = Column(Uuid, nullable=True, unique=True)
+  item = Column(JSONB, nullable=False)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+  __table_args__ = (
+    Index("ix_interview_session_items_session_id_id", "session_id", "id"),
+  )
+
+# Outcome of a finished interview, one row per session
+class InterviewResult(Base):
+  __tablename__ = 'interview_results'
+  id = Column(Integer, primary_key=True)
+  session_id = Column(String, ForeignKey("interview_sessions.id", ondelete="CASCADE"), nullable=False, unique=True)
+  job_application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=True, index=True)
+  job_post_id = Column(Integer, ForeignKey("job_posts.id"), nullable=True)
+  skills_passed = Column(Integer, nullable=False)
+  skills_total = Column(Integer, nullable=False)
+  evaluation = Column(JSONB, nullable=False)
+  completed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+# Complete job description reviews, keyed on the description and the review
+# prompts they came from. See jd_review.py.
+class JobDescriptionReview(Base):
+  __tablename__ = 'job_description_reviews'
+  description_hash = Column(String, primary_key=True)
+  prompt_version = Column(String, primary_key=True)
+  revised_description = Column(String, nullable=False)
+  overall_summary = Column(String, nullable=False)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+# Embeddings keyed on model + dimensions and the sha256 of the embedded text
+class EmbeddingCacheEntry(Base):
+  __tablename__ = 'embedding_cache'
+  namespace = Column(String, primary_key=True)
+  content_hash = Column(String, primary_key=True)
+  # float32 little-endian
+  embedding = Column(LargeBinary, nullable=False)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
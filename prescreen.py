@@ -0,0 +1,106 @@
+"""
+Embedding pre-screen ahead of the LLM resume evaluation.
+
+Every application used to get a full evaluate_resume_with_ai() call, spam
+and wildly off-target resumes included. screen() first compares the resume
+with the job description by cosine similarity of their embeddings. Both go
+through resume_index.get_embeddings(), i.e. the Postgres embedding cache: the
+description is embedded once per post and the resume embedding is reused
+when the resume is indexed for recommendations right after.
+
+Applications below the threshold skip the LLM. They keep a provisional
+score (the similarity as a percentage) instead of an overall_score, and are
+counted in the post's stats as an LLM call saved. The threshold is the
+post's prescreen_threshold, else PRESCREEN_DEFAULT_THRESHOLD; with neither,
+every application is evaluated.
+
+Pick thresholds with benchmarks/prescreen_threshold.py, which reports the
+calls saved and the false-negative rate on a labelled set (threshold_report).
+"""
+
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import metrics
+import resume_index
+import stats
+from config import settings
+from models import JobApplication, JobPost
+
+
+def threshold_for(job_post: JobPost) -> Optional[float]:
+    if job_post.prescreen_threshold is not None:
+        return job_post.prescreen_threshold
+    return settings.PRESCREEN_DEFAULT_THRESHOLD
+
+
+def cosine_similarity(a: list[float], b: list[float]) -> float:
+    a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+    norms = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(a @ b) / norms if norms else 0.0
+
+
+def similarity(resume_text: str, job_description: str) -> float:
+    resume_vector, description_vector = resume_index.get_embeddings().embed_documents([resume_text, job_description])
+    return cosine_similarity(resume_vector, description_vector)
+
+
+def provisional_score(similarity: float) -> int:
+    """0-100, on the similarity scale rather than the LLM's, so it is stored apart from overall_score"""
+    return round(min(max(similarity, 0.0), 1.0) * 100)
+
+
+def screen(db: Session, job_application: JobApplication, resume_text: str) -> bool:
+    """
+    Pre-screen an application; True when it should go on to the LLM evaluator.
+    Records the similarity, and for skipped applications the provisional score
+    and stats, in the caller's transaction. Embedding failures let the
+    application through: the pre-screen only ever saves work.
+    """
+    job_post = job_application.job_post
+    threshold = threshold_for(job_post)
+    if threshold is None:
+        return True
+    try:
+        with metrics.timer("prescreen_seconds"):
+            score = similarity(resume_text, job_post.description)
+    except Exception as e:
+        print(f"Failed to pre-screen JobApplication #{job_application.id}: {e}")
+        metrics.increment("prescreen.errors")
+        return True
+    job_application.prescreen_similarity = score
+    if score >= threshold:
+        metrics.increment("prescreen.passed")
+        return True
+    job_application.provisional_score = provisional_score(score)
+    stats.record_prescreened_out(db, job_application.job_post_id, job_post.job_board_id)
+    metrics.increment("prescreen.skipped")
+    return False
+
+
+def threshold_report(similarities: list[float], relevant: list[bool], thresholds: list[float]) -> list[dict]:
+    """
+    For each threshold, the share of LLM calls saved (applications below it)
+    and the false-negative rate (share of relevant applications below it).
+    """
+    similarities = np.asarray(similarities, dtype=np.float64)
+    relevant = np.asarray(relevant, dtype=bool)
+    report = []
+    for threshold in thresholds:
+        skipped = similarities < threshold
+        report.append({
+            "threshold": threshold,
+            "calls_saved": int(skipped.sum()),
+            "calls_saved_rate": float(skipped.mean()) if len(skipped) else 0.0,
+            "false_negatives": int((skipped & relevant).sum()),
+            "false_negative_rate": float((skipped & relevant).sum() / relevant.sum()) if relevant.any() else 0.0,
+        })
+    return report
+
+
+def suggest_threshold(report: list[dict], max_false_negative_rate: float) -> Optional[float]:
+    """Highest threshold within the false-negative budget"""
+    within = [row["threshold"] for row in report if row["false_negative_rate"] <= max_false_negative_rate]
+    return max(within) if within else None
@@ -0,0 +1,136 @@
+"""
+Cached access to prompts managed in Braintrust.
+
+load_prompt() is a network round trip, which is too slow (and too fragile)
+to sit in front of every interview answer. The registry keeps fetched
+prompts in process for a TTL. After that it keeps serving the cached copy
+while a background thread refreshes it. Every successful fetch is also
+written to an on-disk snapshot, so a worker that starts while Braintrust
+is unreachable still has the last known prompt.
+
+Pinned versions are immutable in Braintrust, so they are never refreshed
+once loaded.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from braintrust import load_prompt
+from braintrust.logger import Prompt
+from braintrust.prompt import PromptSchema
+from braintrust.util import LazyValue
+
+from config import settings
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent / "data" / "prompt_snapshots"
+
+
+def snapshot_of(prompt: Prompt) -> dict:
+    """The prompt's fields, read through the public Prompt API, in PromptSchema layout"""
+    return {
+        "id": prompt.id,
+        "project_id": prompt.project_id,
+        "_xact_id": prompt.version,
+        "name": prompt.name,
+        "slug": prompt.slug,
+        "description": None,
+        "tags": None,
+        "prompt_data": {"prompt": prompt.prompt.as_dict() if prompt.prompt else None,
+                        "options": dict(prompt.options)},
+    }
+
+
+class PromptRegistry:
+
+    def __init__(self, project: str, snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR, ttl: float = DEFAULT_TTL_SECONDS):
+        self.project = project
+        self.snapshot_dir = Path(snapshot_dir)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (slug, version) -> (prompt, fetched_at)
+        self._cache: dict[tuple[str, Optional[str]], tuple[Prompt, float]] = {}
+        self._refreshing: set[tuple[str, Optional[str]]] = set()
+
+    def get(self, slug: str, version: Optional[str] = None) -> Prompt:
+        """Return the prompt, fetching it only on a cold cache.
+
+        A stale entry is returned as is and refreshed in the background, so
+        callers on the hot path never wait for Braintrust after the first load.
+        """
+        key = (slug, version)
+        cached = self._cache.get(key)
+        if cached is None:
+            return self._load(key)
+
+        prompt, fetched_at = cached
+        if version is None and time.monotonic() - fetched_at > self.ttl:
+            self._refresh_in_background(key)
+        return prompt
+
+    def prefetch(self, slug: str, version: Optional[str] = None):
+        """Warm the cache without blocking, e.g. at application startup"""
+        self._refresh_in_background((slug, version))
+
+    def _fetch(self, slug: str, version: Optional[str]) -> Prompt:
+        prompt = load_prompt(project=self.project, slug=slug, version=version,
+                             api_key=settings.BRAINTRUST_API_KEY)
+        # load_prompt is lazy; reading the prompt's fields makes the network call happen now
+        self._write_snapshot(slug, version, snapshot_of(prompt))
+        return prompt
+
+    def _load(self, key: tuple[str, Optional[str]]) -> Prompt:
+        slug, version = key
+        try:
+            prompt = self._fetch(slug, version)
+        except Exception as e:
+            prompt = self._read_snapshot(slug, version)
+            if prompt is None:
+                raise
+            print(f"Failed to load prompt '{slug}' from Braintrust, using snapshot: {e}")
+        self._cache[key] = (prompt, time.monotonic())
+        return prompt
+
+    def _refresh_in_background(self, key: tuple[str, Optional[str]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._cache[key] = (self._fetch(*key), time.monotonic())
+            except Exception as e:
+                print(f"Background refresh of prompt '{key[0]}' failed, keeping cached copy: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"prompt-refresh-{key[0]}", daemon=True).start()
+
+    def _snapshot_path(self, slug: str, version: Optional[str]) -> Path:
+        return self.snapshot_dir / f"{slug}@{version or 'latest'}.json"
+
+    def _write_snapshot(self, slug: str, version: Optional[str], snapshot: dict):
+        path = self._snapshot_path(slug, version)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to write prompt snapshot {path}: {e}")
+
+    def _read_snapshot(self, slug: str, version: Optional[str]) -> Optional[Prompt]:
+        path = self._snapshot_path(slug, version)
+        if not path.exists():
+            return None
+        schema = PromptSchema.from_dict_deep(json.loads(path.read_text(encoding="utf-8")))
+        return Prompt(LazyValue(lambda: schema, use_mutex=False), {}, False)
+
+
+registry = PromptRegistry(project="Prodapt")
@@ -0,0 +1,164 @@
+"""
+Interview question bank.
+
+Questions live in a versioned JSON file (data/question_bank.json) and are
+loaded into an in-memory index keyed by (topic, difficulty) and by
+(topic, difficulty, tag), so picking a question never scans the bank.
+Workers notice when the file changes and swap in a freshly built index,
+so questions can be added without a restart.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+DEFAULT_QUESTION_BANK_PATH = Path(__file__).resolve().parent / "data" / "question_bank.json"
+
+# How often (seconds) get_question_bank() checks the file for changes
+RELOAD_CHECK_INTERVAL = 5.0
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+Difficulty = Literal["easy", "medium", "hard"]
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+class Question(BaseModel):
+    id: str
+    topic: str
+    difficulty: Difficulty
+    question: str
+    tags: list[str] = Field(default_factory=list)
+    # Used by answer_grading. The first tier marks an answer wrong when it
+    # mentions one of wrong_keywords (a known misconception) and none of the
+    # accepted keywords; everything else goes to the model tiers.
+    reference_answer: Optional[str] = None
+    keywords: list[list[str]] = Field(default_factory=list)
+    wrong_keywords: list[str] = Field(default_factory=list)
+
+
+def next_difficulty(difficulty: str, correct: bool) -> str:
+    """One step harder after a correct answer, one step easier otherwise (clamped)"""
+    index = DIFFICULTIES.index(difficulty.lower()) + (1 if correct else -1)
+    return DIFFICULTIES[max(0, min(len(DIFFICULTIES) - 1, index))]
+
+
+class QuestionBank:
+
+    def __init__(self, questions: Iterable[Question], version: int = 1):
+        self.version = version
+        self.by_id: dict[str, Question] = {}
+        self._topics: dict[str, str] = {}
+        self._by_key: dict[tuple, list[Question]] = {}
+        self._by_text: dict[str, Question] = {}
+
+        for question in questions:
+            if question.id in self.by_id:
+                raise ValueError(f"Duplicate question id '{question.id}'")
+            self.by_id[question.id] = question
+            self._by_text.setdefault(_normalize_text(question.question), question)
+            topic = question.topic.lower()
+            self._topics.setdefault(topic, question.topic)
+            self._by_key.setdefault((topic, question.difficulty), []).append(question)
+            for tag in question.tags:
+                self._by_key.setdefault((topic, question.difficulty, tag.lower()), []).append(question)
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_QUESTION_BANK_PATH) -> "QuestionBank":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([Question(**question) for question in data["questions"]], version=data.get("version", 1))
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    @property
+    def topics(self) -> list[str]:
+        return list(self._topics.values())
+
+    def has_topic(self, topic: str) -> bool:
+        return topic.lower() in self._topics
+
+    def find(self, text: str) -> Optional[Question]:
+        """Look up a question by its text (the agents pass questions around verbatim)"""
+        return self._by_text.get(_normalize_text(text))
+
+    def questions(self, topic: str, difficulty: str, tag: Optional[str] = None) -> list[Question]:
+        key = (topic.lower(), difficulty.lower()) if tag is None else (topic.lower(), difficulty.lower(), tag.lower())
+        return self._by_key.get(key, [])
+
+    def sample(self, topic: str, difficulty: str, exclude: Iterable[str] = (), tag: Optional[str] = None,
+               rng: random.Random = random) -> Optional[Question]:
+        """Pick a random question that is not in `exclude`.
+
+        If every question at the requested difficulty has been used, the
+        closest other difficulty is tried (medium before hard when stepping up
+        from easy, and so on). Returns None when nothing is left for the topic.
+        """
+        exclude = set(exclude)
+        requested = DIFFICULTIES.index(difficulty.lower())
+        for level in sorted(DIFFICULTIES, key=lambda d: abs(DIFFICULTIES.index(d) - requested)):
+            candidates = self.questions(topic, level, tag)
+            # A few random probes are enough while most of the list is unused;
+            # only a nearly exhausted list falls back to a scan.
+            for _ in range(8):
+                if not candidates:
+                    break
+                question = rng.choice(candidates)
+                if question.id not in exclude:
+                    return question
+            remaining = [question for question in candidates if question.id not in exclude]
+            if remaining:
+                return rng.choice(remaining)
+        return None
+
+
+class QuestionBankLoader:
+    """Holds the current bank for a file and reloads it when the file's mtime changes"""
+
+    def __init__(self, path: Path = DEFAULT_QUESTION_BANK_PATH, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._bank: Optional[QuestionBank] = None
+        self._mtime: Optional[int] = None
+        self._last_check = 0.0
+
+    def get(self) -> QuestionBank:
+        now = time.monotonic()
+        if self._bank is not None and now - self._last_check < self.check_interval:
+            return self._bank
+
+        with self._lock:
+            self._last_check = now
+            mtime = os.stat(self.path).st_mtime_ns
+            if self._bank is None or mtime != self._mtime:
+                # Build the new index fully before swapping it in; readers keep
+                # using the old one until then, and keep it if the new file is broken.
+                try:
+                    bank = QuestionBank.from_file(self.path)
+                except (ValueError, KeyError) as e:
+                    if self._bank is None:
+                        raise
+                    print(f"Failed to reload question bank, keeping v{self._bank.version}: {e}")
+                else:
+                    self._bank = bank
+                    print(f"Loaded question bank v{bank.version} ({len(bank)} questions)")
+                self._mtime = mtime
+            return self._bank
+
+
+_loader = QuestionBankLoader()
+
+
+def get_question_bank() -> QuestionBank:
+    return _loader.get()
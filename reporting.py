@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+from typing import Iterator, Optional
+
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session
+
+from models import JobApplication, JobApplicationAIEvaluation, JobPost
+from search import SEARCH_CONFIG
+
+# Rows fetched per round trip from the server-side cursor. Each batch is
+# serialised and flushed to the client before the next one is fetched, so
+# memory stays flat regardless of how many evaluations are exported.
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    "evaluation_id",
+    "job_application_id",
+    "first_name",
+    "last_name",
+    "email",
+    "resume_url",
+    "job_post_id",
+    "job_post_title",
+    "job_board_id",
+    "overall_score",
+    "evaluation",
+]
+
+
+def filter_evaluations(query,
+                       job_board_id: Optional[int] = None,
+                       job_post_id: Optional[int] = None,
+                       min_score: Optional[int] = None,
+                       max_score: Optional[int] = None,
+                       contains: Optional[dict] = None,
+                       strengths: Optional[str] = None,
+                       gaps: Optional[str] = None):
+    """Apply evaluation filters to a query that already joins JobApplication and JobPost"""
+    if job_board_id is not None:
+        query = query.filter(JobPost.job_board_id == job_board_id)
+    if job_post_id is not None:
+        query = query.filter(JobApplication.job_post_id == job_post_id)
+    if min_score is not None:
+        query = query.filter(JobApplicationAIEvaluation.overall_score >= min_score)
+    if max_score is not None:
+        query = query.filter(JobApplicationAIEvaluation.overall_score <= max_score)
+    if contains is not None:
+        # @> is served by the jsonb_path_ops GIN index on evaluation
+        query = query.filter(JobApplicationAIEvaluation.evaluation.contains(contains))
+    if strengths is not None:
+        query = query.filter(JobApplicationAIEvaluation.strengths_vector.bool_op("@@")(
+            func.websearch_to_tsquery(SEARCH_CONFIG, strengths)))
+    if gaps is not None:
+        query = query.filter(JobApplicationAIEvaluation.gaps_vector.bool_op("@@")(
+            func.websearch_to_tsquery(SEARCH_CONFIG, gaps)))
+    return query
+
+
+def _join_application_and_post(query):
+    return query \
+        .join(JobApplication, JobApplicationAIEvaluation.job_application_id == JobApplication.id) \
+        .join(JobPost, JobApplication.job_post_id == JobPost.id)
+
+
+def evaluations_query(**filters):
+    """Build a filtered query of evaluation entities"""
+    query = _join_application_and_post(select(JobApplicationAIEvaluation))
+    return filter_evaluations(query, **filters).order_by(JobApplicationAIEvaluation.id)
+
+
+def evaluation_export_query(**filters):
+    """Build the filtered evaluation export query joined with its application and job post"""
+    query = _join_application_and_post(select(
+        JobApplicationAIEvaluation.id.label("evaluation_id"),
+        JobApplicationAIEvaluation.job_application_id,
+        JobApplication.first_name,
+        JobApplication.last_name,
+        JobApplication.email,
+        JobApplication.resume_url,
+        JobApplication.job_post_id,
+        JobPost.title.label("job_post_title"),
+        JobPost.job_board_id,
+        JobApplicationAIEvaluation.overall_score,
+        JobApplicationAIEvaluation.evaluation,
+    ))
+    return filter_evaluations(query, **filters).order_by(JobApplicationAIEvaluation.id)
+
+
+def _stream_batches(db: Session, query):
+    # yield_per turns on stream_results, so psycopg2 uses a named (server-side)
+    # cursor instead of buffering the whole result set in the client.
+    result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+
+def stream_evaluations_ndjson(db: Session, query) -> Iterator[str]:
+    """Yield the export as newline-delimited JSON, one chunk per fetched batch"""
+    for rows in _stream_batches(db, query):
+        yield "".join(json.dumps(row._asdict()) + "\n" for row in rows)
+
+
+def stream_evaluations_csv(db: Session, query) -> Iterator[str]:
+    """Yield the export as CSV, one chunk per fetched batch. The evaluation JSON goes in a single column."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for rows in _stream_batches(db, query):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            values = row._asdict()
+            values["evaluation"] = json.dumps(values["evaluation"])
+            writer.writerow([values[column] for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+
+
+def top_applicants(db: Session, job_post_id: int, top: int, min_score: Optional[int] = None):
+    """Return the best scored applications for a job post with their latest evaluation"""
+    # Filtering out unscored rows lets ORDER BY overall_score DESC be served by
+    # a backward scan of ix_job_applications_job_post_id_overall_score, so only
+    # `top` rows are read. The latest evaluation comes from a LATERAL subquery
+    # run once per returned row, instead of loading every past evaluation.
+    latest_evaluation = select(JobApplicationAIEvaluation.evaluation) \
+        .filter(JobApplicationAIEvaluation.job_application_id == JobApplication.id) \
+        .order_by(JobApplicationAIEvaluation.id.desc()) \
+        .limit(1) \
+        .lateral("latest_evaluation")
+    query = select(JobApplication, latest_evaluation.c.evaluation) \
+        .outerjoin(latest_evaluation, true()) \
+        .filter(JobApplication.job_post_id == job_post_id) \
+        .filter(JobApplication.overall_score.isnot(None))
+    if min_score is not None:
+        query = query.filter(JobApplication.overall_score >= min_score)
+    query = query.order_by(JobApplication.overall_score.desc(), JobApplication.id.desc()).limit(top)
+
+    applicants = []
+    for job_application, evaluation in db.execute(query):
+        applicants.append({
+            "id": job_application.id,
+            "job_post_id": job_application.job_post_id,
+            "first_name": job_application.first_name,
+            "last_name": job_application.last_name,
+            "email": job_application.email,
+            "resume_url": job_application.resume_url,
+            "overall_score": job_application.overall_score,
+            "evaluation": evaluation,
+        })
+    return applicants
@@ -0,0 +1,385 @@
+"""
+Resume embeddings in Qdrant.
+
+ingest_resumes() embeds a batch of resumes through the Postgres embedding
+cache and upserts them into the "resumes" collection in bulk. Points use
+the JobApplication id as their id and LangChain's payload layout
+(page_content + metadata), so QdrantVectorStore can query the collection.
+
+Each point also carries a BM25 sparse vector of the resume text, so
+recommend_candidates() can rank by the dense vector alone or fuse it with
+a keyword ranking (hybrid). Results are filtered on the job post, job board
+and submission date. Those metadata fields have payload indexes, so Qdrant
+applies the filters while it walks the vector index instead of scanning the
+collection.
+
+Vector size and storage come from RESUME_EMBEDDING_DIMENSIONS and
+RESUME_VECTOR_QUANTIZATION (pick them with
+benchmarks/embedding_quantization.py).
+
+VECTOR_BACKEND=local and EMBEDDING_BACKEND=hashing run all of this in
+process without Qdrant or OpenAI (see vector_index.py).
+
+Backfill all existing applications (resumable, parallel):
+
+    python resume_index.py --workers 8 --checkpoint data/resume_backfill.json
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+from pydantic import BaseModel
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import (BinaryQuantization, BinaryQuantizationConfig, DatetimeRange, Distance,
+                                       FieldCondition, Filter, Fusion, FusionQuery, MatchValue, Modifier,
+                                       PayloadSchemaType, PointStruct, Prefetch, QuantizationConfig,
+                                       QuantizationSearchParams, ScalarQuantization, ScalarQuantizationConfig,
+                                       ScalarType, SearchParams, SparseVectorParams, VectorParams)
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+import bm25
+import file_storage
+from config import settings
+from converter import extract_text_from_pdf_bytes
+from db import get_db_session
+from embedding_cache import CachedEmbeddings
+from models import JobApplication, JobPost
+from vector_index import HashingEmbeddings, LocalVectorClient
+
+COLLECTION_NAME = "resumes"
+EMBEDDING_MODEL = "text-embedding-3-large"
+UPSERT_BATCH_SIZE = 256
+BACKFILL_CHUNK_SIZE = 512
+
+# Metadata fields recommendations filter on
+PAYLOAD_INDEXES = {
+    "metadata.job_post_id": PayloadSchemaType.INTEGER,
+    "metadata.job_board_id": PayloadSchemaType.INTEGER,
+    "metadata.submitted_at": PayloadSchemaType.DATETIME,
+}
+
+# Named sparse vector holding BM25 term weights (see bm25.py)
+SPARSE_VECTOR_NAME = "bm25"
+# Candidates each side of a hybrid query contributes to the fusion
+HYBRID_PREFETCH_LIMIT = 100
+
+# Candidates fetched per requested result and re-scored with the original
+# vectors. Binary codes rank more coarsely, so they need a wider shortlist.
+OVERSAMPLING = {"scalar": 2.0, "binary": 3.0}
+
+
+class ResumeDocument(BaseModel):
+    job_application_id: int
+    job_post_id: int
+    job_board_id: int
+    resume_url: str
+    submitted_at: datetime
+    text: str
+
+
+class Recommendation(BaseModel):
+    job_application_id: int
+    job_post_id: int
+    job_board_id: int
+    resume_url: str
+    submitted_at: datetime
+    score: float
+
+
+@lru_cache
+def get_vector_client() -> QdrantClient:
+    """Qdrant, or LocalVectorClient with VECTOR_BACKEND=local. Shared: a path= client locks its directory."""
+    if settings.VECTOR_BACKEND == "local":
+        return LocalVectorClient()
+    if settings.QDRANT_URL:
+        return QdrantClient(url=str(settings.QDRANT_URL), api_key=settings.QDRANT_API_KEY)
+    return QdrantClient(path="qdrant_store")
+
+
+def quantization_config(quantization: str) -> Optional[QuantizationConfig]:
+    """Quantized codes stay in RAM; the original vectors move to disk and are only read to re-score"""
+    if quantization == "scalar":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True))
+    if quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def search_params(quantization: str) -> Optional[SearchParams]:
+    if quantization == "none":
+        return None
+    return SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=OVERSAMPLING[quantization]))
+
+
+def ensure_collection(client: QdrantClient, dimensions: Optional[int] = None, quantization: Optional[str] = None):
+    """Create the collection and any missing payload indexes"""
+    dimensions = dimensions or settings.RESUME_EMBEDDING_DIMENSIONS
+    quantization = quantization or settings.RESUME_VECTOR_QUANTIZATION
+    if not client.collection_exists(COLLECTION_NAME):
+        client.create_collection(collection_name=COLLECTION_NAME,
+                                 vectors_config=VectorParams(size=dimensions, distance=Distance.COSINE,
+                                                             on_disk=quantization != "none"),
+                                 sparse_vectors_config={SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)},
+                                 quantization_config=quantization_config(quantization))
+    info = client.get_collection(COLLECTION_NAME)
+    if info.config.params.vectors.size != dimensions:
+        raise ValueError(f"The {COLLECTION_NAME} collection holds {info.config.params.vectors.size}-dimension "
+                         f"vectors, not {dimensions}; rebuild it with `python resume_index.py --recreate`")
+    if SPARSE_VECTOR_NAME not in (info.config.params.sparse_vectors or {}):
+        raise ValueError(f"The {COLLECTION_NAME} collection has no {SPARSE_VECTOR_NAME} sparse vectors; "
+                         f"rebuild it with `python resume_index.py --recreate`")
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        if field_name not in info.payload_schema:
+            client.create_payload_index(COLLECTION_NAME, field_name=field_name, field_schema=schema, wait=True)
+
+
+@lru_cache
+def get_embeddings() -> Embeddings:
+    # text-embedding-3 shortens its vectors natively (Matryoshka), so any size
+    # up to 3072 is a prefix of the full embedding rather than a different model
+    dimensions = settings.RESUME_EMBEDDING_DIMENSIONS
+    if settings.EMBEDDING_BACKEND == "hashing":
+        return HashingEmbeddings(dimensions)
+    underlying = OpenAIEmbeddings(model=EMBEDDING_MODEL, dimensions=dimensions, api_key=settings.OPENAI_API_KEY)
+    return CachedEmbeddings(underlying, EMBEDDING_MODEL, dimensions)
+
+
+def ingest_resumes(documents: list[ResumeDocument], client: QdrantClient, embeddings: Embeddings) -> int:
+    """Embed (cached, batched) and bulk upsert resumes. Re-ingesting a resume overwrites its point."""
+    if not documents:
+        return 0
+    vectors = embeddings.embed_documents([document.text for document in documents])
+    points = [PointStruct(id=document.job_application_id,
+                          vector={"": vector, SPARSE_VECTOR_NAME: bm25.document_vector(document.text)},
+                          payload={"page_content": document.text,
+                                   "metadata": {"url": document.resume_url,
+                                                "job_application_id": document.job_application_id,
+                                                "job_post_id": document.job_post_id,
+                                                "job_board_id": document.job_board_id,
+                                                "submitted_at": document.submitted_at.isoformat()}})
+              for document, vector in zip(documents, vectors)]
+    for start in range(0, len(points), UPSERT_BATCH_SIZE):
+        client.upsert(collection_name=COLLECTION_NAME, points=points[start:start + UPSERT_BATCH_SIZE], wait=True)
+    return len(points)
+
+
+def resume_document(job_application: JobApplication, text: str) -> ResumeDocument:
+    """job_application must have its job_post loaded"""
+    return ResumeDocument(job_application_id=job_application.id,
+                          job_post_id=job_application.job_post_id,
+                          job_board_id=job_application.job_post.job_board_id,
+                          resume_url=job_application.resume_url,
+                          submitted_at=job_application.created_at,
+                          text=text)
+
+
+def load_resume_document(job_application: JobApplication) -> ResumeDocument:
+    text = extract_text_from_pdf_bytes(file_storage.download_file(job_application.resume_url))
+    return resume_document(job_application, text)
+
+
+def index_resume(job_application: JobApplication, text: str):
+    """Index a newly submitted resume. Failures are logged, never raised: the index can be backfilled."""
+    try:
+        client = get_vector_client()
+        ensure_collection(client)
+        ingest_resumes([resume_document(job_application, text)], client, get_embeddings())
+    except Exception as e:
+        print(f"Failed to index resume of JobApplication #{job_application.id}: {e}")
+
+
+# ==============================================================================
+# RECOMMENDATIONS
+# ==============================================================================
+
+def recommendation_filter(job_post_id: Optional[int] = None,
+                          job_board_id: Optional[int] = None,
+                          submitted_after: Optional[datetime] = None,
+                          submitted_before: Optional[datetime] = None) -> Optional[Filter]:
+    conditions = []
+    if job_post_id is not None:
+        conditions.append(FieldCondition(key="metadata.job_post_id", match=MatchValue(value=job_post_id)))
+    if job_board_id is not None:
+        conditions.append(FieldCondition(key="metadata.job_board_id", match=MatchValue(value=job_board_id)))
+    if submitted_after is not None or submitted_before is not None:
+        conditions.append(FieldCondition(key="metadata.submitted_at",
+                                         range=DatetimeRange(gte=submitted_after, lt=submitted_before)))
+    return Filter(must=conditions) if conditions else None
+
+
+def recommend_candidates(query_vector: list[float],
+                         client: QdrantClient,
+                         job_post_id: Optional[int] = None,
+                         job_board_id: Optional[int] = None,
+                         submitted_after: Optional[datetime] = None,
+                         submitted_before: Optional[datetime] = None,
+                         min_score: Optional[float] = None,
+                         keywords: Optional[str] = None,
+                         limit: int = 20,
+                         offset: int = 0) -> dict:
+    """A page of the closest resumes, best first.
+
+    With keywords, the dense ranking is fused by reciprocal rank with a BM25
+    ranking of the keywords, so exact terms (certifications, frameworks)
+    count; scores are then fusion scores. min_score always applies to the
+    dense cosine similarity.
+
+    Only the metadata is returned with each point, not the resume text.
+    next_offset is None on the last page.
+    """
+    query_filter = recommendation_filter(job_post_id, job_board_id, submitted_after, submitted_before)
+    dense_params = search_params(settings.RESUME_VECTOR_QUANTIZATION)
+    if keywords:
+        candidates = max(HYBRID_PREFETCH_LIMIT, offset + limit)
+        response = client.query_points(collection_name=COLLECTION_NAME,
+                                       prefetch=[Prefetch(query=query_vector, filter=query_filter, params=dense_params,
+                                                          score_threshold=min_score, limit=candidates),
+                                                 Prefetch(query=bm25.query_vector(keywords), using=SPARSE_VECTOR_NAME,
+                                                          filter=query_filter, limit=candidates)],
+                                       query=FusionQuery(fusion=Fusion.RRF),
+                                       limit=limit,
+                                       offset=offset,
+                                       with_payload=["metadata"])
+    else:
+        response = client.query_points(collection_name=COLLECTION_NAME,
+                                       query=query_vector,
+                                       query_filter=query_filter,
+                                       search_params=dense_params,
+                                       score_threshold=min_score,
+                                       limit=limit,
+                                       offset=offset,
+                                       with_payload=["metadata"])
+    items = []
+    for point in response.points:
+        metadata = point.payload["metadata"]
+        items.append(Recommendation(job_application_id=metadata["job_application_id"],
+                                    job_post_id=metadata["job_post_id"],
+                                    job_board_id=metadata["job_board_id"],
+                                    resume_url=metadata["url"],
+                                    submitted_at=metadata["submitted_at"],
+                                    score=point.score))
+    return {"items": items, "next_offset": offset + limit if len(items) == limit else None}
+
+
+def recommend_for_job_post(job_post: JobPost, scope: str = "post", mode: str = "hybrid",
+                           keywords: Optional[str] = None, **kwargs) -> dict:
+    """Rank resumes against a job post's description.
+
+    scope is "post" (applicants to this post), "board" (anyone who applied on
+    the post's job board) or "all". mode "hybrid" also matches terms of
+    keywords (default: the description) lexically; "dense" does not.
+    """
+    client = get_vector_client()
+    ensure_collection(client)
+    query_vector = get_embeddings().embed_query(job_post.description)
+    if mode == "hybrid":
+        kwargs["keywords"] = keywords or job_post.description
+    if scope == "post":
+        kwargs["job_post_id"] = job_post.id
+    elif scope == "board":
+        kwargs["job_board_id"] = job_post.job_board_id
+    return recommend_candidates(query_vector, client, **kwargs)
+
+
+# ==============================================================================
+# BACKFILL
+# ==============================================================================
+
+def _read_checkpoint(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"last_id": 0, "ingested": 0, "failed": []}
+
+
+def _write_checkpoint(path: Path, checkpoint: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(checkpoint))
+    os.replace(tmp_path, path)
+
+
+def _ingest_batch(applications: list[JobApplication], client: QdrantClient,
+                  embeddings: Embeddings) -> tuple[int, list[int]]:
+    documents, failed = [], []
+    for application in applications:
+        try:
+            documents.append(load_resume_document(application))
+        except Exception as e:
+            print(f"Skipping JobApplication #{application.id}: {e}")
+            failed.append(application.id)
+    return ingest_resumes(documents, client, embeddings), failed
+
+
+def backfill(checkpoint_path: Path, workers: int = 4, batch_size: int = 32, limit: Optional[int] = None,
+             recreate: bool = False):
+    """Ingest every JobApplication after the checkpoint, in id order.
+
+    Applications are read in chunks; each chunk is split into batches that
+    are downloaded, embedded and upserted by parallel workers. The checkpoint
+    only advances once a whole chunk is done, so an interrupted run resumes
+    from the last completed chunk (repeats are cheap: the embedding cache
+    hits and upserts overwrite).
+
+    recreate drops the collection and starts over, e.g. after changing
+    RESUME_EMBEDDING_DIMENSIONS or RESUME_VECTOR_QUANTIZATION.
+    """
+    client = get_vector_client()
+    if recreate:
+        client.delete_collection(COLLECTION_NAME)
+        checkpoint_path.unlink(missing_ok=True)
+    checkpoint = _read_checkpoint(checkpoint_path)
+    ensure_collection(client)
+    embeddings = get_embeddings()
+    processed = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while limit is None or processed < limit:
+            chunk_size = BACKFILL_CHUNK_SIZE if limit is None else min(BACKFILL_CHUNK_SIZE, limit - processed)
+            with get_db_session() as db:
+                chunk = list(db.scalars(select(JobApplication)
+                                        .options(joinedload(JobApplication.job_post))
+                                        .filter(JobApplication.id > checkpoint["last_id"])
+                                        .order_by(JobApplication.id)
+                                        .limit(chunk_size)))
+            if not chunk:
+                break
+
+            batches = [chunk[start:start + batch_size] for start in range(0, len(chunk), batch_size)]
+            for ingested, failed in pool.map(lambda batch: _ingest_batch(batch, client, embeddings), batches):
+                checkpoint["ingested"] += ingested
+                checkpoint["failed"].extend(failed)
+
+            checkpoint["last_id"] = chunk[-1].id
+            _write_checkpoint(checkpoint_path, checkpoint)
+            processed += len(chunk)
+            print(f"Backfilled up to JobApplication #{checkpoint['last_id']}: {checkpoint['ingested']} ingested, "
+                  f"{len(checkpoint['failed'])} failed")
+            if isinstance(embeddings, CachedEmbeddings):
+                print(f"Embedding cache: {embeddings.hits} hits / {embeddings.misses} misses")
+
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill resume embeddings for existing job applications")
+    parser.add_argument("--checkpoint", type=Path, default=Path("data/resume_backfill.json"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=32, help="resumes per embed/upsert batch")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many applications")
+    parser.add_argument("--recreate", action="store_true", help="drop the collection and re-ingest everything")
+    args = parser.parse_args()
+    backfill(args.checkpoint, workers=args.workers, batch_size=args.batch_size, limit=args.limit,
+             recreate=args.recreate)
+
+
+if __name__ == "__main__":
+    main()
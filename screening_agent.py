@@ -11,109 +11,45 @@ Architecture:
 - LangChain for check_answer tool
 """
 
-import random
+import asyncio
 from typing import Literal, Optional
-from pydantic import BaseModel, Field
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from pydantic import BaseModel
 
 # LangChain imports for check_answer
 from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 
-# Braintrust imports for check_answer
-from braintrust import load_prompt
-from openai import OpenAI
+# Tiered answer grading for check_answer
+import answer_grading
 
 # Agents SDK imports
 from config import settings
-from agents import Agent, Runner, function_tool, set_default_openai_key, SQLiteSession
+from agents import Agent, Runner, function_tool, set_default_openai_key
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
 from models import JobPost
+from db import get_db_session
+import interview_store
+from interview_store import PostgresSession
+from transcript_writer import transcript_writer
+import job_post_skills
+import skill_taxonomy
+import metrics
+from question_bank import Question, get_question_bank, next_difficulty
+from job_post_skills import ExtractedSkills
 
 # Tracing imports
 from agents import set_trace_processors
 from braintrust import init_logger
 from braintrust.wrappers.openai import BraintrustTracingProcessor
 
-# ==============================================================================
-# DATABASE HELPERS
-# ==============================================================================
-
-def get_db_session():
-    """Create and return a SQLAlchemy session for database operations"""
-    engine = create_engine(str(settings.DATABASE_URL))
-    Session = sessionmaker(bind=engine)
-    return Session()
-
-
-# Internal state for interview sessions
-interview_state = {
-    "session123": {
-        "skills": [],
-        "evaluation": []  # list of tuples (Skill, True/False)
-    }
-}
-
-# ==============================================================================
-# QUESTION BANK (Lab 15)
-# ==============================================================================
-
-question_bank = {
-    "python": {
-        "easy": [
-            "If `d` is a dictionary, then what does `d['name'] = 'Siddharta'` do?",
-            "if `l1` is a list and `l2` is a list, then what is `l1 + l2`?",
-        ],
-        "medium": [
-            "How do you remove a key from a dictionary?",
-            "How do you reverse a list in python?"
-        ],
-        "hard": [
-            "If `d` is a dictionary, then what does `d.get('name', 'unknown')` do?",
-            "What is the name of the `@` operator (Example `a @ b`) in Python?"
-        ]
-    },
-    "sql": {
-        "easy": [
-            "What does LIMIT 1 do at the end of a SQL statement?",
-            "Explain this SQL: SELECT product_name FROM products WHERE cost < 500"
-        ],
-        "medium": [
-            "What is a view in SQL?",
-            "How do we find the number of records in a table called `products`?"
-        ],
-        "hard": [
-            "What is the difference between WHERE and HAVING in SQL?",
-            "Name a window function in SQL"
-        ]
-    },
-    "system design": {
-        "easy": [
-            "Give one reason where you would prefer a SQL database over a Vector database",
-            "RAG requires a vector database. True or False?"
-        ],
-        "medium": [
-            "Give one advantage and one disadvantage of chaining multiple prompts?",
-            "Mention three reasons why we may not want to use the most powerful model?"
-        ],
-        "hard": [
-            "Mention ways to speed up retrieval from a vector database",
-            "Give an overview of Cost - Accuracy - Latency tradeoffs in an AI system"
-        ]
-    }
-}
+# Questions the evaluator asks per skill (see EVALUATION_SYSTEM_PROMPT)
+QUESTIONS_PER_SKILL = 3
 
 # ==============================================================================
 # PYDANTIC MODELS FOR STRUCTURED OUTPUT
 # ==============================================================================
 
-class ExtractedSkills(BaseModel):
-    """Structured output for skill extraction"""
-    skills: list[str] = Field(description="List of technical skills extracted from job description")
-
-
 class ValidationResult(BaseModel):
     """Structured output for answer validation"""
     correct: bool
@@ -189,15 +125,14 @@ You are a specialised skill evaluator. Your job is to evaluate the candidate's p
 # INSTRUCTIONS
 
 1. Identify which skill you're evaluating (mentioned in the conversation)
-2. Use get_question tool to get a question (start with 'medium' difficulty)
+2. Use get_question tool with the session_id to get the first question (start with 'medium' difficulty)
 3. Ask the question VERBATIM - do not modify it
 4. Wait for the user's answer
-5. Use check_answer tool to evaluate the answer
-6. Decide next difficulty:
-   - Correct answer → higher difficulty (max: hard)
-   - Incorrect answer → lower difficulty (min: easy)
-7. Repeat steps 2-6 until 3 questions asked
-8. After 3 questions, hand off to "Interview Orchestrator Agent" with the evaluation result
+5. Use grade_and_get_next_question tool with the session_id, the skill, the question, the answer and the question's difficulty.
+   It grades the answer and, until 3 questions have been asked for the skill, returns the next question,
+   already at the right difficulty (harder after a correct answer, easier after an incorrect one)
+6. If next_question is not null, ask it VERBATIM and go back to step 4
+7. When next_question is null, hand off to "Interview Orchestrator Agent" with the evaluation result
 
 # DECISION RULES:
 
@@ -238,78 +173,51 @@ Return only concrete skill names as a list.
 # TOOLS - Lab 14
 # ==============================================================================
 
-@function_tool
-def extract_skills(session_id: str, job_id: int) -> list[str]:
-    """Given a job_id, lookup job description from database and extract skills using AI"""
+def _extract_skills(session_id: str, job_id: int) -> list[str]:
     job_id = int(job_id)
     
-    # 1. Fetch JobPost from real database
+    # 1. Load the skills extracted for this JobPost (computed once per description)
     db_session = get_db_session()
     try:
-        job_post = db_session.query(JobPost).filter(JobPost.id == job_id).first()
-        if not job_post:
-            raise ValueError(f"JobPost with id {job_id} not found")
-        job_description = job_post.description
-        print(f"Fetched JobPost #{job_id}: {job_post.title}")
+        extracted_skills = job_post_skills.get_job_post_skills(db_session, job_id)
+        print(f"Loaded skills for JobPost #{job_id}: {extracted_skills}")
     finally:
         db_session.close()
     
-    # 2. Extract skills using LangChain
-    llm = ChatOpenAI(model="gpt-4.1", temperature=0, api_key=settings.OPENAI_API_KEY)
-    parser = PydanticOutputParser(pydantic_object=ExtractedSkills)
-    
-    prompt = PromptTemplate.from_template("""
-Extract technical skills from this job description.
-
-Return a JSON with a "skills" field containing a list of skill names.
-Focus on: programming languages, frameworks, databases, cloud platforms.
-
-{format_instructions}
-
-Job Description:
-{description}
-""").partial(format_instructions=parser.get_format_instructions())
-    
-    chain = prompt | llm | parser
-    result = chain.invoke({"description": job_description})
-    extracted_skills = result.skills
-    
-    # 3. Filter to only skills that exist in question_bank
-    available_skills = list(question_bank.keys())  # ["python", "sql", "system design"]
-    skills = []
-    for skill in extracted_skills:
-        skill_lower = skill.lower()
-        for available in available_skills:
-            if available in skill_lower or skill_lower in available:
-                # Capitalize properly
-                skills.append(available.title() if available != "system design" else "System Design")
-                break
+    # 2. Map to canonical taxonomy skills and keep the ones we have questions for
+    skills = [skill for skill in skill_taxonomy.get_taxonomy().match_all(extracted_skills)
+              if get_question_bank().has_topic(skill)]
     
     # Fallback: if no matching skills found, use defaults
     if not skills:
         skills = ["Python", "SQL", "System Design"]
         print(f"No matching skills found, using defaults: {skills}")
     
-    # 4. Save to interview state
-    if session_id not in interview_state:
-        interview_state[session_id] = {"skills": [], "evaluation": []}
-    interview_state[session_id]["skills"] = skills
+    # 3. Save to interview state
+    db_session = get_db_session()
+    try:
+        interview_store.set_skills(db_session, session_id, skills, job_post_id=job_id)
+    finally:
+        db_session.close()
     
     print(f"Extracted skills (filtered): {skills}")
     return skills
 
 
-@function_tool
-def update_evaluation(session_id: str, skill: str, evaluation_result: bool) -> bool:
-    """Save evaluation result to the database"""
+def _update_evaluation(session_id: str, skill: str, evaluation_result: bool) -> bool:
     try:
         print(f"Saving to DB: {skill} - {evaluation_result}")
         if isinstance(evaluation_result, str):
             evaluation_result = evaluation_result.lower() == "true"
         
-        if session_id not in interview_state:
-            interview_state[session_id] = {"skills": [], "evaluation": []}
-        interview_state[session_id]["evaluation"].append((skill, evaluation_result))
+        # The evaluation marks the end of the skill's conversation segment, so
+        # buffered transcript items must be in the table first
+        transcript_writer.flush()
+        db_session = get_db_session()
+        try:
+            interview_store.add_evaluation(db_session, session_id, skill, evaluation_result)
+        finally:
+            db_session.close()
         return True
     except KeyError:
         return False
@@ -319,75 +227,134 @@ def update_evaluation(session_id: str, skill: str, evaluation_result: bool) -> b
 # TOOLS - Lab 15
 # ==============================================================================
 
-@function_tool
-def get_question(topic: str, difficulty: Literal['easy', 'medium', 'hard']) -> str:
-    """Return a question from the question bank given a topic and the difficulty of the question"""
+def _get_question(session_id: str, topic: str, difficulty: Literal['easy', 'medium', 'hard'],
+                  tag: Optional[str] = None) -> Optional[Question]:
+    db_session = get_db_session()
     try:
-        questions = question_bank[topic.lower()][difficulty.lower()]
-        question = random.choice(questions)
-        print(f"📝 Question ({difficulty}): {question}")
-        return question
-    except KeyError:
+        question = interview_store.ask_question(db_session, session_id, topic, difficulty, tag)
+    finally:
+        db_session.close()
+    
+    if question is not None:
+        print(f"📝 Question ({question.difficulty}): {question.question}")
+    return question
+
+
+def _question_text(question: Optional[Question], topic: str, difficulty: str) -> str:
+    if question is None:
         return f"No questions available for topic '{topic}' at difficulty '{difficulty}'"
+    return question.question
 
 
-@function_tool
-def check_answer(skill: str, question: str, answer: str) -> dict:
-    """Given a question and an answer for a particular skill, validate if the answer is correct. Returns a dict with 'correct' and 'reasoning' keys."""
+def _check_answer(skill: str, question: str, answer: str) -> dict:
     
-    # Load prompt from Braintrust
-    prompt = load_prompt(project="Prodapt", slug="check-answer-prompt-b08b")
-    details = prompt.build(skill=skill, question=question, answer=answer)
-    
-    # Create OpenAI client and call the model
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
-    response = client.chat.completions.create(
-        model="gpt-5.1-instant", 
-        temperature=0,
-        response_format=details["response_format"],
-        messages=details["messages"]
-    )
-    
-    result = json.loads(response.choices[0].message.content)
-    print(f"✅ Evaluation: {result['correct']} - {result['reasoning']}")
-    return result
+    # Cheap tiers first (keywords, small model); the full Braintrust prompt only when they are unsure
+    result = answer_grading.grade_answer(skill, question, answer)
+    print(f"✅ Evaluation ({result['tier']}): {result['correct']} - {result['reasoning']}")
+    return {"correct": result["correct"], "reasoning": result["reasoning"]}
 
 
 # ==============================================================================
 # TOOLS - Lab 16
 # ==============================================================================
 
-@function_tool
-def get_next_skill_to_evaluate(session_id: str) -> Optional[str]:
-    """Retrieve the next skill to evaluate. Returns None if there are no more skills to evaluate"""
-    if session_id not in interview_state:
-        return None
+def _get_next_skill_to_evaluate(session_id: str) -> Optional[str]:
+    db_session = get_db_session()
+    try:
+        next_skill = interview_store.get_next_skill(db_session, session_id)
+        if next_skill is None:
+            interview_store.save_result(db_session, session_id)
+    finally:
+        db_session.close()
     
-    all_skills = interview_state[session_id]["skills"]
-    evaluated = interview_state[session_id]["evaluation"]
-    evaluated_skills = [item[0] for item in evaluated]
-    remaining_skills = set(all_skills) - set(evaluated_skills)
+    if next_skill is None:
+        print("No more skills")
+    else:
+        print(f"NEXT SKILL: {next_skill}")
+    return next_skill
+
+
+# ==============================================================================
+# TOOLS - GRADE AND NEXT QUESTION
+# ==============================================================================
+
+def _grade_and_get_next_question(session_id: str, skill: str, question: str, answer: str,
+                                 difficulty: str, tag: Optional[str] = None) -> tuple[dict, str, Optional[Question]]:
+    result = _check_answer(skill, question, answer)
+    next_level = next_difficulty(difficulty, result["correct"])
     
+    # Only reserve a question when another one will be asked for this skill
+    db_session = get_db_session()
     try:
-        next_skill = remaining_skills.pop()
-        print(f"NEXT SKILL: {next_skill}")
-        return next_skill
-    except KeyError:
-        print("No more skills")
-        return None
+        next_question = interview_store.ask_question(db_session, session_id, skill, next_level, tag,
+                                                     max_per_topic=QUESTIONS_PER_SKILL)
+    finally:
+        db_session.close()
+    return result, next_level, next_question
+
+
+# ==============================================================================
+# ASYNC TOOLS
+# ==============================================================================
+
+# The Agents SDK calls sync tools directly on the event loop, so every tool is
+# exposed as a coroutine that runs the blocking DB/LLM work in a thread. This
+# keeps one worker able to serve many interviews concurrently.
+
+@function_tool
+async def extract_skills(session_id: str, job_id: int) -> list[str]:
+    """Given a job_id, lookup job description from database and extract skills using AI"""
+    with metrics.timer("interview_tool_seconds.extract_skills"):
+        return await asyncio.to_thread(_extract_skills, session_id, job_id)
+
+
+@function_tool
+async def update_evaluation(session_id: str, skill: str, evaluation_result: bool) -> bool:
+    """Save evaluation result to the database"""
+    with metrics.timer("interview_tool_seconds.update_evaluation"):
+        return await asyncio.to_thread(_update_evaluation, session_id, skill, evaluation_result)
+
+
+@function_tool
+async def get_question(session_id: str, topic: str, difficulty: Literal['easy', 'medium', 'hard'],
+                       tag: Optional[str] = None) -> str:
+    """Return a question from the question bank given a topic and the difficulty of the question. Questions already asked in this session are never repeated. Optionally restrict to questions with the given tag."""
+    with metrics.timer("interview_tool_seconds.get_question"):
+        question = await asyncio.to_thread(_get_question, session_id, topic, difficulty, tag)
+    return _question_text(question, topic, difficulty)
+
+
+@function_tool
+async def grade_and_get_next_question(session_id: str, skill: str, question: str, answer: str,
+                                      difficulty: Literal['easy', 'medium', 'hard'],
+                                      tag: Optional[str] = None) -> dict:
+    """Grade the candidate's answer to a question of the given difficulty and return the next question for the skill: one step harder if the answer was correct, one step easier otherwise, restricted to the given tag if any. next_question is null once 3 questions have been asked for the skill (or none are left). Returns a dict with 'correct', 'reasoning', 'next_difficulty' and 'next_question' keys."""
+    with metrics.timer("interview_tool_seconds.grade_and_get_next_question"):
+        result, next_level, next_question = await asyncio.to_thread(
+            _grade_and_get_next_question, session_id, skill, question, answer, difficulty, tag)
+    return {
+        "correct": result["correct"],
+        "reasoning": result["reasoning"],
+        "next_difficulty": next_question.difficulty if next_question else None,
+        "next_question": next_question.question if next_question else None,
+    }
+
+
+@function_tool
+async def get_next_skill_to_evaluate(session_id: str) -> Optional[str]:
+    """Retrieve the next skill to evaluate. Returns None if there are no more skills to evaluate"""
+    with metrics.timer("interview_tool_seconds.get_next_skill_to_evaluate"):
+        return await asyncio.to_thread(_get_next_skill_to_evaluate, session_id)
 
 
 # ==============================================================================
 # MAIN RUN FUNCTION (Lab 16)
 # ==============================================================================
 
-def run(session_id: str, job_id: int):
-    """Run the multi-agent interview system with handoffs"""
-    
-    # 1. Create session
-    session = SQLiteSession(f"screening-{session_id}")
+def build_interview_agents() -> Agent:
+    """Create the orchestrator and evaluator agents with bidirectional handoffs. Returns the orchestrator."""
     
-    # 2. Create Orchestrator Agent
+    # 1. Create Orchestrator Agent
     orchestrator_agent = Agent(
         name="Interview Orchestrator Agent",
         instructions=ORCHESTRATOR_SYSTEM_PROMPT.format(
@@ -397,27 +364,43 @@ def run(session_id: str, job_id: int):
         tools=[extract_skills, get_next_skill_to_evaluate, update_evaluation]
     )
     
-    # 3. Create Evaluation Agent
+    # 2. Create Evaluation Agent
     evaluation_agent = Agent(
         name="Skills Evaluator Agent",
         instructions=EVALUATION_SYSTEM_PROMPT.format(
             RECOMMENDED_PROMPT_PREFIX=RECOMMENDED_PROMPT_PREFIX
         ),
         model="gpt-4.1",
-        tools=[get_question, check_answer]
+        tools=[get_question, grade_and_get_next_question]
     )
     
-    # 4. Configure handoffs (bidirectional)
+    # 3. Configure handoffs (bidirectional)
     orchestrator_agent.handoffs = [evaluation_agent]
     evaluation_agent.handoffs = [orchestrator_agent]
+    return orchestrator_agent
+
+
+def run(session_id: str, job_id: int):
+    """Run the multi-agent interview system with handoffs from the terminal.
+
+    The web app serves interviews over a WebSocket instead, see interview_runtime.py.
+    """
+    
+    # 1. Create session (conversation items are stored in Postgres via the write-behind buffer)
+    session = PostgresSession(session_id, writer=transcript_writer)
     
-    # 5. Run the agent loop
+    # 2. Create the agents
+    orchestrator_agent = build_interview_agents()
+    
+    # 3. Run the agent loop
     user_input = ORCHESTRATOR_USER_PROMPT.format(job_id=job_id, session_id=session_id)
     agent = orchestrator_agent
     
     while user_input != 'bye':
         result = Runner.run_sync(agent, user_input, session=session, max_turns=20)
         agent = result.last_agent
+        usage = result.context_wrapper.usage
+        print(f"[{usage.input_tokens} input / {usage.output_tokens} output tokens]")
         print(result.final_output)
         user_input = input("User: ")
 
@@ -459,20 +442,16 @@ def check_answer_standalone(skill: str, question: str, answer: str) -> Validatio
     return result
 
 
-def get_next_skill_standalone(session_id: str) -> Optional[str]:
+def get_next_skill_standalone(session_id: str, db_session=None) -> Optional[str]:
     """Standalone function for testing get_next_skill_to_evaluate logic"""
-    if session_id not in interview_state:
-        return None
-    
-    all_skills = interview_state[session_id]["skills"]
-    evaluated = interview_state[session_id]["evaluation"]
-    evaluated_skills = [item[0] for item in evaluated]
-    remaining_skills = set(all_skills) - set(evaluated_skills)
+    if db_session is not None:
+        return interview_store.get_next_skill(db_session, session_id)
     
+    db_session = get_db_session()
     try:
-        return remaining_skills.pop()
-    except KeyError:
-        return None
+        return interview_store.get_next_skill(db_session, session_id)
+    finally:
+        db_session.close()
 
 
 # ==============================================================================
@@ -494,9 +473,17 @@ def main():
     print("=" * 60)
     
     run(session_id, job_id)
+    transcript_writer.close()
+    
+    db_session = get_db_session()
+    try:
+        interview_store.save_result(db_session, session_id)
+        final_state = interview_store.get_state(db_session, session_id)
+    finally:
+        db_session.close()
     
     print("\n" + "=" * 60)
-    print(f"FINAL EVALUATION STATE: {interview_state}")
+    print(f"FINAL EVALUATION STATE: {final_state}")
     print("=" * 60)
 
 
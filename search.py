@@ -0,0 +1,67 @@
+import base64
+import json
+from typing import Optional
+
+from sqlalchemy import cast, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import REAL
+from sqlalchemy.orm import Session
+
+from models import JobBoard, JobPost
+
+SEARCH_CONFIG = "english"
+TITLE_HEADLINE_OPTIONS = "HighlightAll=true, StartSel=<mark>, StopSel=</mark>"
+DESCRIPTION_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(rank: float, job_post_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, job_post_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        rank, job_post_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(job_post_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def search_job_posts(db: Session, q: str, board: Optional[str] = None,
+                     limit: int = 20, cursor: Optional[str] = None):
+    """Full-text search over open job posts, best match first, paginated by keyset cursor"""
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(JobPost.search_vector, ts_query)
+
+    query = select(
+        JobPost.id,
+        JobPost.title,
+        JobPost.job_board_id,
+        rank.label("rank"),
+        func.ts_headline(SEARCH_CONFIG, JobPost.title, ts_query, TITLE_HEADLINE_OPTIONS).label("title_highlight"),
+        func.ts_headline(SEARCH_CONFIG, JobPost.description, ts_query,
+                         DESCRIPTION_HEADLINE_OPTIONS).label("description_highlight"),
+    ) \
+        .filter(JobPost.search_vector.bool_op("@@")(ts_query)) \
+        .filter(JobPost.is_open)
+
+    if board is not None:
+        query = query.join(JobPost.job_board).filter(JobBoard.slug == board)
+    if cursor is not None:
+        # Resume strictly after the last row of the previous page. The rank is
+        # cast back to real so it compares equal to the value Postgres returned.
+        cursor_rank, cursor_id = decode_cursor(cursor)
+        query = query.filter(tuple_(rank, JobPost.id) < tuple_(cast(literal(cursor_rank), REAL), cursor_id))
+
+    # ts_headline is only evaluated for the rows that survive ORDER BY/LIMIT
+    query = query.order_by(rank.desc(), JobPost.id.desc()).limit(limit + 1)
+    rows = db.execute(query).all()
+
+    results = [row._asdict() for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        next_cursor = encode_cursor(last["rank"], last["id"])
+    return {"results": results, "next_cursor": next_cursor}
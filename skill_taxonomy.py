@@ -0,0 +1,118 @@
+"""
+Skill taxonomy: canonical skill names and their aliases.
+
+Free-text skills (from the LLM extractor, resumes, job posts) are mapped to a
+canonical name in two steps:
+
+1. Exact lookup of the normalised text in a dict of every name and alias.
+2. Token lookup: the text is split into tokens and every alias that appears
+   in it as a whole-token phrase is a candidate; the longest one wins. Aliases
+   are indexed as token tuples, so a lookup is one dict probe per token
+   position and alias length, whatever the number of aliases.
+
+Matching whole tokens is what keeps "sql" from matching "nosql" and "python"
+from matching "pythonic". Both steps are independent of the taxonomy size.
+"""
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent / "data" / "skill_taxonomy.json"
+
+# A token is a run of word characters, + and #, optionally joined by . - or /
+# ("c++", "c#", "node.js", "t-sql", "ci/cd"). A leading dot keeps ".net".
+_TOKEN_RE = re.compile(r"\.?[\w+#]+(?:[.\-/][\w+#]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _TOKEN_RE.findall(text)
+
+
+def normalize(text: str) -> str:
+    """Canonical form used as the exact lookup key: casefolded tokens joined by single spaces"""
+    return " ".join(tokenize(text))
+
+
+def _token_key(token: str) -> str:
+    # Light plural folding so "relational database" matches "relational databases".
+    # Applied to both sides of the comparison, so words like "redis" stay consistent.
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+class SkillTaxonomy:
+
+    def __init__(self, skills: Iterable[dict], version: int = 1):
+        self.version = version
+        self.canonical_names: list[str] = []
+        self._exact: dict[str, str] = {}
+        self._phrases: dict[tuple[str, ...], str] = {}
+
+        for skill in skills:
+            name = skill["name"]
+            self.canonical_names.append(name)
+            for alias in [name, *skill.get("aliases", [])]:
+                self._add_alias(alias, name)
+        self._phrase_lengths = sorted({len(phrase) for phrase in self._phrases}, reverse=True)
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_TAXONOMY_PATH) -> "SkillTaxonomy":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["skills"], version=data.get("version", 1))
+
+    def _add_alias(self, alias: str, name: str):
+        key = normalize(alias)
+        if not key:
+            return
+        existing = self._exact.setdefault(key, name)
+        if existing != name:
+            raise ValueError(f"Alias '{alias}' is used by both '{existing}' and '{name}'")
+        phrase = tuple(_token_key(token) for token in key.split(" "))
+        self._phrases.setdefault(phrase, name)
+
+    def __len__(self) -> int:
+        return len(self.canonical_names)
+
+    def canonical(self, text: str) -> Optional[str]:
+        """Exact (normalised) lookup of a name or alias"""
+        return self._exact.get(normalize(text))
+
+    def match(self, text: str) -> Optional[str]:
+        """Map free text to a canonical skill: exact match first, then the longest whole-token alias"""
+        tokens = tokenize(text)
+        exact = self._exact.get(" ".join(tokens))
+        if exact is not None:
+            return exact
+
+        keys = [_token_key(token) for token in tokens]
+        best_name, best_length = None, 0
+        for i in range(len(keys)):
+            for length in self._phrase_lengths:
+                if length <= best_length:
+                    break
+                name = self._phrases.get(tuple(keys[i:i + length]))
+                if name is not None:
+                    best_name, best_length = name, length
+                    break
+        return best_name
+
+    def match_all(self, texts: Iterable[str]) -> list[str]:
+        """Canonical skills for each text that matches, de-duplicated, in first-seen order"""
+        matched = {}
+        for text in texts:
+            name = self.match(text)
+            if name is not None:
+                matched.setdefault(name, None)
+        return list(matched)
+
+
+@lru_cache
+def get_taxonomy() -> SkillTaxonomy:
+    return SkillTaxonomy.from_file()
@@ -0,0 +1,103 @@
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models import JobPostStats
+
+# Scores are 0-100 and bucketed by tens; 100 falls in the last (90-100) bucket.
+SCORE_BUCKET_COUNT = 10
+
+
+def score_bucket(score: int) -> int:
+    return min(max(score, 0) // 10, SCORE_BUCKET_COUNT - 1)
+
+
+def _ensure_stats_row(db: Session, job_post_id: int, job_board_id: int):
+    stmt = insert(JobPostStats).values(job_post_id=job_post_id,
+                                       job_board_id=job_board_id,
+                                       application_count=0,
+                                       evaluated_count=0,
+                                       score_sum=0,
+                                       prescreened_out_count=0,
+                                       score_histogram=[0] * SCORE_BUCKET_COUNT)
+    db.execute(stmt.on_conflict_do_nothing(index_elements=[JobPostStats.job_post_id]))
+
+
+def record_application(db: Session, job_post_id: int, job_board_id: int):
+    """Count a new application. Call inside the transaction that inserts it."""
+    _ensure_stats_row(db, job_post_id, job_board_id)
+    db.execute(update(JobPostStats)
+               .where(JobPostStats.job_post_id == job_post_id)
+               .values(application_count=JobPostStats.application_count + 1))
+
+
+def record_evaluation(db: Session, job_post_id: int, job_board_id: int, score: int,
+                      previous_score: Optional[int] = None):
+    """Count an evaluation and its score bucket. Call inside the transaction that inserts it.
+
+    previous_score is the application's overall_score before this evaluation.
+    A re-evaluation moves the application from its old bucket to the new one
+    instead of counting it twice.
+    """
+    _ensure_stats_row(db, job_post_id, job_board_id)
+    # Postgres arrays are 1-indexed. A single UPDATE holds the row lock, so
+    # concurrent evaluations of the same post never lose increments.
+    bucket = JobPostStats.score_histogram[score_bucket(score) + 1]
+    if previous_score is None:
+        values = {JobPostStats.evaluated_count: JobPostStats.evaluated_count + 1,
+                  JobPostStats.score_sum: JobPostStats.score_sum + score,
+                  bucket: bucket + 1}
+    else:
+        values = {JobPostStats.score_sum: JobPostStats.score_sum + score - previous_score}
+        if score_bucket(previous_score) != score_bucket(score):
+            previous_bucket = JobPostStats.score_histogram[score_bucket(previous_score) + 1]
+            values.update({previous_bucket: previous_bucket - 1, bucket: bucket + 1})
+    db.execute(update(JobPostStats)
+               .where(JobPostStats.job_post_id == job_post_id)
+               .values(values))
+
+
+def record_prescreened_out(db: Session, job_post_id: int, job_board_id: int):
+    """Count an application the pre-screen kept from the LLM evaluator (one LLM call saved)"""
+    _ensure_stats_row(db, job_post_id, job_board_id)
+    db.execute(update(JobPostStats)
+               .where(JobPostStats.job_post_id == job_post_id)
+               .values(prescreened_out_count=JobPostStats.prescreened_out_count + 1))
+
+
+def _summarise(rows):
+    application_count = sum(row.application_count for row in rows)
+    evaluated_count = sum(row.evaluated_count for row in rows)
+    score_sum = sum(row.score_sum for row in rows)
+    histogram = [sum(counts) for counts in zip(*(row.score_histogram for row in rows))] \
+        or [0] * SCORE_BUCKET_COUNT
+    return {
+        "application_count": application_count,
+        "evaluated_count": evaluated_count,
+        "average_score": round(score_sum / evaluated_count, 1) if evaluated_count else None,
+        "llm_calls_saved": sum(row.prescreened_out_count for row in rows),
+        "score_histogram": [
+            {"min_score": bucket * 10,
+             "max_score": 100 if bucket == SCORE_BUCKET_COUNT - 1 else bucket * 10 + 9,
+             "count": count}
+            for bucket, count in enumerate(histogram)
+        ],
+    }
+
+
+def job_post_stats(db: Session, job_post_id: int):
+    row = db.get(JobPostStats, job_post_id)
+    return {"job_post_id": job_post_id, **_summarise([row] if row else [])}
+
+
+def job_board_stats(db: Session, job_board_id: int):
+    rows = db.scalars(select(JobPostStats)
+                      .filter(JobPostStats.job_board_id == job_board_id)
+                      .order_by(JobPostStats.job_post_id)).all()
+    return {
+        "job_board_id": job_board_id,
+        **_summarise(rows),
+        "job_posts": [{"job_post_id": row.job_post_id, **_summarise([row])} for row in rows],
+    }
@@ -0,0 +1,202 @@
+"""
+Schema-constrained LLM output with a local repair pass before any retry.
+
+Responses are requested with OpenAI's json_schema response format (strict),
+generated from the Pydantic model the caller wants back, so the model cannot
+add comments, extra keys or drop fields. Output can still come back broken:
+truncated at max_tokens, wrapped in a code fence, or refused. parse() then
+tries repair_json(), which closes what was left open and strips comments and
+trailing commas, and only if that fails does the caller pay for a retry.
+
+Counters per model in /api/metrics (labels folded into the name):
+
+    llm_output.parse_failures.<model>   responses that did not validate as is
+    llm_output.repaired.<model>         ... that repair_json() recovered
+    llm_output.retries.<model>          extra calls made after a failed parse
+    llm_output.failures.<model>         calls given up on after the retries
+"""
+
+import copy
+import json
+from typing import Callable, TypeVar
+
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel, ValidationError
+
+import metrics
+
+# Retries after a response that neither validates nor repairs
+MAX_RETRIES = 1
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    pass
+
+
+def _strict(schema):
+    if isinstance(schema, list):
+        for item in schema:
+            _strict(item)
+        return
+    if not isinstance(schema, dict):
+        return
+    # Strict mode takes neither defaults nor optional keys
+    schema.pop("title", None)
+    schema.pop("default", None)
+    if "properties" in schema:
+        schema["additionalProperties"] = False
+        schema["required"] = list(schema["properties"])
+        for property_schema in schema["properties"].values():
+            _strict(property_schema)
+    for key, value in schema.items():
+        if key not in ("properties", "$defs"):
+            _strict(value)
+    for definition in schema.get("$defs", {}).values():
+        _strict(definition)
+
+
+def strict_json_schema(model: type[BaseModel]) -> dict:
+    schema = copy.deepcopy(model.model_json_schema())
+    _strict(schema)
+    return schema
+
+
+def response_format(model: type[BaseModel], name: str) -> dict:
+    """response_format for Chat Completions constraining the output to model"""
+    return {"type": "json_schema",
+            "json_schema": {"name": name, "strict": True, "schema": strict_json_schema(model)}}
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort fix of near-valid JSON: drops code fences and text around the
+    value, // and /* */ comments and trailing commas, and closes strings,
+    arrays and objects left open by a truncated response.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = escaped = False
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if in_string:
+            out.append(c)
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+            i += 1
+            continue
+        if text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = len(text) if newline < 0 else newline
+            continue
+        if text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = len(text) if end < 0 else end + 2
+            continue
+        if c == '"':
+            in_string = True
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+        elif c in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(c)
+            if not stack:
+                break
+            i += 1
+            continue
+        out.append(c)
+        i += 1
+
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    _strip_trailing_comma(out)
+    if "".join(out).rstrip().endswith(":"):
+        out.append(" null")
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: list[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def parse(text: str, model: type[T], model_name: str) -> T:
+    """Validate text as model, repairing it locally if needed"""
+    try:
+        return model.model_validate_json(text)
+    except ValidationError:
+        metrics.increment(f"llm_output.parse_failures.{model_name}")
+    try:
+        parsed = model.model_validate(json.loads(repair_json(text)))
+    except (ValueError, ValidationError) as e:
+        raise StructuredOutputError(f"{model.__name__} output could not be parsed: {e}") from e
+    metrics.increment(f"llm_output.repaired.{model_name}")
+    return parsed
+
+
+def with_retries(call: Callable[[], T], model_name: str, max_retries: int = MAX_RETRIES) -> T:
+    """call() until it returns without a StructuredOutputError, at most 1 + max_retries times"""
+    for attempt in range(max_retries + 1):
+        try:
+            return call()
+        except StructuredOutputError:
+            if attempt == max_retries:
+                metrics.increment(f"llm_output.failures.{model_name}")
+                raise
+            metrics.increment(f"llm_output.retries.{model_name}")
+
+
+async def with_retries_async(call, model_name: str, max_retries: int = MAX_RETRIES):
+    for attempt in range(max_retries + 1):
+        try:
+            return await call()
+        except StructuredOutputError:
+            if attempt == max_retries:
+                metrics.increment(f"llm_output.failures.{model_name}")
+                raise
+            metrics.increment(f"llm_output.retries.{model_name}")
+
+
+def _from_raw(result: dict, model: type[T], model_name: str) -> T:
+    """with_structured_output(include_raw=True) result to model, repairing the raw text if LangChain could not parse it"""
+    if result["parsed"] is not None:
+        return result["parsed"]
+    raw = result["raw"]
+    if raw.additional_kwargs.get("refusal"):
+        metrics.increment(f"llm_output.parse_failures.{model_name}")
+        raise StructuredOutputError(f"{model.__name__} output refused: {raw.additional_kwargs['refusal']}")
+    return parse(raw.text, model, model_name)
+
+
+def structured_chain(prompt: Runnable, llm, model: type[T], max_retries: int = MAX_RETRIES) -> Runnable:
+    """prompt | llm constrained to model's JSON schema, with repair and retries"""
+    model_name = llm.model_name
+    chain = prompt | llm.with_structured_output(model, method="json_schema", strict=True, include_raw=True)
+
+    def invoke(inputs: dict) -> T:
+        return with_retries(lambda: _from_raw(chain.invoke(inputs), model, model_name), model_name, max_retries)
+
+    async def ainvoke(inputs: dict) -> T:
+        async def call():
+            return _from_raw(await chain.ainvoke(inputs), model, model_name)
+        return await with_retries_async(call, model_name, max_retries)
+
+    return RunnableLambda(invoke, afunc=ainvoke, name=f"structured_{model.__name__}")
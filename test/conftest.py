@@ -8,7 +8,7 @@ load_dotenv(dotenv_path=env_path)
 from models import Base
 import pytest
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from testcontainers.postgres import PostgresContainer
 from fastapi.testclient import TestClient
 from main import app, get_db
@@ -47,6 +47,12 @@ def db_session(db_engine):
         session.close()
         connection.close()
 
+@pytest.fixture(scope="function")
+def db_session_factory(db_session):
+    """A session_factory for code that opens its own sessions, inside db_session's transaction"""
+    connection = db_session.connection()
+    return lambda: Session(bind=connection, join_transaction_mode="create_savepoint")
+
 @pytest.fixture(scope="function")
 def client(db_session):
     def override_get_db():
@@ -58,4 +64,13 @@ def client(db_session):
         with TestClient(app) as test_client:
             yield test_client
     finally:
-        app.dependency_overrides.clear()
\ No newline at end of file
+        app.dependency_overrides.clear()
+
+@pytest.fixture(scope="function")
+def admin_client(client, monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "ADMIN_USERNAME", "admin")
+    monkeypatch.setattr(settings, "ADMIN_PASSWORD", "test")
+    login_response = client.post("/api/admin-login", data={"username": "admin", "password": "test"})
+    assert login_response.status_code == 200
+    return client
@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import answer_grading
+from question_bank import get_question_bank
+
+DATASET = json.loads((Path(__file__).parent / "check_answer_evaluation_dataset.json").read_text())
+
+
+def test_keyword_tier_is_never_wrong_on_labelled_answers():
+    bank = get_question_bank()
+    decided = 0
+    for row in DATASET:
+        result = answer_grading.grade_with_keywords(bank.find(row["question"]), row["answer"])
+        if result is not None:
+            decided += 1
+            assert result["correct"] == row["correct"], row
+    assert decided >= 5
+
+
+@pytest.mark.parametrize("question, answer", [
+    ("What is the difference between WHERE and HAVING in SQL?",
+     "HAVING filters rows before grouping and WHERE filters groups after aggregation"),
+    ("Explain this SQL: SELECT product_name FROM products WHERE cost < 500",
+     "It deletes every product_name whose cost is above 500"),
+    ("If `d` is a dictionary, then what does `d.get('name', 'unknown')` do?",
+     "It returns the string unknown always"),
+    ("How do you remove a key from a dictionary?", "you cant, dicts are immutable; use pop( on a list"),
+    ("Name a window function in SQL", "GROUP BY is a window function, it ranks rows"),
+    ("How do you reverse a list in python?", "reversed( sorts the list in descending order"),
+    ("RAG requires a vector database. True or False?", "False, wait, true"),
+])
+def test_keyword_tier_never_marks_an_answer_correct(question, answer):
+    result = answer_grading.grade_with_keywords(get_question_bank().find(question), answer)
+    assert result is None or result["correct"] is False
+
+
+def test_keyword_tier_rejects_non_answers_and_known_misconceptions():
+    bank = get_question_bank()
+    question = bank.find("What does LIMIT 1 do at the end of a SQL statement?")
+    assert answer_grading.grade_with_keywords(question, "I don't know")["correct"] is False
+    assert answer_grading.grade_with_keywords(question, "It times out the query after 1 second")["correct"] is False
+    assert answer_grading.grade_with_keywords(question, "It returns only one row") is None
+
+    rag = bank.find("RAG requires a vector database. True or False?")
+    assert answer_grading.grade_with_keywords(rag, "True")["correct"] is False
+    assert answer_grading.grade_with_keywords(rag, "Untrue, BM25 works too") is None
+
+
+def test_keyword_tier_defers_on_negation_and_unknown_questions():
+    question = get_question_bank().find("What is the name of the `@` operator (Example `a @ b`) in Python?")
+    assert answer_grading.grade_with_keywords(question, "It isn't the decorator operator") is None
+    assert answer_grading.grade_with_keywords(question, "It cant be a decorator") is None
+    assert answer_grading.grade_with_keywords(None, "It is the decorator operator") is None
+
+
+def test_low_confidence_small_model_escalates(monkeypatch):
+    calls = []
+
+    def small(skill, question_text, question, answer):
+        calls.append("small")
+        return {"correct": True, "reasoning": "", "confidence": 0.5, "tier": "small"}
+
+    def full(skill, question_text, answer):
+        calls.append("full")
+        return {"correct": False, "reasoning": "", "tier": "full"}
+
+    monkeypatch.setattr(answer_grading, "grade_with_small_model", small)
+    monkeypatch.setattr(answer_grading, "grade_with_full_model", full)
+
+    result = answer_grading.grade_answer("SQL", "What is a view in SQL?", "A table that keeps query results")
+    assert result["tier"] == "full"
+    assert calls == ["small", "full"]
+
+    result = answer_grading.grade_answer("SQL", "What does LIMIT 1 do at the end of a SQL statement?",
+                                         "It limits the query execution time to 1 second")
+    assert result == {"correct": False, "reasoning": "The answer states a common misconception.", "tier": "keywords"}
+    assert calls == ["small", "full"]
@@ -0,0 +1,20 @@
+import bm25
+
+
+def weights(vector):
+    return dict(zip(vector.indices, vector.values))
+
+
+def test_document_weights_saturate_with_term_frequency():
+    once = weights(bm25.document_vector("kubernetes"))[bm25.token_id("kubernetes")]
+    twice = weights(bm25.document_vector("kubernetes kubernetes"))[bm25.token_id("kubernetes")]
+    many = weights(bm25.document_vector(" ".join(["kubernetes"] * 50)))[bm25.token_id("kubernetes")]
+    assert once < twice < many < bm25.K1 + 1
+
+
+def test_stopwords_are_dropped_and_query_terms_weigh_one():
+    vector = bm25.query_vector("Experience with the AWS and AWS CDK")
+    assert weights(vector) == {bm25.token_id("experience"): 1.0,
+                               bm25.token_id("aws"): 1.0,
+                               bm25.token_id("cdk"): 1.0}
+    assert vector.indices == sorted(vector.indices)
@@ -0,0 +1,40 @@
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_identical_texts_are_embedded_once(db_session_factory):
+    underlying = CountingEmbeddings()
+    embeddings = CachedEmbeddings(underlying, "test-model", 3,
+                                  session_factory=db_session_factory, batch_size=2)
+
+    first = embeddings.embed_documents(["python", "sql", "python", "go"])
+    assert first[0] == first[2] == [6.0, 1.0, 0.5]
+    # Three unique texts in batches of two
+    assert underlying.calls == [["python", "sql"], ["go"]]
+
+    second = embeddings.embed_documents(["go", "sql", "rust"])
+    assert second[:2] == [first[3], first[1]]
+    assert underlying.calls[-1] == ["rust"]
+    assert (embeddings.hits, embeddings.misses) == (2, 4)
+
+
+def test_cache_is_namespaced_by_model_and_dimensions(db_session_factory):
+    CachedEmbeddings(CountingEmbeddings(), "model-a", 3, session_factory=db_session_factory).embed_documents(["text"])
+
+    other = CountingEmbeddings()
+    CachedEmbeddings(other, "model-a", 256, session_factory=db_session_factory).embed_documents(["text"])
+    assert other.calls == [["text"]]
@@ -233,33 +233,23 @@ class TestQuestionBank:
     
     def test_get_question_returns_valid_question(self):
         """Test that get_question returns a question from the bank"""
-        from screening_agent import question_bank
-        import random
-        
-        # Test the logic directly (simulating what get_question does)
-        topic = "python"
-        difficulty = "medium"
-        questions = question_bank[topic][difficulty]
-        question = random.choice(questions)
-        
-        assert isinstance(question, str)
-        assert question in question_bank["python"]["medium"]
-        print(f"✓ Got question: {question}")
+        from question_bank import get_question_bank
+        
+        bank = get_question_bank()
+        question = bank.sample("python", "medium")
+        
+        assert question.question in [q.question for q in bank.questions("python", "medium")]
+        print(f"✓ Got question: {question.question}")
     
     def test_get_question_handles_case_insensitive(self):
         """Test that get_question handles case insensitive topics"""
-        from screening_agent import question_bank
-        import random
-        
-        # Test with uppercase converted to lowercase
-        topic = "PYTHON".lower()
-        difficulty = "EASY".lower()
-        questions = question_bank[topic][difficulty]
-        question = random.choice(questions)
-        
-        assert isinstance(question, str)
-        assert question in question_bank["python"]["easy"]
-        print(f"✓ Case insensitive works: {question}")
+        from question_bank import get_question_bank
+        
+        bank = get_question_bank()
+        question = bank.sample("PYTHON", "EASY")
+        
+        assert question.question in [q.question for q in bank.questions("python", "easy")]
+        print(f"✓ Case insensitive works: {question.question}")
 
 
 class TestCheckAnswer:
@@ -340,43 +330,42 @@ class TestGetNextSkillToEvaluate:
         """Set up OpenAI API key before each test"""
         set_default_openai_key(settings.OPENAI_API_KEY)
     
-    def test_returns_next_skill(self):
+    def test_returns_next_skill(self, db_session):
         """Test that it returns a skill that hasn't been evaluated yet"""
-        from screening_agent import interview_state, get_next_skill_standalone
+        import interview_store
+        from screening_agent import get_next_skill_standalone
         
         # Setup
-        interview_state['test_lab16'] = {
-            'skills': ['Python', 'SQL', 'AWS'],
-            'evaluation': [('Python', True)]
-        }
+        interview_store.set_skills(db_session, 'test_lab16', ['Python', 'SQL', 'AWS'])
+        interview_store.add_evaluation(db_session, 'test_lab16', 'Python', True)
         
         # Test
-        next_skill = get_next_skill_standalone('test_lab16')
+        next_skill = get_next_skill_standalone('test_lab16', db_session)
         
         assert next_skill in ['SQL', 'AWS']
         print(f"✓ Next skill to evaluate: {next_skill}")
     
-    def test_returns_none_when_all_evaluated(self):
+    def test_returns_none_when_all_evaluated(self, db_session):
         """Test that it returns None when all skills are evaluated"""
-        from screening_agent import interview_state, get_next_skill_standalone
+        import interview_store
+        from screening_agent import get_next_skill_standalone
         
         # Setup - all skills evaluated
-        interview_state['test_lab16_done'] = {
-            'skills': ['Python', 'SQL'],
-            'evaluation': [('Python', True), ('SQL', False)]
-        }
+        interview_store.set_skills(db_session, 'test_lab16_done', ['Python', 'SQL'])
+        interview_store.add_evaluation(db_session, 'test_lab16_done', 'Python', True)
+        interview_store.add_evaluation(db_session, 'test_lab16_done', 'SQL', False)
         
         # Test
-        result = get_next_skill_standalone('test_lab16_done')
+        result = get_next_skill_standalone('test_lab16_done', db_session)
         
         assert result is None
         print("✓ Returns None when all skills evaluated")
     
-    def test_handles_empty_session(self):
+    def test_handles_empty_session(self, db_session):
         """Test that it handles non-existent session"""
         from screening_agent import get_next_skill_standalone
         
-        result = get_next_skill_standalone('nonexistent_session')
+        result = get_next_skill_standalone('nonexistent_session', db_session)
         
         assert result is None
         print("✓ Handles non-existent session")
@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+import interview_runtime
+import interview_store
+from interview_store import PostgresSession
+from models import JobApplication, JobBoard, JobPost
+
+
+def create_job_application(db_session, slug):
+    job_board = JobBoard(slug=slug)
+    db_session.add(job_board)
+    db_session.flush()
+    job_post = JobPost(title="Backend Engineer", description="Python", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.flush()
+    token, token_hash = interview_store.new_interview_token()
+    job_application = JobApplication(job_post_id=job_post.id, first_name="Jane", last_name="Doe",
+                                     email="jane@example.com", resume_url="/uploads/resumes/jane.pdf",
+                                     interview_token_hash=token_hash)
+    db_session.add(job_application)
+    db_session.flush()
+    return job_post, job_application, token
+
+
+def test_interviews_need_the_application_token(db_session):
+    job_post, job_application, token = create_job_application(db_session, "interview-token-board")
+    other_post, other_application, other_token = create_job_application(db_session, "interview-token-other")
+
+    assert interview_store.authorize_interview(db_session, "token-test", job_post.id, job_application.id, token)
+    assert not interview_store.authorize_interview(db_session, "token-test", job_post.id, job_application.id,
+                                                   other_token)
+    # The application must belong to the job post being interviewed for
+    assert not interview_store.authorize_interview(db_session, "token-test", other_post.id, job_application.id,
+                                                   token)
+
+    # A session already linked to one application cannot be taken over by another
+    interview_store.link_job_application(db_session, "token-test", job_post.id, job_application.id)
+    assert not interview_store.authorize_interview(db_session, "token-test", other_post.id,
+                                                   other_application.id, other_token)
+
+    job_post.is_open = False
+    db_session.flush()
+    assert not interview_store.authorize_interview(db_session, "token-test", job_post.id, job_application.id,
+                                                   token)
+
+
+def test_sessions_only_link_applications_of_their_job_post(db_session):
+    job_post, job_application, _ = create_job_application(db_session, "interview-link-board")
+    other_post, other_application, _ = create_job_application(db_session, "interview-link-other")
+
+    with pytest.raises(ValueError):
+        interview_store.link_job_application(db_session, "link-test", job_post.id, other_application.id)
+    interview_store.link_job_application(db_session, "link-test", job_post.id, job_application.id)
+    with pytest.raises(ValueError):
+        interview_store.link_job_application(db_session, "link-test", other_post.id, other_application.id)
+
+    interview_store.save_result(db_session, "link-test")
+    assert interview_store.get_job_application_interviews(db_session, other_application.id) == []
+    assert len(interview_store.get_job_application_interviews(db_session, job_application.id)) == 1
+
+
+def test_interview_websocket_rejects_a_bad_token(client, db_session, monkeypatch, db_session_factory):
+    job_post, job_application, _ = create_job_application(db_session, "interview-ws-board")
+    monkeypatch.setattr(interview_runtime, "get_db_session", db_session_factory)
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/api/interviews/ws-test/ws?job_id={job_post.id}"
+                                      f"&job_application_id={job_application.id}&token=wrong"):
+            pass
+
+
+def test_evaluations_are_recorded_once_per_skill(db_session):
+    interview_store.set_skills(db_session, "store-test", ["Python", "SQL"])
+    interview_store.add_evaluation(db_session, "store-test", "Python", True)
+    interview_store.add_evaluation(db_session, "store-test", "Python", False)
+
+    state = interview_store.get_state(db_session, "store-test")
+    assert state == {"skills": ["Python", "SQL"], "evaluation": [("Python", True)]}
+    assert interview_store.get_next_skill(db_session, "store-test") == "SQL"
+
+
+def test_questions_are_not_repeated_within_a_session(db_session):
+    asked = [interview_store.ask_question(db_session, "store-questions", "Python", "easy") for _ in range(6)]
+
+    # Two easy questions, then the closest difficulties take over, then the topic runs out
+    assert len({question.id for question in asked}) == 6
+    assert [question.difficulty for question in asked[:2]] == ["easy", "easy"]
+    assert interview_store.ask_question(db_session, "store-questions", "Python", "easy") is None
+
+
+def test_questions_stop_at_the_per_topic_limit(db_session):
+    asked = [interview_store.ask_question(db_session, "store-limit", "SQL", "medium", max_per_topic=3)
+             for _ in range(4)]
+
+    assert all(question is not None for question in asked[:3])
+    assert asked[3] is None
+    # Hitting the limit does not use up another question
+    assert len(interview_store.get_asked_question_ids(db_session, "store-limit")) == 3
+
+
+def test_postgres_session_stores_conversation_items(db_session_factory):
+    session = PostgresSession("store-items-test", session_factory=db_session_factory)
+
+    async def scenario():
+        await session.add_items([{"role": "user", "content": "hello"},
+                                 {"role": "assistant", "content": "hi"},
+                                 {"role": "user", "content": "ready"}])
+        assert [item["content"] for item in await session.get_items()] == ["hello", "hi", "ready"]
+        assert [item["content"] for item in await session.get_items(limit=2)] == ["hi", "ready"]
+        assert (await session.pop_item())["content"] == "ready"
+        await session.clear_session()
+        assert await session.get_items() == []
+
+    asyncio.run(scenario())
+
+
+def test_completed_skills_are_summarised_in_session_history(db_session, db_session_factory):
+    session = PostgresSession("store-compact-test", session_factory=db_session_factory)
+    opening = {"role": "user", "content": "Start an interview for session_id: store-compact-test"}
+
+    async def scenario():
+        await session.add_items([opening,
+                                 {"role": "assistant", "content": "Python question 1"},
+                                 {"role": "user", "content": "Python answer 1"}])
+        interview_store.add_evaluation(db_session, "store-compact-test", "Python", True)
+        await session.add_items([{"role": "assistant", "content": "SQL question 1"}])
+        return await session.get_items()
+
+    items = asyncio.run(scenario())
+    assert items[0] == opening
+    assert items[1]["role"] == "system"
+    assert "Python: passed" in items[1]["content"]
+    assert items[2:] == [{"role": "assistant", "content": "SQL question 1"}]
+
+    full = PostgresSession("store-compact-test", session_factory=db_session_factory,
+                           compact_completed_skills=False)
+    assert len(asyncio.run(full.get_items())) == 4
+
+
+def test_reconnected_interviews_resume_with_the_active_agent(db_session):
+    assert interview_store.start_or_resume(db_session, "resume-test", "Interview Orchestrator Agent") is None
+    interview_store.set_active_agent(db_session, "resume-test", "Skills Evaluator Agent")
+    assert interview_store.start_or_resume(db_session, "resume-test",
+                                           "Interview Orchestrator Agent") == "Skills Evaluator Agent"
+
+
+def test_find_agent_follows_handoffs():
+    orchestrator = interview_runtime.build_interview_agents()
+    assert interview_runtime.find_agent(orchestrator, "Skills Evaluator Agent").name == "Skills Evaluator Agent"
+    assert interview_runtime.find_agent(orchestrator, "Unknown Agent") is orchestrator
+
+
+def test_interviews_on_one_event_loop_share_a_run_config(monkeypatch):
+    policies = []
+    real_async_http_client = interview_runtime.llm_resilience.async_http_client
+    monkeypatch.setattr(interview_runtime.llm_resilience, "async_http_client",
+                        lambda *args: policies.append(args) or real_async_http_client(*args))
+
+    async def scenario():
+        return interview_runtime.interview_run_config(), interview_runtime.interview_run_config()
+
+    monkeypatch.setattr(interview_runtime.settings, "INTERVIEW_MODEL_BASE_URL", None)
+    first, second = asyncio.run(scenario())
+    assert first is second
+    assert policies == [()]
+
+    # A custom base URL does not get the OpenAI fallback models
+    monkeypatch.setattr(interview_runtime.settings, "INTERVIEW_MODEL_BASE_URL", "http://127.0.0.1:8765/v1")
+    asyncio.run(scenario())
+    assert policies[1] == (interview_runtime.custom_model_policy,)
+    assert interview_runtime.custom_model_policy.fallback_models == {}
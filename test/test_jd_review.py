@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+
+from langchain_core.runnables import RunnableGenerator, RunnableLambda
+
+import ai
+import jd_review
+import metrics
+from ai import JDAnalysis, JDRewriteOutput, ReviewedApplication
+
+
+def parse_events(chunks):
+    events = []
+    for chunk in chunks:
+        event, data = chunk.strip().split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def collect(stream):
+    async def scenario():
+        return [chunk async for chunk in stream]
+    return parse_events(asyncio.run(scenario()))
+
+
+def fake_chains(monkeypatch, calls):
+    async def finalise(inputs):
+        async for _ in inputs:
+            calls.append("finalise")
+        for text in ["We are ", "hiring ", "a backend engineer."]:
+            yield text
+
+    monkeypatch.setattr(ai, "analysis_chain", RunnableLambda(
+        lambda inputs: calls.append("analysis") or JDAnalysis(overall_summary="Clear, but jargon heavy")))
+    monkeypatch.setattr(ai, "rewrite_chain", RunnableLambda(
+        lambda inputs: calls.append("rewrite") or JDRewriteOutput(rewritten_sections=[])))
+    monkeypatch.setattr(ai, "finalise_chain", RunnableGenerator(finalise))
+
+
+def fake_cache(monkeypatch, stored):
+    """In-memory stand-ins for the review cache and its lock"""
+    lock = threading.Lock()
+    monkeypatch.setattr(jd_review, "get_cached_review",
+                        lambda description, session_factory: stored[-1] if stored else None)
+    monkeypatch.setattr(jd_review, "store_review",
+                        lambda description, review, session_factory: stored.append(review))
+    monkeypatch.setattr(jd_review, "try_lock_review",
+                        lambda description, session_factory: lock if lock.acquire(blocking=False) else None)
+    monkeypatch.setattr(jd_review, "unlock_review", lambda db: lock.release())
+
+
+def test_finalise_stage_is_streamed(monkeypatch):
+    calls, stored = [], []
+    fake_chains(monkeypatch, calls)
+    fake_cache(monkeypatch, stored)
+    metrics.reset()
+
+    events = collect(jd_review.stream_review("Rockstar ninja wanted"))
+
+    assert calls == ["analysis", "rewrite", "finalise"]
+    assert [event for event, _ in events] == ["stage", "stage", "token", "token", "token", "done"]
+    assert "".join(data["text"] for event, data in events if event == "token") == "We are hiring a backend engineer."
+    done = events[-1][1]
+    assert done["revised_description"] == "We are hiring a backend engineer."
+    assert done["overall_summary"] == "Clear, but jargon heavy"
+    assert done["cached"] is False
+    assert set(done["timings"]) == {"analysis", "rewrite", "first_token", "finalise", "total"}
+    assert stored == [ReviewedApplication(revised_description=done["revised_description"],
+                                          overall_summary=done["overall_summary"])]
+    assert metrics.snapshot()["summaries"]["jd_review_seconds.finalise"]["count"] == 1
+
+
+def test_failed_review_sends_error_and_is_not_cached(monkeypatch):
+    stored = []
+    monkeypatch.setattr(ai, "analysis_chain", RunnableLambda(lambda inputs: 1 / 0))
+    fake_cache(monkeypatch, stored)
+
+    events = collect(jd_review.stream_review("Rockstar ninja wanted"))
+
+    assert events == [("error", {"detail": "Review failed"})]
+    assert stored == []
+
+
+def test_concurrent_cache_misses_run_the_chains_once(monkeypatch):
+    calls, stored = [], []
+    fake_chains(monkeypatch, calls)
+    fake_cache(monkeypatch, stored)
+    metrics.reset()
+
+    async def scenario():
+        async def review():
+            return [chunk async for chunk in jd_review.stream_review("Rockstar ninja wanted")]
+        return await asyncio.gather(review(), review(), review())
+
+    results = [parse_events(chunks) for chunks in asyncio.run(scenario())]
+
+    assert calls == ["analysis", "rewrite", "finalise"]
+    assert sorted(events[-1][1]["cached"] for events in results) == [False, True, True]
+    assert len({events[-1][1]["revised_description"] for events in results}) == 1
+    counters = metrics.snapshot()["counters"]
+    assert counters["jd_review.cache_misses"] == 1
+    assert counters["jd_review.cache_hits"] == 2
+
+
+def test_review_waits_for_another_worker_holding_the_lock(monkeypatch):
+    calls, stored = [], []
+    fake_chains(monkeypatch, calls)
+    fake_cache(monkeypatch, stored)
+    monkeypatch.setattr(jd_review, "REVIEW_LOCK_POLL_SECONDS", 0.01)
+    review = ReviewedApplication(revised_description="Stored by another worker", overall_summary="Fine")
+    attempts = []
+
+    def other_worker_holds_the_lock(description, session_factory):
+        attempts.append(description)
+        if len(attempts) < 3:
+            return None
+        stored.append(review)  # the other worker stored its review and released the lock
+        return object()
+
+    monkeypatch.setattr(jd_review, "try_lock_review", other_worker_holds_the_lock)
+    monkeypatch.setattr(jd_review, "unlock_review", lambda db: None)
+
+    events = collect(jd_review.stream_review("Rockstar ninja wanted"))
+
+    assert len(attempts) == 3
+    assert calls == []
+    assert events[-1] == ("done", {**review.model_dump(), "cached": True, "timings": {}})
+
+
+def test_reviews_are_cached_per_description_and_prompt_version(monkeypatch, db_session_factory):
+    calls = []
+    fake_chains(monkeypatch, calls)
+
+    first = collect(jd_review.stream_review("Rockstar ninja wanted", db_session_factory))
+    second = collect(jd_review.stream_review("Rockstar ninja wanted", db_session_factory))
+
+    assert calls == ["analysis", "rewrite", "finalise"]
+    assert second == [("token", {"text": "We are hiring a backend engineer."}),
+                      ("done", {**first[-1][1], "cached": True, "timings": {}})]
+
+    monkeypatch.setattr(ai, "REVIEW_PROMPT_VERSION", "test-next")
+    collect(jd_review.stream_review("Rockstar ninja wanted", db_session_factory))
+    assert calls.count("analysis") == 2
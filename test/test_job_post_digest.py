@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+import ai
+import job_post_digest
+import metrics
+from job_post_digest import RequirementsDigest
+from models import JobBoard, JobPost
+
+
+def test_digest_renders_deterministically():
+    digest = RequirementsDigest(required_skills=["Python", "PostgreSQL"], min_years_experience=5,
+                                experience="Backend services at scale", responsibilities=["Own the API"])
+    rendered = job_post_digest.render_digest("Backend Engineer", digest)
+
+    assert rendered == job_post_digest.render_digest("Backend Engineer", digest.model_copy())
+    assert rendered.splitlines() == [
+        "Title: Backend Engineer",
+        "Required skills: Python, PostgreSQL",
+        "Experience: 5+ years; Backend services at scale",
+        "Education: not stated",
+        "Responsibilities:",
+        "- Own the API",
+    ]
+
+
+def test_evaluation_prompt_shares_prefix_per_job_post():
+    first = ai.build_system_and_user_messages("Resume one", "Title: Backend Engineer")
+    second = ai.build_system_and_user_messages("Resume two", "Title: Backend Engineer")
+
+    assert first[0] == second[0]
+    assert "Resume" not in first[0]["content"]
+    prefix = "JOB_REQUIREMENTS:\nTitle: Backend Engineer\n\nRESUME_TEXT:\n"
+    assert first[1]["content"] == prefix + "Resume one"
+    assert second[1]["content"] == prefix + "Resume two"
+
+
+def test_prompt_usage_is_counted():
+    metrics.reset()
+    ai.record_prompt_usage(SimpleNamespace(prompt_tokens=1500,
+                                           prompt_tokens_details=SimpleNamespace(cached_tokens=1024)))
+    ai.record_prompt_usage(SimpleNamespace(prompt_tokens=1500, prompt_tokens_details=None))
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["resume_evaluation.prompt_tokens"] == 3000
+    assert counters["resume_evaluation.cached_prompt_tokens"] == 1024
+
+
+def test_digest_is_extracted_once_per_description(db_session, db_session_factory, monkeypatch):
+    calls = []
+
+    def fake_extract(description):
+        calls.append(description)
+        return RequirementsDigest(required_skills=["Python"] if "Python" in description else ["Go"])
+
+    monkeypatch.setattr(job_post_digest, "extract_digest_with_llm", fake_extract)
+
+    job_board = JobBoard(slug="digest-board")
+    db_session.add(job_board)
+    db_session.flush()
+    job_post = JobPost(title="Backend Engineer", description="Python and SQL " * 50, job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.flush()
+
+    metrics.reset()
+    digest = job_post_digest.requirements_for_evaluation(job_post.id, job_post.description, db_session_factory)
+    assert "Required skills: Python" in digest
+    assert job_post_digest.get_job_post_digest(db_session, job_post.id) == digest
+    assert len(calls) == 1
+    assert metrics.snapshot()["counters"]["resume_evaluation.description_tokens_saved"] > 0
+
+    # Editing the description invalidates the digest
+    job_post.description = "Go microservices"
+    db_session.flush()
+    assert "Required skills: Go" in job_post_digest.get_job_post_digest(db_session, job_post.id)
+    assert len(calls) == 2
+
+
+def test_failed_extraction_releases_the_digest_lock(db_engine, monkeypatch):
+    with db_engine.connect() as connection:
+        job_board_id = connection.execute(insert(JobBoard).values(slug="digest-lock-board")
+                                          .returning(JobBoard.id)).scalar_one()
+        job_post_id = connection.execute(insert(JobPost).values(title="Backend Engineer", description="Python",
+                                                                job_board_id=job_board_id)
+                                         .returning(JobPost.id)).scalar_one()
+        connection.commit()
+    monkeypatch.setattr(job_post_digest, "extract_digest_with_llm", lambda description: 1 / 0)
+    factory = sessionmaker(bind=db_engine)
+
+    try:
+        assert job_post_digest.requirements_for_evaluation(job_post_id, "Python", factory) == "Python"
+        with db_engine.connect() as connection:
+            assert connection.scalar(select(func.pg_try_advisory_xact_lock(
+                job_post_digest.DIGEST_LOCK_NAMESPACE, job_post_id)))
+    finally:
+        with db_engine.begin() as connection:
+            connection.execute(delete(JobPost).filter(JobPost.id == job_post_id))
+            connection.execute(delete(JobBoard).filter(JobBoard.id == job_board_id))
@@ -0,0 +1,29 @@
+import job_post_skills
+from models import JobBoard, JobPost
+
+
+def test_skills_are_extracted_once_per_description(db_session, monkeypatch):
+    calls = []
+
+    def fake_extract(description):
+        calls.append(description)
+        return ["Python", "SQL"] if "Python" in description else ["Go"]
+
+    monkeypatch.setattr(job_post_skills, "extract_skills_with_llm", fake_extract)
+
+    job_board = JobBoard(slug="skills-board")
+    db_session.add(job_board)
+    db_session.flush()
+    job_post = JobPost(title="Backend Engineer", description="Python and SQL", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.flush()
+
+    assert job_post_skills.get_job_post_skills(db_session, job_post.id) == ["Python", "SQL"]
+    assert job_post_skills.get_job_post_skills(db_session, job_post.id) == ["Python", "SQL"]
+    assert len(calls) == 1
+
+    # Editing the description invalidates the cached skills
+    job_post.description = "Go microservices"
+    db_session.flush()
+    assert job_post_skills.get_job_post_skills(db_session, job_post.id) == ["Go"]
+    assert len(calls) == 2
@@ -0,0 +1,263 @@
+import asyncio
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError, OpenAI
+
+import llm_resilience
+import metrics
+from benchmarks import fake_openai
+from llm_resilience import AsyncResilientTransport, CircuitBreaker, ResiliencePolicy, ResilientTransport
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_on_error_rate_and_probes_after_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(window=4, min_calls=4, error_rate=0.5, cooldown=10, clock=clock)
+    assert not any(breaker.record(ok) for ok in (True, True, False))
+    assert breaker.record(False)
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # one probe at a time
+    breaker.record(False)
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_policy_fails_over_while_breaker_is_open():
+    policy = ResiliencePolicy(fallback_models={"primary": "fallback"},
+                              breaker_factory=lambda: CircuitBreaker(window=2, min_calls=2, cooldown=60))
+    assert policy.route("primary") == "primary"
+    policy.record("primary", False)
+    policy.record("primary", False)
+    assert policy.route("primary") == "fallback"
+    policy.record("other", False)
+    policy.record("other", False)
+    with pytest.raises(llm_resilience.CircuitOpenError):
+        policy.route("other")
+
+
+def test_hedge_delay_needs_latency_samples():
+    policy = ResiliencePolicy(hedging=True)
+    assert policy.hedge_delay("m") is None
+    for i in range(llm_resilience.HEDGE_MIN_SAMPLES):
+        policy.record("m", True, 0.01 * (i + 1))
+    assert policy.hedge_delay("m") == pytest.approx(0.2)
+    assert ResiliencePolicy(hedging=False).hedge_delay("m") is None
+
+
+@pytest.fixture(scope="module")
+def fake_server():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(fake_openai.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def fake_app(fake_server):
+    state = fake_openai.app.state
+    state.token_delay, state.slow_delay, state.error_rate, state.slow_rate = 0.0, 1.0, 0.0, 0.0
+    state.plan.clear()
+    state.models.clear()
+    metrics.reset()
+    return state
+
+
+def openai_client(base_url, policy):
+    return OpenAI(api_key="test", base_url=base_url, max_retries=0,
+                  http_client=httpx.Client(transport=ResilientTransport(policy)))
+
+
+def warm_up(policy, model, seconds):
+    for _ in range(llm_resilience.HEDGE_MIN_SAMPLES):
+        policy.record(model, True, seconds)
+
+
+def test_deadline_bounds_a_hung_call(fake_server, fake_app):
+    fake_app.plan.append("slow")
+    client = openai_client(fake_server, ResiliencePolicy(deadline=0.2))
+
+    start = time.monotonic()
+    with pytest.raises(APITimeoutError):
+        client.chat.completions.create(model="fake", messages=MESSAGES)
+    assert time.monotonic() - start < 0.9
+    assert metrics.snapshot()["counters"]["llm_deadline_exceeded.fake"] == 1
+
+
+class HangingTransport(httpx.BaseTransport):
+    """Never answers; gives up when the request's read timeout runs out, like httpcore"""
+
+    def __init__(self):
+        self.released = threading.Event()
+
+    def handle_request(self, request):
+        time.sleep(request.extensions["timeout"]["read"])
+        self.released.set()
+        raise httpx.ReadTimeout("timed out", request=request)
+
+
+def test_deadline_releases_the_call_thread():
+    transport = HangingTransport()
+    client = OpenAI(api_key="test", base_url="http://llm.test/v1", max_retries=llm_resilience.MAX_RETRIES,
+                    http_client=httpx.Client(transport=ResilientTransport(ResiliencePolicy(deadline=0.2), transport)))
+
+    with pytest.raises(APITimeoutError):
+        client.chat.completions.create(model="fake", messages=MESSAGES)
+    assert transport.released.wait(0.5)
+
+
+def test_slow_call_is_hedged_and_hedge_wins(fake_server, fake_app):
+    policy = ResiliencePolicy(deadline=5, hedging=True)
+    warm_up(policy, "fake", 0.05)
+    fake_app.plan.extend(["slow", "ok"])
+    client = openai_client(fake_server, policy)
+
+    start = time.monotonic()
+    response = client.chat.completions.create(model="fake", messages=MESSAGES)
+    assert response.choices[0].message.content == fake_openai.REPLY
+    assert time.monotonic() - start < 0.9
+    counters = metrics.snapshot()["counters"]
+    assert counters["llm_hedge.fired.fake"] == 1
+    assert counters["llm_hedge.won.fake"] == 1
+
+
+def test_fast_call_is_not_hedged(fake_server, fake_app):
+    policy = ResiliencePolicy(deadline=5, hedging=True)
+    warm_up(policy, "fake", 0.5)
+    client = openai_client(fake_server, policy)
+
+    client.chat.completions.create(model="fake", messages=MESSAGES)
+    assert fake_app.models == ["fake"]
+    assert "llm_hedge.fired.fake" not in metrics.snapshot()["counters"]
+
+
+def test_errors_trip_the_breaker_and_fail_over(fake_server, fake_app):
+    policy = ResiliencePolicy(deadline=5, fallback_models={"primary": "fallback"}, retries=0,
+                              breaker_factory=lambda: CircuitBreaker(window=4, min_calls=4, cooldown=60))
+    fake_app.error_rate = 1.0
+    client = openai_client(fake_server, policy)
+    for _ in range(4):
+        with pytest.raises(InternalServerError):
+            client.chat.completions.create(model="primary", messages=MESSAGES)
+
+    fake_app.error_rate = 0.0
+    client.chat.completions.create(model="primary", messages=MESSAGES)
+    assert fake_app.models == ["primary"] * 4 + ["fallback"]
+    counters = metrics.snapshot()["counters"]
+    assert counters["llm_breaker.opened.primary"] == 1
+    assert counters["llm_breaker.fallbacks.primary"] == 1
+
+    # Without a fallback the call fails fast
+    policy.fallback_models.clear()
+    with pytest.raises(APIConnectionError):
+        client.chat.completions.create(model="primary", messages=MESSAGES)
+
+
+def test_rate_limited_call_is_retried_within_the_deadline(fake_server, fake_app):
+    fake_app.plan.extend(["rate_limited", "error"])
+    client = openai_client(fake_server, ResiliencePolicy(deadline=5))
+
+    response = client.chat.completions.create(model="fake", messages=MESSAGES)
+    assert response.choices[0].message.content == fake_openai.REPLY
+    assert fake_app.models == ["fake"] * 3
+    assert metrics.snapshot()["counters"]["llm_retries.fake"] == 2
+
+
+def test_retries_stop_at_the_deadline(fake_server, fake_app):
+    fake_app.error_rate = 1.0
+    client = openai_client(fake_server, ResiliencePolicy(deadline=0.6))
+
+    with pytest.raises(InternalServerError):
+        client.chat.completions.create(model="fake", messages=MESSAGES)
+    # Backs off 0.5s once; a second 1s backoff would miss the deadline
+    assert fake_app.models == ["fake"] * 2
+
+
+def test_async_streams_are_retried_after_a_rate_limit(fake_server, fake_app):
+    fake_app.plan.append("rate_limited")
+
+    async def scenario():
+        client = AsyncOpenAI(api_key="test", base_url=fake_server, max_retries=0,
+                             http_client=httpx.AsyncClient(transport=AsyncResilientTransport(ResiliencePolicy())))
+        stream = await client.chat.completions.create(model="fake", messages=MESSAGES, stream=True)
+        text = "".join([chunk.choices[0].delta.content or "" async for chunk in stream])
+        await client.close()
+        return text
+
+    assert asyncio.run(scenario()).strip() == fake_openai.REPLY
+    assert fake_app.models == ["fake"] * 2
+
+
+def test_cancelled_probe_does_not_keep_the_breaker_open(fake_server, fake_app):
+    clock = FakeClock()
+    policy = ResiliencePolicy(deadline=5, breaker_factory=lambda: CircuitBreaker(window=2, min_calls=2, cooldown=10,
+                                                                                 clock=clock))
+    policy.record("fake", False)
+    policy.record("fake", False)
+    clock.now = 10
+
+    async def scenario(stream):
+        client = AsyncOpenAI(api_key="test", base_url=fake_server, max_retries=0,
+                             http_client=httpx.AsyncClient(transport=AsyncResilientTransport(policy)))
+        call = asyncio.ensure_future(client.chat.completions.create(model="fake", messages=MESSAGES, stream=stream))
+        await asyncio.sleep(0.2)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await client.close()
+
+    for stream in (False, True):
+        fake_app.plan.append("slow")
+        asyncio.run(scenario(stream))
+        # The cancelled probe counts as failed: the breaker re-opens and probes again after the cooldown
+        assert policy.breaker("fake").state == "open"
+        clock.now += 10
+    assert policy.breaker("fake").allow()
+
+
+def test_async_calls_are_hedged_and_streams_pass_through(fake_server, fake_app):
+    policy = ResiliencePolicy(deadline=5, hedging=True)
+    warm_up(policy, "fake", 0.05)
+    fake_app.plan.extend(["slow", "ok"])
+
+    async def scenario():
+        client = AsyncOpenAI(api_key="test", base_url=fake_server, max_retries=0,
+                             http_client=httpx.AsyncClient(transport=AsyncResilientTransport(policy)))
+        response = await client.chat.completions.create(model="fake", messages=MESSAGES)
+        stream = await client.chat.completions.create(model="fake", messages=MESSAGES, stream=True)
+        text = "".join([chunk.choices[0].delta.content or "" async for chunk in stream])
+        await client.close()
+        return response.choices[0].message.content, text
+
+    content, streamed = asyncio.run(scenario())
+    assert content == fake_openai.REPLY
+    assert streamed.strip() == fake_openai.REPLY
+    assert metrics.snapshot()["counters"]["llm_hedge.won.fake"] == 1
@@ -0,0 +1,23 @@
+import metrics
+
+
+def test_counters_and_summaries():
+    metrics.reset()
+    metrics.increment("turns")
+    metrics.increment("turns", 2)
+    for value in range(1, 101):
+        metrics.observe("latency", value / 100)
+    with metrics.timer("block"):
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"turns": 3}
+    assert snapshot["summaries"]["latency"]["count"] == 100
+    assert snapshot["summaries"]["latency"]["p50"] == 0.51
+    assert snapshot["summaries"]["latency"]["p95"] == 0.96
+    assert snapshot["summaries"]["latency"]["max"] == 1.0
+    assert snapshot["summaries"]["block"]["count"] == 1
+
+
+def test_metrics_endpoint_requires_admin(client):
+    assert client.get("/api/metrics").status_code == 401
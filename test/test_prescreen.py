@@ -0,0 +1,75 @@
+from langchain_core.embeddings import Embeddings
+
+import prescreen
+import resume_index
+import stats
+from config import settings
+from models import JobApplication, JobBoard, JobPost
+
+
+class FakeEmbeddings(Embeddings):
+
+    def embed_documents(self, texts):
+        return [[float("python" in text), float("sql" in text), 0.1] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_cosine_similarity():
+    assert prescreen.cosine_similarity([1, 0], [2, 0]) == 1.0
+    assert prescreen.cosine_similarity([1, 0], [0, 1]) == 0.0
+    assert prescreen.cosine_similarity([0, 0], [1, 0]) == 0.0
+
+
+def test_provisional_score_is_clipped_percentage():
+    assert prescreen.provisional_score(0.423) == 42
+    assert prescreen.provisional_score(-0.2) == 0
+    assert prescreen.provisional_score(1.0) == 100
+
+
+def test_threshold_report_counts_calls_saved_and_false_negatives():
+    similarities = [0.1, 0.2, 0.3, 0.5, 0.6]
+    relevant = [False, False, True, True, True]
+    report = prescreen.threshold_report(similarities, relevant, [0.0, 0.25, 0.4])
+
+    assert [row["calls_saved"] for row in report] == [0, 2, 3]
+    assert [row["false_negatives"] for row in report] == [0, 0, 1]
+    assert report[1]["calls_saved_rate"] == 0.4
+    assert report[2]["false_negative_rate"] == 1 / 3
+    assert prescreen.suggest_threshold(report, 0.0) == 0.25
+    assert prescreen.suggest_threshold(report, 0.5) == 0.4
+
+
+def test_threshold_falls_back_to_default(monkeypatch):
+    monkeypatch.setattr(settings, "PRESCREEN_DEFAULT_THRESHOLD", None)
+    assert prescreen.threshold_for(JobPost(prescreen_threshold=None)) is None
+    assert prescreen.threshold_for(JobPost(prescreen_threshold=0.3)) == 0.3
+    monkeypatch.setattr(settings, "PRESCREEN_DEFAULT_THRESHOLD", 0.2)
+    assert prescreen.threshold_for(JobPost(prescreen_threshold=None)) == 0.2
+
+
+def test_applications_below_threshold_skip_the_llm(db_session, monkeypatch):
+    monkeypatch.setattr(resume_index, "get_embeddings", lambda: FakeEmbeddings())
+    job_board = JobBoard(slug="prescreen-board")
+    db_session.add(job_board)
+    db_session.flush()
+    job_post = JobPost(title="Backend Engineer", description="python and sql", job_board_id=job_board.id,
+                       prescreen_threshold=0.5)
+    db_session.add(job_post)
+    db_session.flush()
+    applications = [JobApplication(first_name="Ada", last_name="Lovelace", email="ada@example.com",
+                                   job_post_id=job_post.id, resume_url=f"/uploads/resumes/{i}.pdf")
+                    for i in range(2)]
+    db_session.add_all(applications)
+    db_session.flush()
+
+    assert prescreen.screen(db_session, applications[0], "python developer")
+    assert not prescreen.screen(db_session, applications[1], "pastry chef")
+    db_session.flush()
+
+    assert applications[0].prescreen_similarity >= 0.5
+    assert applications[0].provisional_score is None
+    assert applications[1].prescreen_similarity < 0.5
+    assert applications[1].provisional_score == prescreen.provisional_score(applications[1].prescreen_similarity)
+    assert stats.job_post_stats(db_session, job_post.id)["llm_calls_saved"] == 1
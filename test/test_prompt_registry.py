@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from braintrust.logger import Prompt
+from braintrust.prompt import PromptSchema
+from braintrust.util import LazyValue
+
+import prompt_registry
+from prompt_registry import PromptRegistry
+
+
+def make_prompt(version, text="Skill: {{skill}}"):
+    schema = PromptSchema.from_dict_deep({
+        "id": "p1", "project_id": "proj", "_xact_id": version, "name": "check", "slug": "check",
+        "description": None, "tags": None,
+        "prompt_data": {"prompt": {"type": "chat", "messages": [{"role": "user", "content": text}]},
+                        "options": {"model": "gpt-4.1"}},
+    })
+    return Prompt(LazyValue(lambda: schema, use_mutex=False), {}, False)
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    def fake_load_prompt(project, slug, version=None, **kwargs):
+        calls.append((slug, version))
+        return make_prompt(version or str(1000 + len(calls)))
+
+    monkeypatch.setattr(prompt_registry, "load_prompt", fake_load_prompt)
+    return calls
+
+
+def test_prompt_is_fetched_once_within_ttl(tmp_path, fetches):
+    registry = PromptRegistry("Prodapt", snapshot_dir=tmp_path, ttl=60)
+    first = registry.get("check")
+    second = registry.get("check")
+    assert first is second
+    assert fetches == [("check", None)]
+    assert first.build(skill="SQL")["messages"][0]["content"] == "Skill: SQL"
+
+
+def test_stale_prompt_is_served_while_refreshing(tmp_path, fetches):
+    registry = PromptRegistry("Prodapt", snapshot_dir=tmp_path, ttl=0)
+    assert registry.get("check").version == "1001"
+    assert registry.get("check").version == "1001"
+
+    deadline = time.monotonic() + 2
+    while registry.get("check").version == "1001" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert registry.get("check").version == "1002"
+
+
+def test_pinned_version_is_never_refreshed(tmp_path, fetches):
+    registry = PromptRegistry("Prodapt", snapshot_dir=tmp_path, ttl=0)
+    registry.get("check", "42")
+    registry.get("check", "42")
+    assert fetches == [("check", "42")]
+
+
+def test_snapshot_is_used_when_braintrust_is_unreachable(tmp_path, fetches, monkeypatch):
+    PromptRegistry("Prodapt", snapshot_dir=tmp_path).get("check")
+
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("braintrust is down")
+
+    monkeypatch.setattr(prompt_registry, "load_prompt", unreachable)
+    prompt = PromptRegistry("Prodapt", snapshot_dir=tmp_path).get("check")
+    assert prompt.version == "1001"
+    assert prompt.build(skill="Python")["messages"][0]["content"] == "Skill: Python"
+
+    with pytest.raises(ConnectionError):
+        PromptRegistry("Prodapt", snapshot_dir=tmp_path).get("other-prompt")
@@ -0,0 +1,68 @@
+import json
+import os
+import random
+
+import pytest
+
+from question_bank import Question, QuestionBank, QuestionBankLoader
+
+
+def make_bank(count=100):
+    questions = [Question(id=f"q{i}", topic="Python", difficulty=("easy", "medium", "hard")[i % 3],
+                          question=f"Question {i}?", tags=["lists"] if i % 2 else ["dicts"])
+                 for i in range(count)]
+    return QuestionBank(questions)
+
+
+def test_lookup_by_topic_and_difficulty():
+    bank = make_bank()
+    assert bank.has_topic("python")
+    assert not bank.has_topic("rust")
+    assert all(question.difficulty == "hard" for question in bank.questions("PYTHON", "hard"))
+    assert all("lists" in question.tags for question in bank.questions("python", "easy", tag="Lists"))
+
+
+def test_sample_never_repeats_excluded_questions():
+    bank = make_bank(30)
+    rng = random.Random(1)
+    asked = []
+    for _ in range(30):
+        question = bank.sample("python", "medium", exclude=asked, rng=rng)
+        asked.append(question.id)
+    assert len(set(asked)) == 30
+    assert bank.sample("python", "medium", exclude=asked, rng=rng) is None
+
+
+def test_sample_prefers_requested_difficulty():
+    bank = make_bank(30)
+    medium = [question.id for question in bank.questions("python", "medium")]
+    assert bank.sample("python", "medium").difficulty == "medium"
+    assert bank.sample("python", "medium", exclude=medium).difficulty in ("easy", "hard")
+
+
+def test_duplicate_ids_are_rejected():
+    question = Question(id="q1", topic="SQL", difficulty="easy", question="?")
+    with pytest.raises(ValueError):
+        QuestionBank([question, question])
+
+
+def test_loader_reloads_changed_file(tmp_path):
+    path = tmp_path / "bank.json"
+
+    def write(version, questions):
+        path.write_text(json.dumps({"version": version, "questions": questions}))
+        os.utime(path, ns=(version * 10**9, version * 10**9))
+
+    write(1, [{"id": "a", "topic": "SQL", "difficulty": "easy", "question": "A?"}])
+    loader = QuestionBankLoader(path, check_interval=0)
+    assert loader.get().version == 1
+
+    write(2, [{"id": "a", "topic": "SQL", "difficulty": "easy", "question": "A?"},
+              {"id": "b", "topic": "Go", "difficulty": "hard", "question": "B?"}])
+    assert loader.get().version == 2
+    assert loader.get().has_topic("go")
+
+    # A broken file keeps the last good bank
+    path.write_text("{not json")
+    os.utime(path, ns=(3 * 10**9, 3 * 10**9))
+    assert loader.get().version == 2
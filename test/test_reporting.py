@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+
+from models import JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost
+
+
+def create_evaluations(db_session, scores):
+    job_board = JobBoard(slug="export-board")
+    db_session.add(job_board)
+    db_session.flush()
+    job_post = JobPost(title="Backend Engineer", description="Python and SQL", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.flush()
+    for score in scores:
+        job_application = JobApplication(job_post_id=job_post.id, first_name="Jane", last_name="Doe",
+                                         email="jane@example.com", resume_url="/uploads/resumes/jane.pdf",
+                                         overall_score=score)
+        db_session.add(job_application)
+        db_session.flush()
+        db_session.add(JobApplicationAIEvaluation(job_application_id=job_application.id,
+                                                  overall_score=score,
+                                                  evaluation={"overall_score": score, "strengths": [], "gaps": []}))
+    db_session.flush()
+    return job_board, job_post
+
+
+def test_non_admin_should_not_be_able_to_export_evaluations(client):
+    response = client.get("/api/job-application-ai-evaluations/export")
+    assert response.status_code == 401
+
+
+def test_export_evaluations_as_ndjson_with_score_filter(admin_client, db_session):
+    _, job_post = create_evaluations(db_session, [30, 60, 90])
+
+    response = admin_client.get("/api/job-application-ai-evaluations/export",
+                          params={"job_post_id": job_post.id, "min_score": 50})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["overall_score"] for row in rows] == [60, 90]
+    assert rows[0]["job_post_title"] == "Backend Engineer"
+
+
+def test_export_evaluations_as_csv(admin_client, db_session):
+    job_board, _ = create_evaluations(db_session, [40, 80])
+
+    response = admin_client.get("/api/job-application-ai-evaluations/export",
+                          params={"format": "csv", "job_board_id": job_board.id, "max_score": 50})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["overall_score"] == "40"
+    assert json.loads(rows[0]["evaluation"])["overall_score"] == 40
+
+
+def test_top_applicants_are_ranked_by_latest_score(admin_client, db_session):
+    _, job_post = create_evaluations(db_session, [55, 95, 20, 75])
+
+    response = admin_client.get(f"/api/job-posts/{job_post.id}/applicants", params={"top": 2, "min_score": 50})
+    assert response.status_code == 200
+    applicants = response.json()
+    assert [applicant["overall_score"] for applicant in applicants] == [95, 75]
+    assert applicants[0]["evaluation"]["overall_score"] == 95
+
+
+def test_top_applicants_show_only_the_latest_evaluation(admin_client, db_session):
+    _, job_post = create_evaluations(db_session, [40])
+    job_application = db_session.query(JobApplication).filter_by(job_post_id=job_post.id).one()
+    db_session.add(JobApplicationAIEvaluation(job_application_id=job_application.id, overall_score=85,
+                                              evaluation={"overall_score": 85, "strengths": [], "gaps": []}))
+    job_application.overall_score = 85
+    db_session.flush()
+
+    response = admin_client.get(f"/api/job-posts/{job_post.id}/applicants", params={"top": 5})
+    assert response.status_code == 200
+    assert [applicant["evaluation"]["overall_score"] for applicant in response.json()] == [85]
+
+
+def test_filter_evaluations_by_gap_keyword_and_containment(client, db_session):
+    _, job_post = create_evaluations(db_session, [70])
+    job_application = JobApplication(job_post_id=job_post.id, first_name="John", last_name="Smith",
+                                     email="john@example.com", resume_url="/uploads/resumes/john.pdf")
+    db_session.add(job_application)
+    db_session.flush()
+    db_session.add(JobApplicationAIEvaluation(job_application_id=job_application.id, overall_score=65, evaluation={
+        "overall_score": 65,
+        "strengths": ["Strong Python background"],
+        "gaps": ["No hands-on Kubernetes experience"],
+        "match_by_section": {"education": "BSc Computer Science"},
+    }))
+    db_session.flush()
+
+    response = client.get("/api/job-application-ai-evaluations", params={"gaps": "kubernetes"})
+    assert response.status_code == 200
+    assert [evaluation["job_application_id"] for evaluation in response.json()] == [job_application.id]
+
+    response = client.get("/api/job-application-ai-evaluations",
+                          params={"contains": json.dumps({"strengths": ["Strong Python background"]})})
+    assert [evaluation["overall_score"] for evaluation in response.json()] == [65]
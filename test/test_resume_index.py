@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+
+import resume_index
+from config import settings
+from resume_index import ResumeDocument
+from vector_index import LocalVectorClient
+
+
+class FakeEmbeddings(Embeddings):
+
+    def embed_documents(self, texts):
+        return [[float("python" in text), float("sql" in text), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def resume(job_application_id, job_post_id=1, job_board_id=1, day=1, text="python developer"):
+    return ResumeDocument(job_application_id=job_application_id,
+                          job_post_id=job_post_id,
+                          job_board_id=job_board_id,
+                          resume_url=f"/uploads/resumes/{job_application_id}.pdf",
+                          submitted_at=datetime(2026, 10, day, tzinfo=timezone.utc),
+                          text=text)
+
+
+@pytest.fixture(params=["qdrant", "local"])
+def client(request):
+    client = QdrantClient(":memory:") if request.param == "qdrant" else LocalVectorClient()
+    resume_index.ensure_collection(client, dimensions=3)
+    yield client
+    client.close()
+
+
+def test_resumes_are_upserted_in_bulk_and_overwritten(client, monkeypatch):
+    monkeypatch.setattr(resume_index, "UPSERT_BATCH_SIZE", 2)
+    documents = [resume(i, text="python developer" if i % 2 else "sql analyst") for i in range(1, 6)]
+
+    assert resume_index.ingest_resumes(documents, client, FakeEmbeddings()) == 5
+    assert resume_index.ingest_resumes(documents[:1], client, FakeEmbeddings()) == 1
+    assert client.count(resume_index.COLLECTION_NAME).count == 5
+
+    point = client.retrieve(resume_index.COLLECTION_NAME, [1])[0]
+    assert point.payload["metadata"]["url"] == "/uploads/resumes/1.pdf"
+    assert point.payload["metadata"]["job_board_id"] == 1
+    assert point.payload["page_content"] == "python developer"
+
+
+def test_recommendations_are_filtered_ranked_and_paginated(client):
+    resume_index.ingest_resumes([resume(1, text="python and sql developer"),
+                                 resume(2, text="python developer", day=5),
+                                 resume(3, text="sql analyst", day=9),
+                                 resume(4, job_post_id=2, text="python and sql developer"),
+                                 resume(5, job_post_id=3, job_board_id=2, text="python and sql developer")],
+                                client, FakeEmbeddings())
+    query = FakeEmbeddings().embed_query("python developer")
+
+    def ids(page):
+        return [item.job_application_id for item in page["items"]]
+
+    first = resume_index.recommend_candidates(query, client, job_post_id=1, limit=2)
+    assert ids(first) == [2, 1] and first["next_offset"] == 2
+    second = resume_index.recommend_candidates(query, client, job_post_id=1, limit=2, offset=2)
+    assert ids(second) == [3] and second["next_offset"] is None
+
+    assert sorted(ids(resume_index.recommend_candidates(query, client, job_board_id=1))) == [1, 2, 3, 4]
+    assert ids(resume_index.recommend_candidates(query, client, job_post_id=1, min_score=0.9)) == [2]
+    after = resume_index.recommend_candidates(query, client, job_post_id=1,
+                                              submitted_after=datetime(2026, 10, 3, tzinfo=timezone.utc),
+                                              submitted_before=datetime(2026, 10, 6, tzinfo=timezone.utc))
+    assert ids(after) == [2]
+    assert after["items"][0].resume_url == "/uploads/resumes/2.pdf"
+
+
+@pytest.mark.parametrize("quantization", ["scalar", "binary"])
+def test_quantized_collection_serves_recommendations(quantization, monkeypatch):
+    monkeypatch.setattr(settings, "RESUME_VECTOR_QUANTIZATION", quantization)
+    client = LocalVectorClient()
+    resume_index.ensure_collection(client, dimensions=3)
+    resume_index.ingest_resumes([resume(1, text="sql analyst"), resume(2, text="python developer")],
+                                client, FakeEmbeddings())
+
+    page = resume_index.recommend_candidates(FakeEmbeddings().embed_query("python developer"), client)
+    assert [item.job_application_id for item in page["items"]] == [2, 1]
+    assert page["items"][0].score == pytest.approx(1.0)
+
+
+def test_collection_with_other_dimensions_is_rejected(client):
+    with pytest.raises(ValueError, match="--recreate"):
+        resume_index.ensure_collection(client, dimensions=8)
+
+
+def test_hybrid_recommendations_rank_exact_keywords_first(client):
+    resume_index.ingest_resumes([resume(1, text="python developer"),
+                                 resume(2, text="python developer, CKA certified"),
+                                 resume(3, text="sql analyst")],
+                                client, FakeEmbeddings())
+    query = FakeEmbeddings().embed_query("python developer")
+
+    dense = resume_index.recommend_candidates(query, client)
+    assert {item.job_application_id for item in dense["items"][:2]} == {1, 2}
+
+    hybrid = resume_index.recommend_candidates(query, client, keywords="CKA")
+    assert [item.job_application_id for item in hybrid["items"]][:2] == [2, 1]
+    assert len(hybrid["items"]) == 3
@@ -0,0 +1,41 @@
+from models import JobBoard, JobPost
+
+
+def create_job_posts(db_session):
+    job_board = JobBoard(slug="search-board")
+    db_session.add(job_board)
+    db_session.flush()
+    db_session.add_all([
+        JobPost(title="Python Engineer", description="Build APIs with FastAPI and Postgres", job_board_id=job_board.id),
+        JobPost(title="Data Analyst", description="SQL dashboards, some Python scripting", job_board_id=job_board.id),
+        JobPost(title="Python Developer", description="Django and Celery", job_board_id=job_board.id, is_open=False),
+        JobPost(title="Frontend Engineer", description="React and TypeScript", job_board_id=job_board.id),
+    ])
+    db_session.flush()
+    return job_board
+
+
+def test_search_ranks_title_matches_first(client, db_session):
+    create_job_posts(db_session)
+    response = client.get("/api/job-posts/search", params={"q": "python", "board": "search-board"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["title"] for result in results] == ["Python Engineer", "Data Analyst"]
+    assert "<mark>Python</mark>" in results[0]["title_highlight"]
+
+
+def test_search_keyset_pagination(client, db_session):
+    create_job_posts(db_session)
+    first_page = client.get("/api/job-posts/search", params={"q": "python", "board": "search-board", "limit": 1}).json()
+    assert len(first_page["results"]) == 1
+    assert first_page["next_cursor"] is not None
+
+    second_page = client.get("/api/job-posts/search", params={"q": "python", "board": "search-board", "limit": 1,
+                                                              "cursor": first_page["next_cursor"]}).json()
+    assert [result["title"] for result in second_page["results"]] == ["Data Analyst"]
+    assert second_page["next_cursor"] is None
+
+
+def test_search_rejects_malformed_cursor(client):
+    response = client.get("/api/job-posts/search", params={"q": "python", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,51 @@
+import pytest
+
+from skill_taxonomy import SkillTaxonomy, get_taxonomy, normalize
+
+
+@pytest.fixture
+def taxonomy():
+    return get_taxonomy()
+
+
+def test_normalize():
+    assert normalize("  Node.JS ") == "node.js"
+    assert normalize("System   Design") == "system design"
+    assert normalize("CI/CD,") == "ci/cd"
+
+
+def test_exact_and_alias_lookup(taxonomy):
+    assert taxonomy.canonical("python") == "Python"
+    assert taxonomy.canonical("PostgreSQL") == "SQL"
+    assert taxonomy.canonical("k8s") == "Kubernetes"
+    assert taxonomy.canonical("Python programming") is None
+
+
+def test_token_match(taxonomy):
+    assert taxonomy.match("Python programming") == "Python"
+    assert taxonomy.match("Strong understanding of SQL and database design") == "SQL"
+    assert taxonomy.match("Experience with distributed systems at scale") == "System Design"
+    assert taxonomy.match("Relational database") == "SQL"
+
+
+def test_no_substring_misfires(taxonomy):
+    assert taxonomy.match("NoSQL") == "NoSQL"
+    assert taxonomy.match("pythonic code") is None
+    assert taxonomy.match("go-to person") is None
+
+
+def test_longest_alias_wins():
+    taxonomy = SkillTaxonomy([
+        {"name": "Google", "aliases": ["google"]},
+        {"name": "GCP", "aliases": ["google cloud"]},
+    ])
+    assert taxonomy.match("google cloud functions") == "GCP"
+
+
+def test_match_all_deduplicates_in_order(taxonomy):
+    assert taxonomy.match_all(["MySQL", "Python 3", "PostgreSQL", "team player"]) == ["SQL", "Python"]
+
+
+def test_conflicting_alias_is_rejected():
+    with pytest.raises(ValueError):
+        SkillTaxonomy([{"name": "Go", "aliases": ["golang"]}, {"name": "Golang", "aliases": []}])
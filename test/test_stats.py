@@ -0,0 +1,63 @@
+from models import JobBoard, JobPost
+import stats
+
+
+def test_score_bucket_boundaries():
+    assert stats.score_bucket(0) == 0
+    assert stats.score_bucket(9) == 0
+    assert stats.score_bucket(10) == 1
+    assert stats.score_bucket(99) == 9
+    assert stats.score_bucket(100) == 9
+
+
+def test_stats_are_maintained_incrementally(admin_client, db_session):
+    job_board = JobBoard(slug="stats-board")
+    db_session.add(job_board)
+    db_session.flush()
+    job_posts = [JobPost(title=title, description="Python", job_board_id=job_board.id)
+                 for title in ("Backend Engineer", "Data Engineer")]
+    db_session.add_all(job_posts)
+    db_session.flush()
+
+    for job_post in job_posts:
+        stats.record_application(db_session, job_post.id, job_board.id)
+        stats.record_application(db_session, job_post.id, job_board.id)
+    stats.record_evaluation(db_session, job_posts[0].id, job_board.id, 85)
+    stats.record_evaluation(db_session, job_posts[1].id, job_board.id, 100)
+    db_session.flush()
+
+    response = admin_client.get(f"/api/job-posts/{job_posts[0].id}/stats")
+    assert response.status_code == 200
+    post_stats = response.json()
+    assert post_stats["application_count"] == 2
+    assert post_stats["evaluated_count"] == 1
+    assert post_stats["average_score"] == 85
+    assert post_stats["score_histogram"][8]["count"] == 1
+
+    response = admin_client.get(f"/api/job-boards/{job_board.id}/stats")
+    assert response.status_code == 200
+    board_stats = response.json()
+    assert board_stats["application_count"] == 4
+    assert board_stats["evaluated_count"] == 2
+    assert board_stats["score_histogram"][9]["count"] == 1
+    assert len(board_stats["job_posts"]) == 2
+
+
+def test_re_evaluation_moves_the_score_instead_of_counting_twice(admin_client, db_session):
+    job_board = JobBoard(slug="re-evaluation-board")
+    db_session.add(job_board)
+    db_session.flush()
+    job_post = JobPost(title="Backend Engineer", description="Python", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.flush()
+
+    stats.record_application(db_session, job_post.id, job_board.id)
+    stats.record_evaluation(db_session, job_post.id, job_board.id, 45)
+    stats.record_evaluation(db_session, job_post.id, job_board.id, 82, previous_score=45)
+    stats.record_evaluation(db_session, job_post.id, job_board.id, 88, previous_score=82)
+    db_session.flush()
+
+    post_stats = admin_client.get(f"/api/job-posts/{job_post.id}/stats").json()
+    assert post_stats["evaluated_count"] == 1
+    assert post_stats["average_score"] == 88
+    assert [bucket["count"] for bucket in post_stats["score_histogram"]] == [0] * 8 + [1, 0]
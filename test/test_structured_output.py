@@ -0,0 +1,108 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage
+
+import ai
+import metrics
+import structured_output
+from ai import JDAnalysis, ResumeEvaluation
+from structured_output import StructuredOutputError, repair_json
+
+EVALUATION = {
+    "overall_score": 82,
+    "strengths": ["Python", "PostgreSQL", "Mentoring"],
+    "gaps": ["No Kubernetes"],
+    "match_by_section": {"required_skills": "Strong", "experience_years": "6 of 5", "education": "BSc"},
+    "rewrite_snippet": "Backend engineer with six years of Python.",
+    "actionable_recommendations": ["Add a Kubernetes project"],
+}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Here you go: {"a": 1} Hope it helps!', {"a": 1}),
+    ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+    ('{"a": 1, // one\n "b": "http://x" /* two */}', {"a": 1, "b": "http://x"}),
+    ('{"a": {"b": [1, 2', {"a": {"b": [1, 2]}}),
+    ('{"a": "trunc', {"a": "trunc"}),
+    ('{"a": "esc\\', {"a": "esc"}),
+    ('{"a": 1, "b":', {"a": 1, "b": None}),
+])
+def test_repair_json(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_strict_schema_requires_every_field_and_no_extras():
+    schema = structured_output.strict_json_schema(JDAnalysis)
+    assert schema["additionalProperties"] is False
+    assert schema["required"] == list(schema["properties"])
+    assert "default" not in json.dumps(schema)
+    definition = structured_output.strict_json_schema(ResumeEvaluation)["$defs"]["MatchBySection"]
+    assert definition["required"] == ["required_skills", "experience_years", "education"]
+
+
+def test_parse_repairs_before_failing():
+    metrics.reset()
+    assert structured_output.parse(json.dumps(EVALUATION), ResumeEvaluation, "m").overall_score == 82
+    truncated = structured_output.parse(json.dumps(EVALUATION)[:-5], ResumeEvaluation, "m")
+    assert truncated.actionable_recommendations == ["Add a Kubernetes proje"]
+    repaired = structured_output.parse("```json\n" + json.dumps(EVALUATION) + ",\n```", ResumeEvaluation, "m")
+    assert repaired.overall_score == 82
+    with pytest.raises(StructuredOutputError):
+        structured_output.parse('{"overall_score": 82', ResumeEvaluation, "m")
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["llm_output.parse_failures.m"] == 3
+    assert counters["llm_output.repaired.m"] == 2
+
+
+def test_structured_output_falls_back_to_repairing_raw_text():
+    raw = AIMessage(content='{"overall_summary": "Clear", "jargon_terms": ["synergy"],}')
+    parsed = structured_output._from_raw({"raw": raw, "parsed": None, "parsing_error": ValueError()},
+                                         JDAnalysis, "m")
+    assert parsed.jargon_terms == ["synergy"]
+
+    refused = AIMessage(content="", additional_kwargs={"refusal": "I can't help with that"})
+    with pytest.raises(StructuredOutputError):
+        structured_output._from_raw({"raw": refused, "parsed": None, "parsing_error": None}, JDAnalysis, "m")
+
+
+class FakeCompletions:
+
+    def __init__(self, contents):
+        self.contents = list(contents)
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        message = SimpleNamespace(content=self.contents.pop(0), refusal=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def fake_client(monkeypatch, contents):
+    completions = FakeCompletions(contents)
+    monkeypatch.setattr(ai, "client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return completions
+
+
+def test_evaluation_is_schema_constrained_and_retried_once(monkeypatch):
+    metrics.reset()
+    completions = fake_client(monkeypatch, ['{"overall_score": ', json.dumps(EVALUATION)])
+
+    assert ai.evaluate_resume_with_ai("resume", "requirements") == EVALUATION
+    assert completions.requests[0]["response_format"]["json_schema"]["strict"] is True
+    counters = metrics.snapshot()["counters"]
+    assert counters["llm_output.parse_failures.gpt-4o-mini"] == 1
+    assert counters["llm_output.retries.gpt-4o-mini"] == 1
+
+
+def test_evaluation_gives_up_after_retries(monkeypatch):
+    metrics.reset()
+    completions = fake_client(monkeypatch, ["not json", "still not json"])
+
+    with pytest.raises(StructuredOutputError):
+        ai.evaluate_resume_with_ai("resume", "requirements")
+    assert len(completions.requests) == 2
+    assert metrics.snapshot()["counters"]["llm_output.failures.gpt-4o-mini"] == 1
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import uuid
+
+from sqlalchemy import func, select
+
+import interview_store
+from interview_store import PostgresSession
+from models import InterviewResult, InterviewSessionItem
+from transcript_writer import TranscriptWriter, replay_journals
+
+
+def count_items(db_session, session_id):
+    return db_session.scalar(select(func.count(InterviewSessionItem.id))
+                             .filter(InterviewSessionItem.session_id == session_id))
+
+
+def test_buffered_items_are_readable_before_and_after_flush(db_session, tmp_path, db_session_factory):
+    writer = TranscriptWriter(session_factory=db_session_factory, journal_dir=tmp_path, flush_interval=3600)
+    session = PostgresSession("writer-test", session_factory=db_session_factory, writer=writer)
+    items = [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}]
+
+    asyncio.run(session.add_items(items))
+    assert count_items(db_session, "writer-test") == 0
+    assert asyncio.run(session.get_items()) == items
+
+    writer.flush()
+    assert count_items(db_session, "writer-test") == 2
+    assert asyncio.run(session.get_items()) == items
+    writer.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_orphaned_journal_is_replayed_once(db_session, tmp_path, db_session_factory):
+    records = [{"item_uuid": str(uuid.uuid4()), "session_id": "replay-test", "item": {"role": "user", "content": str(i)}}
+               for i in range(3)]
+    (tmp_path / "dead-worker.jsonl").write_text("".join(json.dumps(record) + "\n" for record in records) + '{"torn')
+
+    assert replay_journals(tmp_path, db_session_factory) == 3
+    assert count_items(db_session, "replay-test") == 3
+    assert list(tmp_path.iterdir()) == []
+
+    # Replaying the same records again is a no-op
+    (tmp_path / "again.jsonl").write_text("".join(json.dumps(record) + "\n" for record in records))
+    replay_journals(tmp_path, db_session_factory)
+    assert count_items(db_session, "replay-test") == 3
+
+
+class ArrivingItemSession:
+    """Stand-in session: another item is added to the writer while the first batch is written"""
+
+    def __init__(self, writer, arrived):
+        self.writer = writer
+        self.arrived = arrived
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement):
+        if not self.arrived:
+            self.arrived.append(True)
+            self.writer.add("journal-test", [{"role": "user", "content": "second"}])
+
+    def commit(self):
+        pass
+
+
+def test_journal_keeps_only_items_still_buffered(tmp_path):
+    arrived = []
+    writer = TranscriptWriter(session_factory=lambda: ArrivingItemSession(writer, arrived), journal_dir=tmp_path,
+                              flush_interval=3600)
+    writer.add("journal-test", [{"role": "user", "content": "first"}])
+
+    writer.flush()
+    journal, = tmp_path.iterdir()
+    assert [json.loads(line)["item"]["content"] for line in journal.read_text().splitlines()] == ["second"]
+    assert [record["item"]["content"] for record in writer.pending_records("journal-test")] == ["second"]
+
+    writer.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_result_is_saved_from_evaluations(db_session):
+    interview_store.set_skills(db_session, "result-test", ["Python", "SQL"])
+    interview_store.add_evaluation(db_session, "result-test", "Python", True)
+    interview_store.add_evaluation(db_session, "result-test", "SQL", False)
+    interview_store.save_result(db_session, "result-test")
+    interview_store.save_result(db_session, "result-test")
+
+    result = db_session.scalars(select(InterviewResult).filter(InterviewResult.session_id == "result-test")).one()
+    assert (result.skills_passed, result.skills_total) == (1, 2)
+    assert result.evaluation == [{"skill": "Python", "passed": True}, {"skill": "SQL", "passed": False}]
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from qdrant_client.http.models import (BinaryQuantization, BinaryQuantizationConfig, Distance, FieldCondition, Filter,
+                                       MatchValue, PayloadSchemaType, PointStruct, QuantizationSearchParams,
+                                       SearchParams, VectorParams)
+
+import vector_index
+from vector_index import (BinaryQuantizer, HashingEmbeddings, HNSWIndex, LocalVectorClient, ScalarQuantizer,
+                          exact_search, quantized_search, truncate_dimensions)
+
+
+def clustered_vectors(count, dimensions=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dimensions))
+    vectors = centers[rng.integers(0, 20, count)] + rng.normal(scale=0.5, size=(count, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_hashing_embeddings_are_deterministic_and_lexical():
+    embeddings = HashingEmbeddings(dimensions=128)
+    python, again, sql = embeddings.embed_documents(["Senior Python developer", "Senior Python developer",
+                                                     "SQL analyst"])
+    assert python == again
+    assert np.isclose(np.linalg.norm(python), 1.0)
+    query = embeddings.embed_query("python developer")
+    assert np.dot(query, python) > np.dot(query, sql)
+
+
+def test_hnsw_matches_exact_search():
+    vectors = clustered_vectors(2000)
+    index = HNSWIndex(m=8, ef_construction=64)
+    for row in range(len(vectors)):
+        index.add(vectors, row)
+
+    recall = 0
+    for query in vectors[:50] + 0.05:
+        query = query / np.linalg.norm(query)
+        expected = {row for _, row in exact_search(vectors, query, 10)}
+        recall += len(expected & {row for _, row in index.search(vectors, query, 10)}) / 10
+    assert recall / 50 >= 0.95
+
+
+def test_large_collection_uses_hnsw_with_filters_and_overwrites(monkeypatch):
+    # Answer filtered queries from the graph too
+    monkeypatch.setattr(vector_index, "FILTERED_SCAN_MAX_POINTS", 0)
+    client = LocalVectorClient(hnsw_min_points=500)
+    client.create_collection("resumes", vectors_config=VectorParams(size=32, distance=Distance.COSINE))
+    client.create_payload_index("resumes", field_name="post", field_schema=PayloadSchemaType.INTEGER)
+    vectors = clustered_vectors(1000)
+    client.upsert("resumes", [PointStruct(id=i, vector=vectors[i].tolist(), payload={"post": i % 4})
+                              for i in range(1000)])
+    assert len(client._collections["resumes"].hnsw) == 1000
+
+    hit = client.query_points("resumes", query=vectors[7].tolist(), limit=3).points
+    assert hit[0].id == 7 and np.isclose(hit[0].score, 1.0, atol=1e-5)
+
+    only_post_1 = Filter(must=[FieldCondition(key="post", match=MatchValue(value=1))])
+    points = client.query_points("resumes", query=vectors[7].tolist(), query_filter=only_post_1, limit=5).points
+    assert len(points) == 5 and all(point.payload["post"] == 1 for point in points)
+
+    # Moving point 7 to another vector and post replaces it rather than duplicating it
+    client.upsert("resumes", [PointStruct(id=7, vector=vectors[8].tolist(), payload={"post": 1})])
+    assert client.count("resumes").count == 1000
+    assert client.count("resumes", count_filter=only_post_1).count == 251
+    top_two = client.query_points("resumes", query=vectors[8].tolist(), limit=2).points
+    assert {point.id for point in top_two} == {7, 8}
+
+
+def test_truncated_vectors_are_renormalised():
+    truncated = truncate_dimensions(clustered_vectors(10, dimensions=64), 16)
+    assert truncated.shape == (10, 16)
+    assert np.allclose(np.linalg.norm(truncated, axis=1), 1.0)
+
+
+@pytest.mark.parametrize("quantizer, oversampling, bytes_per_vector", [(ScalarQuantizer(), 2.0, 64),
+                                                                        (BinaryQuantizer(), 10.0, 8)])
+def test_quantized_search_with_rescoring_keeps_recall(quantizer, oversampling, bytes_per_vector):
+    vectors = clustered_vectors(3000, dimensions=64)
+    codes = quantizer.fit(vectors).encode(vectors)
+    assert codes.nbytes == 3000 * bytes_per_vector == 3000 * quantizer.bytes_per_vector(64)
+
+    recall = 0
+    for query in vectors[:50]:
+        expected = {row for _, row in exact_search(vectors, query, 10)}
+        found = quantized_search(quantizer, codes, vectors, query, 10, oversampling=oversampling)
+        recall += len(expected & {row for _, row in found}) / 10
+    assert recall / 50 >= 0.9
+
+
+def test_quantized_collection_rescores_with_original_vectors():
+    client = LocalVectorClient()
+    client.create_collection("resumes", vectors_config=VectorParams(size=32, distance=Distance.COSINE),
+                             quantization_config=BinaryQuantization(binary=BinaryQuantizationConfig()))
+    vectors = clustered_vectors(500)
+    client.upsert("resumes", [PointStruct(id=i, vector=vectors[i].tolist()) for i in range(500)])
+
+    params = SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=3.0))
+    points = client.query_points("resumes", query=vectors[42].tolist(), limit=5, search_params=params).points
+    assert points[0].id == 42 and np.isclose(points[0].score, 1.0, atol=1e-5)
+    assert client.get_collection("resumes").config.quantization_config.binary is not None
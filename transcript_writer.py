@@ -0,0 +1,193 @@
+"""
+Write-behind buffer for interview transcript items.
+
+The Agents SDK saves conversation items after every step of a turn. Writing
+each batch to Postgres inline puts a database round trip on the
+conversational hot path, so PostgresSession can hand items to a
+TranscriptWriter instead. The writer:
+
+- appends each item to a local journal file and to an in-memory buffer,
+  then returns immediately;
+- inserts buffered items in batches from a background thread (every
+  FLUSH_INTERVAL seconds, or sooner once MAX_BATCH items are waiting);
+- after each batch, rewrites its journal to hold only the items still
+  buffered, so it stays small under steady traffic.
+
+Every item gets a UUID when it is buffered and inserts ignore UUIDs that are
+already stored, so a batch can safely be written twice. If a worker dies
+with unwritten items, its journal is left behind. The next worker to start
+replays it: each worker holds an exclusive flock on its own journal, so
+only journals whose owner is gone are picked up.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from agents.items import TResponseInputItem
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db import get_db_session
+from models import InterviewSession, InterviewSessionItem
+
+DEFAULT_JOURNAL_DIR = Path(__file__).resolve().parent / "data" / "interview_journal"
+FLUSH_INTERVAL = 0.25
+MAX_BATCH = 500
+
+
+def write_items(db: Session, records: list[dict]):
+    """Insert buffered records ({item_uuid, session_id, item}), skipping ones already stored"""
+    if not records:
+        return
+    session_ids = {record["session_id"] for record in records}
+    db.execute(insert(InterviewSession)
+               .values([{"id": session_id, "skills": []} for session_id in session_ids])
+               .on_conflict_do_nothing(index_elements=[InterviewSession.id]))
+    db.execute(insert(InterviewSessionItem)
+               .values([{"item_uuid": uuid.UUID(record["item_uuid"]),
+                         "session_id": record["session_id"],
+                         "item": record["item"]} for record in records])
+               .on_conflict_do_nothing(index_elements=[InterviewSessionItem.item_uuid]))
+    db.commit()
+
+
+def replay_journals(journal_dir: Path, session_factory=get_db_session, batch_size: int = MAX_BATCH) -> int:
+    """Write the items of journals left behind by dead workers. Returns the number of records replayed."""
+    replayed = 0
+    for path in sorted(Path(journal_dir).glob("*.jsonl")):
+        with open(path, "r+", encoding="utf-8") as journal:
+            try:
+                fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue  # owned by a live worker
+
+            records = []
+            for line in journal:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # torn final line from the crash; nothing after it was acknowledged
+            with session_factory() as db:
+                for start in range(0, len(records), batch_size):
+                    write_items(db, records[start:start + batch_size])
+            replayed += len(records)
+            path.unlink()
+    if replayed:
+        print(f"Replayed {replayed} interview transcript items from journals")
+    return replayed
+
+
+class TranscriptWriter:
+
+    def __init__(self, session_factory=get_db_session, journal_dir: Path = DEFAULT_JOURNAL_DIR,
+                 flush_interval: float = FLUSH_INTERVAL, max_batch: int = MAX_BATCH):
+        self._session_factory = session_factory
+        self._journal_dir = Path(journal_dir)
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._pending: list[dict] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._journal = None
+        self._journal_path: Optional[Path] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def start(self):
+        """Replay orphaned journals, open this worker's journal and start the flush thread"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._journal_dir.mkdir(parents=True, exist_ok=True)
+            replay_journals(self._journal_dir, self._session_factory, self._max_batch)
+            self._journal_path = self._journal_dir / f"{uuid.uuid4().hex}.jsonl"
+            self._journal = self._open_journal(self._journal_path)
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _open_journal(path: Path):
+        journal = open(path, "a", encoding="utf-8")
+        fcntl.flock(journal, fcntl.LOCK_EX)
+        return journal
+
+    def _rewrite_journal(self):
+        """Replace the journal with the records still pending. Called with _condition held."""
+        if not self._pending:
+            self._journal.seek(0)
+            self._journal.truncate()
+            return
+        # Not a .jsonl: replay_journals must not pick up a half-written copy
+        rewritten = self._open_journal(self._journal_path.with_suffix(".tmp"))
+        rewritten.write("".join(json.dumps(record) + "\n" for record in self._pending))
+        rewritten.flush()
+        os.replace(rewritten.name, self._journal_path)
+        self._journal.close()
+        self._journal = rewritten
+
+    def add(self, session_id: str, items: list[TResponseInputItem]):
+        if self._thread is None:
+            self.start()
+        records = [{"item_uuid": str(uuid.uuid4()), "session_id": session_id, "item": item} for item in items]
+        with self._condition:
+            self._journal.write("".join(json.dumps(record) + "\n" for record in records))
+            self._journal.flush()
+            self._pending.extend(records)
+            if len(self._pending) >= self._max_batch:
+                self._condition.notify()
+
+    def pending_records(self, session_id: str) -> list[dict]:
+        """Buffered records of a session that may not be in the database yet"""
+        with self._condition:
+            return [record for record in self._pending if record["session_id"] == session_id]
+
+    def flush(self):
+        """Write everything buffered so far. Blocking; safe to call from any thread."""
+        with self._flush_lock:
+            with self._condition:
+                batch = list(self._pending)
+            if not batch:
+                return
+            with self._session_factory() as db:
+                for start in range(0, len(batch), self._max_batch):
+                    write_items(db, batch[start:start + self._max_batch])
+            with self._condition:
+                del self._pending[:len(batch)]
+                self._rewrite_journal()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                self._condition.wait(timeout=self._flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                # Items stay buffered and journaled; the next tick retries
+                print(f"Failed to flush interview transcript items: {e}")
+
+    def close(self):
+        """Flush and stop. The journal is removed once it is empty."""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        with self._condition:
+            empty = not self._pending
+            self._journal.close()
+            if empty:
+                self._journal_path.unlink(missing_ok=True)
+
+
+transcript_writer = TranscriptWriter()
@@ -0,0 +1,669 @@
+"""
+In-process vector index for offline development and tests.
+
+LocalVectorClient implements the subset of QdrantClient that resume_index
+uses (collections, payload indexes, upsert, filtered query_points, count,
+retrieve), so VECTOR_BACKEND=local swaps Qdrant out without touching the
+retrieval code. HashingEmbeddings is a deterministic LangChain Embeddings
+with no network calls; with EMBEDDING_BACKEND=hashing the whole retrieval
+path runs offline.
+
+Each collection answers queries with an exact NumPy scan while it is small.
+From HNSW_MIN_POINTS points on it also maintains an HNSW graph and answers
+from it, falling back to the exact scan when a filter leaves few enough
+points that scanning them is cheaper. Indexed payload fields are kept as
+NumPy columns so filters are evaluated without touching the payload dicts.
+
+Collections created with a quantization_config scan int8 or binary codes
+instead of the float vectors and re-score the best candidates exactly, as
+Qdrant does. Named sparse vectors are served from an inverted index (with
+Qdrant's IDF modifier), and prefetches can be fused by reciprocal rank. The same quantizers back benchmarks/embedding_quantization.py.
+"""
+
+import hashlib
+import heapq
+import math
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from qdrant_client.http.models import (BinaryQuantization, CountResult, DatetimeRange, Distance, FieldCondition,
+                                       Filter, Fusion, FusionQuery, MatchAny, MatchValue, Modifier, PayloadSchemaType,
+                                       PointStruct, Prefetch, QuantizationConfig, QueryResponse, Range, Record,
+                                       RrfQuery, ScalarQuantization, ScoredPoint, SearchParams, SparseVector,
+                                       SparseVectorParams, VectorParams)
+from qdrant_client.hybrid.fusion import reciprocal_rank_fusion
+
+from skill_taxonomy import tokenize
+
+# Collections switch from exact scans to the HNSW graph at this size
+HNSW_MIN_POINTS = 20000
+# Filtered queries scan exactly when at most this many points match
+FILTERED_SCAN_MAX_POINTS = 5000
+# Quantized codes are widened for scoring this many rows at a time
+SCORE_BLOCK_ROWS = 8192
+
+
+# ==============================================================================
+# EMBEDDINGS
+# ==============================================================================
+
+class HashingEmbeddings(Embeddings):
+    """Feature-hashed bag of words and word bigrams, L2-normalised.
+
+    Texts sharing vocabulary get similar vectors, which is all tests and
+    offline development need. Identical input always gives the identical vector.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        tokens = tokenize(text)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+# ==============================================================================
+# INDEXES
+# ==============================================================================
+
+def exact_search(vectors: np.ndarray, query: np.ndarray, k: int,
+                 rows: Optional[np.ndarray] = None) -> list[tuple[float, int]]:
+    """Top k (similarity, row) by dot product over the given rows (all rows if None), best first"""
+    candidates = vectors if rows is None else vectors[rows]
+    if k <= 0 or not len(candidates):
+        return []
+    similarities = candidates @ query
+    k = min(k, len(similarities))
+    top = np.argpartition(-similarities, k - 1)[:k]
+    top = top[np.argsort(-similarities[top], kind="stable")]
+    found = top if rows is None else rows[top]
+    return list(zip(similarities[top].tolist(), found.tolist()))
+
+
+class HNSWIndex:
+    """Hierarchical navigable small world graph over rows of a vector matrix.
+
+    Similarity is the dot product, i.e. cosine for normalised vectors. The
+    matrix is owned by the caller and passed in on every call, so it can be
+    reallocated as it grows. Rows are never removed; callers mask out stale rows.
+    """
+
+    def __init__(self, m: int = 16, ef_construction: int = 100, ef_search: int = 128, seed: int = 0):
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._level_mult = 1 / math.log(m)
+        self._rng = random.Random(seed)
+        self._layers: list[dict[int, list[int]]] = []
+        self._entry: Optional[int] = None
+
+    def __len__(self):
+        return len(self._layers[0]) if self._layers else 0
+
+    def _search_layer(self, vectors: np.ndarray, query: np.ndarray, entries: list[tuple[float, int]],
+                      ef: int, layer: int) -> list[tuple[float, int]]:
+        graph = self._layers[layer]
+        visited = {row for _, row in entries}
+        candidates = [(-similarity, row) for similarity, row in entries]
+        heapq.heapify(candidates)
+        found = list(entries)
+        heapq.heapify(found)
+        while candidates:
+            negative, row = heapq.heappop(candidates)
+            if len(found) >= ef and -negative < found[0][0]:
+                break
+            neighbours = [n for n in graph[row] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for similarity, neighbour in zip((vectors[neighbours] @ query).tolist(), neighbours):
+                if len(found) < ef or similarity > found[0][0]:
+                    heapq.heappush(candidates, (-similarity, neighbour))
+                    heapq.heappush(found, (similarity, neighbour))
+                    if len(found) > ef:
+                        heapq.heappop(found)
+        return sorted(found, reverse=True)
+
+    def _select_neighbours(self, vectors: np.ndarray, candidates: list[tuple[float, int]],
+                           m: int) -> list[int]:
+        """Keep candidates closer to the new row than to any neighbour already kept (HNSW heuristic).
+
+        candidates are (similarity to the new row, row), best first.
+        """
+        if len(candidates) <= m:
+            return [row for _, row in candidates]
+        rows = [row for _, row in candidates]
+        similarities = np.array([similarity for similarity, _ in candidates])
+        pairwise = vectors[rows] @ vectors[rows].T
+        closest_kept = np.full(len(rows), -np.inf)
+        selected = []
+        for i in range(len(rows)):
+            if similarities[i] > closest_kept[i]:
+                selected.append(i)
+                if len(selected) == m:
+                    break
+                np.maximum(closest_kept, pairwise[i], out=closest_kept)
+        if len(selected) < m:
+            chosen = set(selected)
+            selected += [i for i in range(len(rows)) if i not in chosen][:m - len(selected)]
+        return [rows[i] for i in selected]
+
+    def add(self, vectors: np.ndarray, row: int):
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        while len(self._layers) <= level:
+            self._layers.append({})
+        for layer in range(level + 1):
+            self._layers[layer][row] = []
+        if self._entry is None:
+            self._entry = row
+            return
+
+        query = vectors[row]
+        top_layer = max(layer for layer, graph in enumerate(self._layers) if self._entry in graph)
+        entries = [(float(vectors[self._entry] @ query), self._entry)]
+        for layer in range(top_layer, level, -1):
+            entries = self._search_layer(vectors, query, entries, 1, layer)
+        for layer in range(min(level, top_layer), -1, -1):
+            entries = self._search_layer(vectors, query, entries, self.ef_construction, layer)
+            max_degree = self.m0 if layer == 0 else self.m
+            graph = self._layers[layer]
+            neighbours = self._select_neighbours(vectors, entries, self.m)
+            graph[row] = neighbours
+            for neighbour in neighbours:
+                links = graph[neighbour]
+                links.append(row)
+                if len(links) > max_degree:
+                    similarities = (vectors[links] @ vectors[neighbour]).tolist()
+                    graph[neighbour] = self._select_neighbours(
+                        vectors, sorted(zip(similarities, links), reverse=True), max_degree)
+        if level > top_layer:
+            self._entry = row
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int,
+               ef: Optional[int] = None) -> list[tuple[float, int]]:
+        """Approximate top k (similarity, row), best first"""
+        if self._entry is None:
+            return []
+        entries = [(float(vectors[self._entry] @ query), self._entry)]
+        for layer in range(len(self._layers) - 1, 0, -1):
+            if self._entry in self._layers[layer]:
+                entries = self._search_layer(vectors, query, entries, 1, layer)
+        return self._search_layer(vectors, query, entries, max(ef or self.ef_search, k), 0)[:k]
+
+
+# ==============================================================================
+# QUANTIZATION
+# ==============================================================================
+
+def truncate_dimensions(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """Keep the leading dimensions and re-normalise.
+
+    text-embedding-3 models are trained so that this (what their
+    `dimensions` parameter does) keeps most of the retrieval quality.
+    """
+    truncated = np.asarray(vectors, dtype=np.float32)[..., :dimensions]
+    norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+    return truncated / np.where(norms == 0, 1, norms)
+
+
+class ScalarQuantizer:
+    """One byte per dimension over the [1 - quantile, quantile] value range of the data.
+
+    Values outside the range are clipped; the default keeps the full range.
+    """
+
+    def __init__(self, quantile: float = 1.0):
+        self.quantile = quantile
+        self.offset = 0.0
+        self.scale = 1.0
+
+    def fit(self, vectors: np.ndarray) -> "ScalarQuantizer":
+        low, high = np.quantile(vectors, [1 - self.quantile, self.quantile])
+        self.offset = float(low)
+        self.scale = float(high - low) / 255 or 1.0
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint((vectors - self.offset) / self.scale), 0, 255).astype(np.uint8)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate dot products: decoded = codes * scale + offset"""
+        # Widen a block at a time so the product runs in BLAS without a full float copy
+        dots = np.concatenate([codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32) @ query
+                               for start in range(0, len(codes), SCORE_BLOCK_ROWS)] or [np.zeros(0, np.float32)])
+        return self.scale * dots + self.offset * float(query.sum())
+
+    @staticmethod
+    def bytes_per_vector(dimensions: int) -> int:
+        return dimensions
+
+
+class BinaryQuantizer:
+    """One bit per dimension (its sign).
+
+    Queries are not binarised: each code is scored as the dot product of the
+    float query with its +1/-1 signs, looked up a byte at a time, which ranks
+    far better than comparing bits with bits.
+    """
+
+    # Row b holds the +1/-1 signs of the 8 dimensions packed into byte value b
+    _BYTE_SIGNS = 2.0 * np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1) - 1.0
+
+    def fit(self, vectors: np.ndarray) -> "BinaryQuantizer":
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.packbits(vectors > 0, axis=-1)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        padded = np.zeros(codes.shape[1] * 8, dtype=np.float32)
+        padded[:len(query)] = query
+        table = padded.reshape(-1, 8) @ self._BYTE_SIGNS.T.astype(np.float32)
+        positions = np.arange(codes.shape[1])
+        return np.concatenate([table[positions, codes[start:start + SCORE_BLOCK_ROWS]].sum(axis=1)
+                               for start in range(0, len(codes), SCORE_BLOCK_ROWS)] or [np.zeros(0, np.float32)])
+
+    @staticmethod
+    def bytes_per_vector(dimensions: int) -> int:
+        return (dimensions + 7) // 8
+
+
+def quantizer_for(config: QuantizationConfig):
+    if isinstance(config, ScalarQuantization):
+        return ScalarQuantizer(config.scalar.quantile or 1.0)
+    if isinstance(config, BinaryQuantization):
+        return BinaryQuantizer()
+    raise ValueError(f"Unsupported quantization {config}")
+
+
+def quantized_search(quantizer, codes: np.ndarray, vectors: np.ndarray, query: np.ndarray, k: int,
+                     oversampling: float = 1.0, rescore: bool = True,
+                     rows: Optional[np.ndarray] = None) -> list[tuple[float, int]]:
+    """Top k (similarity, row) by scanning codes, best first.
+
+    With rescore, the best k * oversampling candidates are re-ranked by their
+    exact similarity; otherwise the approximate scores are returned.
+    """
+    approximate = quantizer.scores(codes if rows is None else codes[rows], query)
+    if k <= 0 or not len(approximate):
+        return []
+    shortlist = min(len(approximate), max(k, int(k * oversampling)) if rescore else k)
+    top = np.argpartition(-approximate, shortlist - 1)[:shortlist]
+    candidates = top if rows is None else rows[top]
+    if rescore:
+        return exact_search(vectors, query, k, candidates)
+    order = np.argsort(-approximate[top], kind="stable")
+    return list(zip(approximate[top][order].tolist(), candidates[order].tolist()))
+
+
+class SparseIndex:
+    """Inverted index over one named sparse vector of a collection"""
+
+    def __init__(self, params: SparseVectorParams):
+        self.idf = params.modifier == Modifier.IDF
+        self._postings: dict[int, tuple[list[int], list[float]]] = {}
+        self._arrays: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self._document_frequency: dict[int, int] = {}
+        self._row_indices: dict[int, list[int]] = {}
+        self.documents = 0
+
+    def add(self, row: int, vector: SparseVector):
+        for index, value in zip(vector.indices, vector.values):
+            rows, values = self._postings.setdefault(index, ([], []))
+            rows.append(row)
+            values.append(value)
+            self._arrays.pop(index, None)
+            self._document_frequency[index] = self._document_frequency.get(index, 0) + 1
+        self._row_indices[row] = list(vector.indices)
+        self.documents += 1
+
+    def remove(self, row: int):
+        """Forget a tombstoned row in the statistics; its postings stay and are masked out"""
+        for index in self._row_indices.pop(row, []):
+            self._document_frequency[index] -= 1
+        self.documents -= 1
+
+    def _posting_arrays(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        if index not in self._arrays:
+            rows, values = self._postings[index]
+            self._arrays[index] = (np.array(rows), np.array(values, dtype=np.float32))
+        return self._arrays[index]
+
+    def search(self, query: SparseVector, k: int, mask: np.ndarray) -> list[tuple[float, int]]:
+        scores = np.zeros(len(mask), dtype=np.float32)
+        for index, weight in zip(query.indices, query.values):
+            if index not in self._postings:
+                continue
+            if self.idf:
+                frequency = self._document_frequency[index]
+                weight *= math.log((self.documents - frequency + 0.5) / (frequency + 0.5) + 1)
+            rows, values = self._posting_arrays(index)
+            scores[rows] += weight * values
+        scores[~mask] = 0
+        # Top k of the scores themselves, over the rows that matched a term
+        return exact_search(scores[:, None], np.ones(1, dtype=np.float32), k, np.flatnonzero(scores > 0))
+
+
+# ==============================================================================
+# COLLECTIONS
+# ==============================================================================
+
+def _payload_value(payload: dict, key: str):
+    for part in key.split("."):
+        if not isinstance(payload, dict):
+            return None
+        payload = payload.get(part)
+    return payload
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+@dataclass
+class LocalCollectionParams:
+    vectors: VectorParams
+    sparse_vectors: Optional[dict[str, SparseVectorParams]]
+
+
+@dataclass
+class LocalCollectionConfig:
+    params: LocalCollectionParams
+    quantization_config: Optional[QuantizationConfig]
+
+
+@dataclass
+class LocalCollectionInfo:
+    """The CollectionInfo fields resume_index reads"""
+    points_count: int
+    payload_schema: dict[str, PayloadSchemaType]
+    config: LocalCollectionConfig
+
+
+class LocalCollection:
+
+    def __init__(self, params: VectorParams, hnsw_min_points: int = HNSW_MIN_POINTS,
+                 quantization_config: Optional[QuantizationConfig] = None,
+                 sparse_vectors_config: Optional[dict[str, SparseVectorParams]] = None):
+        if params.distance not in (Distance.COSINE, Distance.DOT):
+            raise ValueError(f"Unsupported distance {params.distance}")
+        self.params = params
+        self.sparse_vectors_config = sparse_vectors_config
+        self.sparse = {name: SparseIndex(sparse) for name, sparse in (sparse_vectors_config or {}).items()}
+        self.hnsw_min_points = hnsw_min_points
+        self.quantization_config = quantization_config
+        self.quantizer = quantizer_for(quantization_config) if quantization_config else None
+        # Codes of rows [0, size); re-fitted and re-encoded after upserts
+        self._codes: Optional[np.ndarray] = None
+        self.vectors = np.zeros((0, params.size), dtype=np.float32)
+        self.size = 0
+        self.ids: list = []
+        self.payloads: list[dict] = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.rows: dict = {}
+        self.columns: dict[str, tuple[PayloadSchemaType, np.ndarray]] = {}
+        self.hnsw: Optional[HNSWIndex] = None
+
+    def _prepare(self, vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.params.size,):
+            raise ValueError(f"Expected a vector of {self.params.size} dimensions, got {vector.shape}")
+        if self.params.distance == Distance.COSINE:
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector = vector / norm
+        return vector
+
+    def _column_value(self, schema: PayloadSchemaType, payload: dict, key: str) -> float:
+        value = _payload_value(payload, key)
+        if value is None:
+            return np.nan
+        return _timestamp(value) if schema == PayloadSchemaType.DATETIME else float(value)
+
+    def _grow(self, needed: int):
+        if needed <= len(self.vectors):
+            return
+        capacity = max(needed, 2 * len(self.vectors), 1024)
+
+        def resized(array, fill):
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            return grown
+
+        self.vectors = resized(self.vectors, 0)
+        self.alive = resized(self.alive, False)
+        for key, (schema, column) in self.columns.items():
+            self.columns[key] = (schema, resized(column, np.nan))
+
+    def create_index(self, key: str, schema: PayloadSchemaType):
+        if schema not in (PayloadSchemaType.INTEGER, PayloadSchemaType.FLOAT, PayloadSchemaType.DATETIME):
+            raise ValueError(f"Unsupported payload index type {schema}")
+        column = np.full(len(self.vectors), np.nan)
+        for row in range(self.size):
+            column[row] = self._column_value(schema, self.payloads[row], key)
+        self.columns[key] = (schema, column)
+
+    def upsert(self, points: list[PointStruct]):
+        """Append the points; an existing id is tombstoned and re-added with its new vector"""
+        self._grow(self.size + len(points))
+        self._codes = None
+        for point in points:
+            # The dense vector is unnamed; named ones are sparse
+            named = point.vector if isinstance(point.vector, dict) else {"": point.vector}
+            previous = self.rows.get(point.id)
+            if previous is not None:
+                self.alive[previous] = False
+                for sparse in self.sparse.values():
+                    sparse.remove(previous)
+            row = self.size
+            self.size += 1
+            self.vectors[row] = self._prepare(named[""])
+            for name, sparse in self.sparse.items():
+                sparse.add(row, named.get(name) or SparseVector(indices=[], values=[]))
+            self.alive[row] = True
+            self.ids.append(point.id)
+            self.payloads.append(point.payload or {})
+            self.rows[point.id] = row
+            for key, (schema, column) in self.columns.items():
+                column[row] = self._column_value(schema, self.payloads[row], key)
+            if self.hnsw is not None:
+                self.hnsw.add(self.vectors, row)
+        if self.hnsw is None and len(self.rows) >= self.hnsw_min_points:
+            self.hnsw = HNSWIndex()
+            for row in range(self.size):
+                self.hnsw.add(self.vectors, row)
+
+    def _condition_mask(self, condition) -> np.ndarray:
+        if isinstance(condition, Filter):
+            return self.filter_mask(condition)
+        if isinstance(condition.match, (MatchValue, MatchAny)):
+            allowed = {condition.match.value} if isinstance(condition.match, MatchValue) else set(condition.match.any)
+            if condition.key in self.columns:
+                return np.isin(self.columns[condition.key][1][:self.size], list(allowed))
+            return np.array([_payload_value(payload, condition.key) in allowed for payload in self.payloads],
+                            dtype=bool)
+
+        if isinstance(condition.range, (Range, DatetimeRange)):
+            is_datetime = isinstance(condition.range, DatetimeRange)
+            schema = PayloadSchemaType.DATETIME if is_datetime else PayloadSchemaType.FLOAT
+            if condition.key in self.columns:
+                values = self.columns[condition.key][1][:self.size]
+            else:
+                values = np.array([self._column_value(schema, payload, condition.key) for payload in self.payloads],
+                                  dtype=float)
+            to_number = _timestamp if is_datetime else float
+            mask = np.ones(self.size, dtype=bool)
+            with np.errstate(invalid="ignore"):
+                if condition.range.gt is not None:
+                    mask &= values > to_number(condition.range.gt)
+                if condition.range.gte is not None:
+                    mask &= values >= to_number(condition.range.gte)
+                if condition.range.lt is not None:
+                    mask &= values < to_number(condition.range.lt)
+                if condition.range.lte is not None:
+                    mask &= values <= to_number(condition.range.lte)
+            return mask
+
+        raise NotImplementedError(f"Unsupported condition on {condition.key}")
+
+    def filter_mask(self, query_filter: Optional[Filter]) -> np.ndarray:
+        mask = self.alive[:self.size].copy()
+        if query_filter is None:
+            return mask
+        for condition in query_filter.must or []:
+            mask &= self._condition_mask(condition)
+        for condition in query_filter.must_not or []:
+            mask &= ~self._condition_mask(condition)
+        if query_filter.should:
+            mask &= np.logical_or.reduce([self._condition_mask(c) for c in query_filter.should])
+        return mask
+
+    def _scan(self, query: np.ndarray, k: int, rows: Optional[np.ndarray],
+              search_params: Optional[SearchParams]) -> list[tuple[float, int]]:
+        vectors = self.vectors[:self.size]
+        if self.quantizer is None or (search_params and search_params.quantization
+                                      and search_params.quantization.ignore):
+            return exact_search(vectors, query, k, rows)
+        if self._codes is None:
+            self._codes = self.quantizer.fit(vectors).encode(vectors)
+        options = search_params.quantization if search_params and search_params.quantization else None
+        return quantized_search(self.quantizer, self._codes, vectors, query, k,
+                                oversampling=(options.oversampling if options and options.oversampling else 1.0),
+                                rescore=options.rescore is not False if options else True,
+                                rows=rows)
+
+    def search(self, vector, k: int, query_filter: Optional[Filter] = None,
+               search_params: Optional[SearchParams] = None, using: Optional[str] = None) -> list[tuple[float, int]]:
+        mask = self.filter_mask(query_filter)
+        if using:
+            return self.sparse[using].search(vector, k, mask)
+        query = self._prepare(vector)
+        matching = int(mask.sum())
+        if self.hnsw is None or matching <= FILTERED_SCAN_MAX_POINTS:
+            # Scanning every row avoids copying the matrix through a row index
+            return self._scan(query, k, None if matching == self.size else np.flatnonzero(mask), search_params)
+
+        # Widen the beam by how selective the filter is, then drop non-matching rows
+        ef = min(self.size, max(self.hnsw.ef_search, k) * max(1, self.size // matching))
+        found = [(similarity, row) for similarity, row in self.hnsw.search(self.vectors, query, ef, ef=ef)
+                 if mask[row]][:k]
+        if len(found) < min(k, matching):
+            return self._scan(query, k, np.flatnonzero(mask), search_params)
+        return found
+
+    def info(self) -> LocalCollectionInfo:
+        return LocalCollectionInfo(points_count=len(self.rows),
+                                   payload_schema={key: schema for key, (schema, _) in self.columns.items()},
+                                   config=LocalCollectionConfig(
+                                       params=LocalCollectionParams(vectors=self.params,
+                                                                    sparse_vectors=self.sparse_vectors_config),
+                                       quantization_config=self.quantization_config))
+
+
+def _select_payload(payload: dict, with_payload) -> Optional[dict]:
+    if with_payload is True:
+        return payload
+    if not with_payload:
+        return None
+    return {key: payload[key] for key in with_payload if key in payload}
+
+
+class LocalVectorClient:
+    """The QdrantClient methods used by resume_index, backed by LocalCollection"""
+
+    def __init__(self, hnsw_min_points: int = HNSW_MIN_POINTS):
+        self.hnsw_min_points = hnsw_min_points
+        self._collections: dict[str, LocalCollection] = {}
+        self._lock = threading.RLock()
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return collection_name in self._collections
+
+    def create_collection(self, collection_name: str, vectors_config: VectorParams,
+                          sparse_vectors_config: Optional[dict[str, SparseVectorParams]] = None,
+                          quantization_config: Optional[QuantizationConfig] = None, **kwargs):
+        with self._lock:
+            self._collections[collection_name] = LocalCollection(vectors_config, self.hnsw_min_points,
+                                                                 quantization_config, sparse_vectors_config)
+        return True
+
+    def delete_collection(self, collection_name: str, **kwargs):
+        with self._lock:
+            return self._collections.pop(collection_name, None) is not None
+
+    def get_collection(self, collection_name: str) -> LocalCollectionInfo:
+        return self._collections[collection_name].info()
+
+    def create_payload_index(self, collection_name: str, field_name: str, field_schema: PayloadSchemaType,
+                             **kwargs):
+        with self._lock:
+            self._collections[collection_name].create_index(field_name, field_schema)
+
+    def upsert(self, collection_name: str, points: list[PointStruct], **kwargs):
+        with self._lock:
+            self._collections[collection_name].upsert(points)
+
+    def query_points(self, collection_name: str, query=None, using: Optional[str] = None,
+                     prefetch: Optional[list[Prefetch]] = None, query_filter: Optional[Filter] = None,
+                     score_threshold: Optional[float] = None, limit: int = 10, offset: int = 0,
+                     search_params: Optional[SearchParams] = None, with_payload=True, **kwargs) -> QueryResponse:
+        """A dense or sparse (using=name) query, or prefetches fused by reciprocal rank"""
+        offset = offset or 0
+        with self._lock:
+            collection = self._collections[collection_name]
+            if prefetch:
+                if not isinstance(query, (FusionQuery, RrfQuery)) or (isinstance(query, FusionQuery)
+                                                                      and query.fusion != Fusion.RRF):
+                    raise NotImplementedError("Only reciprocal rank fusion of prefetches is supported")
+                responses = []
+                for source in prefetch:
+                    conditions = [f for f in (source.filter, query_filter) if f is not None]
+                    found = collection.search(source.query, source.limit, Filter(must=conditions),
+                                              source.params, source.using)
+                    responses.append([ScoredPoint(id=row, version=0, score=similarity) for similarity, row in found
+                                      if source.score_threshold is None or similarity >= source.score_threshold])
+                rrf = query.rrf if isinstance(query, RrfQuery) else None
+                fused = reciprocal_rank_fusion(responses, limit=offset + limit,
+                                               ranking_constant_k=rrf.k if rrf else None,
+                                               weights=rrf.weights if rrf else None)
+                found = [(point.score, point.id) for point in fused]
+            else:
+                found = collection.search(query, offset + limit, query_filter, search_params, using)
+            return QueryResponse(points=[ScoredPoint(id=collection.ids[row], version=0, score=score,
+                                                     payload=_select_payload(collection.payloads[row], with_payload))
+                                         for score, row in found[offset:]
+                                         if score_threshold is None or score >= score_threshold])
+
+    def count(self, collection_name: str, count_filter: Optional[Filter] = None, **kwargs) -> CountResult:
+        with self._lock:
+            return CountResult(count=int(self._collections[collection_name].filter_mask(count_filter).sum()))
+
+    def retrieve(self, collection_name: str, ids: list, with_payload=True, **kwargs) -> list[Record]:
+        with self._lock:
+            collection = self._collections[collection_name]
+            return [Record(id=point_id, payload=_select_payload(collection.payloads[collection.rows[point_id]],
+                                                                with_payload))
+                    for point_id in ids if point_id in collection.rows]
+
+    def close(self, **kwargs):
+        pass